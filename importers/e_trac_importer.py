@@ -1,11 +1,10 @@
-from datetime import datetime
-
 from pepys_import.core.formats import unit_registry
 from pepys_import.utils.unit_utils import convert_absolute_angle, convert_speed
 from pepys_import.file.highlighter.support.combine import combine_tokens
 from pepys_import.core.validators import constants
 from pepys_import.file.importer import Importer
 from pepys_import.core.formats.location import Location
+from pepys_import.core.formats.timestamp import parse_delimited_timestamp
 
 
 class ETracImporter(Importer):
@@ -98,9 +97,7 @@ class ETracImporter(Importer):
                 change_id=change_id,
             )
             sensor_type = data_store.add_to_sensor_types("GPS", change_id=change_id)
-            privacy = data_store.missing_data_resolver.resolve_privacy(
-                data_store, change_id
-            )
+            privacy = data_store.resolve_privacy(change_id)
             sensor = platform.get_sensor(
                 data_store=data_store,
                 sensor_name="E-Trac",
@@ -155,9 +152,4 @@ class ETracImporter(Importer):
 
     @staticmethod
     def parse_timestamp(date, time):
-        format_str = "%Y/%m/%d "
-        format_str += "%H:%M:%S"
-
-        res = datetime.strptime(date.strip() + " " + time.strip(), format_str)
-
-        return res
+        return parse_delimited_timestamp(date, time)
@@ -7,6 +7,9 @@ from pepys_import.utils.unit_utils import convert_absolute_angle, convert_speed
 from pepys_import.core.validators import constants
 from pepys_import.core.formats.location import Location
 
+# Number of points of a track read before their states are created
+POINT_BATCH_SIZE = 1000
+
 
 class GPXImporter(Importer):
     def __init__(
@@ -15,8 +18,10 @@ class GPXImporter(Importer):
         validation_level=constants.BASIC_LEVEL,
         short_name="GPX Importer",
         separator=" ",
+        batch_size=POINT_BATCH_SIZE,
     ):
         super().__init__(name, validation_level, short_name)
+        self.batch_size = batch_size
         self.errors = list()
 
     def can_load_this_type(self, suffix):
@@ -39,118 +44,182 @@ class GPXImporter(Importer):
         # Parse XML file from the full path of the file
         # Note: we can't use the file_contents variable passed in, as lxml refuses
         # to parse a string that has an encoding attribute in the XML - it requires bytes instead
+        #
+        # The file is read as a stream of elements rather than as a whole document,
+        # and each element is dropped once it has been handled, so that the memory used
+        # doesn't grow with the size of the file. The points of each track are
+        # turned into states a batch at a time
+        track_name = None
+        points = list()
         try:
-            doc = etree.parse(path)
-        except Exception as e:
+            for _, element in etree.iterparse(
+                path,
+                events=("end",),
+                tag=("{*}trk", "{*}name", "{*}trkpt", "{*}rte", "{*}wpt"),
+            ):
+                tag = etree.QName(element).localname
+                if tag == "trkpt":
+                    points.append(self.read_point(element))
+                    self.clear_element(element)
+                    if track_name is not None and len(points) >= self.batch_size:
+                        self.add_states(
+                            data_store, datafile, change_id, track_name, points
+                        )
+                        points = list()
+                elif tag == "name":
+                    # <trk> elements should correspond to a specific platform, with
+                    # the platform name in the <name> element
+                    if etree.QName(element.getparent()).localname == "trk":
+                        track_name = element.text
+                elif tag == "trk":
+                    if track_name is None:
+                        self.errors.append(
+                            {
+                                self.error_type: f"Line {element.sourceline}. "
+                                f"Error: <trk> element must have child <name> element"
+                            }
+                        )
+                    else:
+                        self.add_states(
+                            data_store, datafile, change_id, track_name, points
+                        )
+                    track_name = None
+                    points = list()
+                    self.clear_element(element)
+                else:
+                    # routes and waypoints aren't imported
+                    self.clear_element(element)
+        except (etree.XMLSyntaxError, OSError) as e:
             self.errors.append(
                 {
                     self.error_type: f'Invalid GPX file at {path}\nError from parsing was "{str(e)}"'
                 }
             )
+            # as for a file which can't be parsed at all, none of it is imported
+            datafile.measurements[self.short_name] = list()
+
+    def read_point(self, tpt):
+        """Extract information (location, speed etc) from a <trkpt> element
+
+        :param tpt: <trkpt> element
+        :type tpt: Element
+        :return: Line of the element in the file, and the text of its latitude,
+        longitude, time, speed, course and elevation (None for those it hasn't got)
+        :rtype: Tuple
+        """
+        # look through the children once, rather than searching for each of them
+        children = dict()
+        for child in tpt:
+            if isinstance(child.tag, str):
+                children.setdefault(etree.QName(child).localname, child.text)
+        return (
+            tpt.sourceline,
+            tpt.attrib["lat"],
+            tpt.attrib["lon"],
+            children.get("time"),
+            children.get("speed"),
+            children.get("course"),
+            children.get("ele"),
+        )
+
+    @staticmethod
+    def clear_element(element):
+        """Drop an element which has been handled, and the siblings before it, from
+        the tree built while the file is read"""
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+    def add_states(self, data_store, datafile, change_id, track_name, points):
+        """Create the states of points of a track, as read by :meth:`read_point`"""
+        if not points:
             return
 
-        # Iterate through <trk> elements - these should correspond to
-        # a specific platform, with the platform name in the <name> element
-        for track_element in doc.findall("//{*}trk"):
-            track_name = track_element.find("{*}name").text
-
-            # Get the platform and sensor details, as these will be the same for all
-            # points in this track
-            platform = data_store.get_platform(
-                platform_name=track_name,
-                nationality="UK",
-                platform_type="Fisher",
-                privacy="Public",
-                change_id=change_id,
-            )
-            sensor_type = data_store.add_to_sensor_types("GPS", change_id=change_id)
-            privacy = data_store.missing_data_resolver.resolve_privacy(
-                data_store, change_id
-            )
-            sensor = platform.get_sensor(
-                data_store=data_store,
-                sensor_name="GPX",
-                sensor_type=sensor_type,
-                privacy=privacy.name,
-                change_id=change_id,
-            )
+        # Get the platform and sensor details, as these will be the same for all
+        # points in this track
+        platform = data_store.get_platform(
+            platform_name=track_name,
+            nationality="UK",
+            platform_type="Fisher",
+            privacy="Public",
+            change_id=change_id,
+        )
+        sensor_type = data_store.add_to_sensor_types("GPS", change_id=change_id)
+        privacy = data_store.resolve_privacy(change_id)
+        sensor = platform.get_sensor(
+            data_store=data_store,
+            sensor_name="GPX",
+            sensor_type=sensor_type,
+            privacy=privacy.name,
+            change_id=change_id,
+        )
+
+        for point in points:
+            (
+                sourceline,
+                latitude_str,
+                longitude_str,
+                timestamp_str,
+                speed_str,
+                course_str,
+                elevation_str,
+            ) = point
+
+            if timestamp_str is None:
+                self.errors.append(
+                    {
+                        self.error_type: f"Line {sourceline}. "
+                        f"Error: <trkpt> element must have child <time> element"
+                    }
+                )
+                continue
 
-            # Get all <trkpt> children of this track
-            # (no matter which <trkseg> they are in - as all <trkseg> elements below this
-            # belong to this track)
-            for tpt in track_element.findall(".//{*}trkpt"):
-                # Extract information (location, speed etc) from <trkpt> element
-                latitude_str = tpt.attrib["lat"]
-                longitude_str = tpt.attrib["lon"]
+            # Parse timestamp and create state
+            timestamp = parse(timestamp_str)
+            state = datafile.create_state(
+                data_store, platform, sensor, timestamp, self.short_name
+            )
 
-                timestamp_str = self.get_child_text_if_exists(tpt, "{*}time")
+            # Add location (no need to convert as it requires a string)
+            if track_name in self.prev_location:
+                state.prev_location = self.prev_location[track_name]
 
-                if timestamp_str is None:
-                    self.errors.append(
-                        {
-                            self.error_type: f"Line {tpt.sourceline}. "
-                            f"Error: <trkpt> element must have child <time> element"
-                        }
-                    )
-                    continue
+            location = Location(errors=self.errors, error_type=self.error_type)
+            location.set_latitude_decimal_degrees(latitude_str)
+            location.set_longitude_decimal_degrees(longitude_str)
 
-                speed_str = self.get_child_text_if_exists(tpt, "{*}speed")
-                course_str = self.get_child_text_if_exists(tpt, "{*}course")
-                elevation_str = self.get_child_text_if_exists(tpt, "{*}ele")
+            state.location = location
+            self.prev_location[track_name] = state.location
 
-                # Parse timestamp and create state
-                timestamp = parse(timestamp_str)
-                state = datafile.create_state(
-                    data_store, platform, sensor, timestamp, self.short_name
+            # Add course
+            if course_str is not None:
+                course = convert_absolute_angle(
+                    course_str, sourceline, self.errors, self.error_type
                 )
+                state.course = course
+
+            # Add speed (specified in metres per second in the file)
+            if speed_str is not None:
+                speed = convert_speed(
+                    speed_str,
+                    (unit_registry.metre / unit_registry.second),
+                    None,
+                    self.errors,
+                    self.error_type,
+                )
+                if speed:
+                    state.speed = speed
 
-                # Add location (no need to convert as it requires a string)
-                if track_name in self.prev_location:
-                    state.prev_location = self.prev_location[track_name]
-
-                location = Location(errors=self.errors, error_type=self.error_type)
-                location.set_latitude_decimal_degrees(latitude_str)
-                location.set_longitude_decimal_degrees(longitude_str)
-
-                state.location = location
-                self.prev_location[track_name] = state.location
-
-                # Add course
-                if course_str is not None:
-                    course = convert_absolute_angle(
-                        course_str, tpt.sourceline, self.errors, self.error_type
-                    )
-                    state.course = course
-
-                # Add speed (specified in metres per second in the file)
-                if speed_str is not None:
-                    speed = convert_speed(
-                        speed_str,
-                        (unit_registry.metre / unit_registry.second),
-                        None,
-                        self.errors,
-                        self.error_type,
+            if elevation_str is not None:
+                try:
+                    elevation = float(elevation_str)
+                except ValueError:
+                    self.errors.append(
+                        {
+                            self.error_type: f"Line {sourceline}. Error in elevation value {elevation_str}. "
+                            f"Couldn't convert to number"
+                        }
                     )
-                    if speed:
-                        state.speed = speed
-
-                if elevation_str is not None:
-                    try:
-                        elevation = float(elevation_str)
-                    except ValueError:
-                        self.errors.append(
-                            {
-                                self.error_type: f"Line {tpt.sourceline}. Error in elevation value {elevation_str}. "
-                                f"Couldn't convert to number"
-                            }
-                        )
-                    state.elevation = elevation * unit_registry.metre
-
-                state.privacy = privacy.privacy_id
+                state.elevation = elevation * unit_registry.metre
 
-    def get_child_text_if_exists(self, element, search_string):
-        child = element.find(search_string)
-        if child is not None:
-            return child.text
-        else:
-            return None
+            state.privacy = privacy.privacy_id
@@ -1,9 +1,12 @@
-from datetime import datetime
-
-from pepys_import.utils.unit_utils import convert_absolute_angle, convert_speed
+from pepys_import.utils.unit_utils import (
+    DEGREES_TO_RADIANS,
+    KNOTS_TO_METRES_PER_SECOND,
+    parse_absolute_angle,
+    parse_speed,
+)
 from pepys_import.file.highlighter.support.combine import combine_tokens
-from pepys_import.core.formats import unit_registry
 from pepys_import.core.formats.location import Location
+from pepys_import.core.formats.timestamp import parse_timestamp
 from pepys_import.core.validators import constants
 from pepys_import.file.importer import Importer
 
@@ -94,9 +97,7 @@ class NMEAImporter(Importer):
                     sensor_type = data_store.add_to_sensor_types(
                         "_GPS", change_id=change_id
                     )
-                    privacy = data_store.missing_data_resolver.resolve_privacy(
-                        data_store, change_id
-                    )
+                    privacy = data_store.resolve_privacy(change_id)
                     sensor = platform.get_sensor(
                         data_store=data_store,
                         sensor_name=platform.name,
@@ -143,22 +144,18 @@ class NMEAImporter(Importer):
                         self.name, "location", state.location, "DMS"
                     )
 
-                    heading = convert_absolute_angle(
+                    heading = parse_absolute_angle(
                         self.heading, line_number, self.errors, self.error_type
                     )
                     if heading:
-                        state.heading = heading
+                        state.set_si_values(heading=heading * DEGREES_TO_RADIANS)
                     self.heading_token.record(self.name, "heading", heading, "degrees")
 
-                    speed = convert_speed(
-                        self.speed,
-                        unit_registry.knots,
-                        line_number,
-                        self.errors,
-                        self.error_type,
+                    speed = parse_speed(
+                        self.speed, line_number, self.errors, self.error_type
                     )
                     if speed:
-                        state.speed = speed
+                        state.set_si_values(speed=speed * KNOTS_TO_METRES_PER_SECOND)
                     self.speed_token.record(self.name, "speed", speed, "knots")
 
                     state.privacy = privacy.privacy_id
@@ -175,14 +172,4 @@ class NMEAImporter(Importer):
 
     @staticmethod
     def parse_timestamp(date, time):
-        if len(date) == 6:
-            format_str = "%y%m%d"
-        else:
-            format_str = "%Y%m%d"
-
-        if len(time) == 6:
-            format_str += "%H%M%S"
-        else:
-            format_str += "%H%M%S.%f"
-
-        return datetime.strptime(date + time, format_str)
+        return parse_timestamp(date, time)
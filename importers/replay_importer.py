@@ -1,24 +1,33 @@
 import os
 
+import numpy as np
+
+from pepys_import.core.formats.location import Location
+from pepys_import.core.formats.rep_batch import parse_rep_states
 from pepys_import.core.formats.rep_line import REPLine
-from pepys_import.core.formats import unit_registry
 from pepys_import.core.validators import constants
-from pepys_import.file.importer import Importer
+from pepys_import.file.importer import LineImporter
+
+# Number of state lines of a streamed file parsed together
+STATE_BATCH_SIZE = 10000
 
 
-class ReplayImporter(Importer):
+class ReplayImporter(LineImporter):
     def __init__(
         self,
         name="Replay File Format Importer",
         validation_level=constants.ENHANCED_LEVEL,
         short_name="REP Importer",
         separator=" ",
+        batch_size=STATE_BATCH_SIZE,
     ):
         super().__init__(name, validation_level, short_name)
         self.separator = separator
+        self.batch_size = batch_size
         self.text_label = None
         self.depth = 0.0
         self.errors = list()
+        self.pending_lines = list()
 
     def can_load_this_type(self, suffix):
         return suffix.upper() == ".REP" or suffix.upper() == ".DSF"
@@ -32,52 +41,211 @@ class ReplayImporter(Importer):
     def can_load_this_file(self, file_contents):
         return True
 
+    def prepare_to_load(self, path, datafile):
+        super().prepare_to_load(path, datafile)
+        self.pending_lines = list()
+
     def _load_this_file(self, data_store, path, file_object, datafile, change_id):
         for line_number, line in enumerate(file_object.lines(), 1):
-            if line.text.startswith(";"):
+            self.load_this_line(data_store, line_number, line, datafile, change_id)
+        self.finish_loading(data_store, datafile, change_id)
+
+    def handles_line(self, text):
+        # state lines, as comments, contacts and narratives all start with ";"
+        return not text.startswith(";")
+
+    def _load_this_line(self, data_store, line_number, line, datafile, change_id):
+        if not line.highlighted_file.highlight:
+            # usages don't need to be recorded on the tokens of the lines of files
+            # which aren't highlighted, such as streamed files, so they are parsed
+            # in batches
+            self.pending_lines.append((line_number, line))
+            if len(self.pending_lines) >= self.batch_size:
+                self.load_pending_lines(data_store, datafile, change_id)
+            return
+
+        # create state, to store the data
+        rep_line = REPLine(line_number, line, self.separator)
+        # Store parsing errors in self.errors list
+        if not rep_line.parse(self.errors, self.error_type):
+            return
+        # and finally store it
+        self.add_state(
+            data_store,
+            datafile,
+            change_id,
+            rep_line.get_platform(),
+            rep_line.timestamp,
+            rep_line.speed,
+            rep_line.heading,
+            rep_line.depth,
+            rep_line.get_location(),
+        )
+
+    def finish_loading(self, data_store, datafile, change_id):
+        self.load_pending_lines(data_store, datafile, change_id)
+
+    def load_pending_lines(self, data_store, datafile, change_id):
+        """Parse the state lines waiting to be loaded together, with
+        :func:`parse_rep_states`, and add their states to the datafile as columns.
+        The lines it leaves without an error message are parsed by themselves, to
+        get their states or report their errors."""
+        pending_lines = self.pending_lines
+        self.pending_lines = list()
+        if not pending_lines:
+            return
+
+        batch = parse_rep_states(
+            [line.text for _, line in pending_lines],
+            [line_number for line_number, _ in pending_lines],
+        )
+        # rows of the batch whose states are added together, up to the next line
+        # parsed by itself, so that the states stay in the order of the lines
+        rows = list()
+        for row, valid in enumerate(batch.valid.tolist()):
+            if valid:
+                rows.append(row)
+                continue
+            if batch.errors[row] is not None:
+                self.errors.append({self.error_type: batch.errors[row]})
                 continue
-            else:
-                # create state, to store the data
-                rep_line = REPLine(line_number, line, self.separator)
-                # Store parsing errors in self.errors list
-                if not rep_line.parse(self.errors, self.error_type):
-                    continue
-                # and finally store it
-                vessel_name = rep_line.get_platform()
-                platform = data_store.get_platform(
-                    platform_name=vessel_name,
-                    nationality="UK",
-                    platform_type="Fisher",
-                    privacy="Public",
-                    change_id=change_id,
-                )
 
-                sensor_type = data_store.add_to_sensor_types(
-                    "_GPS", change_id=change_id
-                )
-                privacy = data_store.missing_data_resolver.resolve_privacy(
-                    data_store, change_id
+            line_number, line = pending_lines[row]
+            rep_line = REPLine(line_number, line, self.separator)
+            try:
+                parsed = rep_line.parse(self.errors, self.error_type)
+            except ValueError as error:
+                # such as a date or time in the right layout which doesn't exist,
+                # so that the rest of the file can still be loaded
+                self.errors.append(
+                    {
+                        self.error_type: f"Error on line {line_number}. {error}: "
+                        f"{line.text}"
+                    }
                 )
-                sensor = platform.get_sensor(
-                    data_store=data_store,
-                    sensor_name=platform.name,
-                    sensor_type=sensor_type,
-                    privacy=privacy.name,
-                    change_id=change_id,
-                )
-                state = datafile.create_state(
-                    data_store, platform, sensor, rep_line.timestamp, self.short_name
+                continue
+            if not parsed:
+                continue
+            self.add_state_columns(data_store, datafile, change_id, batch, rows)
+            rows = list()
+            self.add_state(
+                data_store,
+                datafile,
+                change_id,
+                rep_line.get_platform(),
+                rep_line.timestamp,
+                rep_line.speed,
+                rep_line.heading,
+                rep_line.depth,
+                rep_line.get_location(),
+            )
+        self.add_state_columns(data_store, datafile, change_id, batch, rows)
+
+    def add_state_columns(self, data_store, datafile, change_id, batch, rows):
+        """Add the states of the given rows of a batch, as columns. Platforms and
+        sensors are resolved once for each vessel"""
+        if not rows:
+            return
+        sensors = dict()
+        sensor_ids = list()
+        platform_names = list()
+        sensor_names = list()
+        prev_latitudes = np.full(len(rows), np.nan)
+        prev_longitudes = np.full(len(rows), np.nan)
+        # index of the last state of each vessel, in rows
+        last_states = dict()
+        for index, row in enumerate(rows):
+            vessel_name = batch.vessels[row]
+            if vessel_name not in sensors:
+                platform, sensor, _ = self.resolve_sensor(
+                    data_store, vessel_name, change_id
                 )
-                state.elevation = (-1 * rep_line.depth) * unit_registry.metre
-                state.heading = rep_line.heading
-                state.speed = rep_line.speed
-                state.privacy = privacy.privacy_id
+                sensors[vessel_name] = (sensor.sensor_id, platform.name, sensor.name)
+            sensor_id, platform_name, sensor_name = sensors[vessel_name]
+            sensor_ids.append(sensor_id)
+            platform_names.append(platform_name)
+            sensor_names.append(sensor_name)
+
+            if vessel_name in last_states:
+                prev_row = rows[last_states[vessel_name]]
+                prev_latitudes[index] = batch.latitudes[prev_row]
+                prev_longitudes[index] = batch.longitudes[prev_row]
+            elif vessel_name in self.prev_location:
+                prev_latitudes[index] = self.prev_location[vessel_name].latitude
+                prev_longitudes[index] = self.prev_location[vessel_name].longitude
+            last_states[vessel_name] = index
+
+        rows = np.array(rows)
+        datafile.create_state_columns(
+            data_store,
+            self.short_name,
+            sensor_ids=sensor_ids,
+            platform_names=platform_names,
+            sensor_names=sensor_names,
+            times=batch.times[rows],
+            latitudes=batch.latitudes[rows],
+            longitudes=batch.longitudes[rows],
+            headings=batch.headings[rows],
+            speeds=batch.speeds[rows],
+            elevations=-1 * batch.depths[rows],
+            prev_latitudes=prev_latitudes,
+            prev_longitudes=prev_longitudes,
+        )
+        for vessel_name, index in last_states.items():
+            location = Location(self.errors, self.error_type)
+            location.set_latitude_decimal_degrees(batch.latitudes[rows[index]])
+            location.set_longitude_decimal_degrees(batch.longitudes[rows[index]])
+            self.prev_location[vessel_name] = location
+
+    def resolve_sensor(self, data_store, vessel_name, change_id):
+        """The platform of the vessel, its GPS sensor, and the privacy of its states"""
+        platform = data_store.get_platform(
+            platform_name=vessel_name,
+            nationality="UK",
+            platform_type="Fisher",
+            privacy="Public",
+            change_id=change_id,
+        )
+
+        sensor_type = data_store.add_to_sensor_types("_GPS", change_id=change_id)
+        privacy = data_store.resolve_privacy(change_id)
+        sensor = platform.get_sensor(
+            data_store=data_store,
+            sensor_name=platform.name,
+            sensor_type=sensor_type,
+            privacy=privacy.name,
+            change_id=change_id,
+        )
+        return platform, sensor, privacy
+
+    def add_state(
+        self,
+        data_store,
+        datafile,
+        change_id,
+        vessel_name,
+        timestamp,
+        speed,
+        heading,
+        depth,
+        location,
+    ):
+        """Add the state of a line, with its speed, heading and depth in SI units"""
+        platform, sensor, privacy = self.resolve_sensor(
+            data_store, vessel_name, change_id
+        )
+        state = datafile.create_state(
+            data_store, platform, sensor, timestamp, self.short_name
+        )
+        # the values of REP lines are in SI units already
+        state.set_si_values(speed=speed, heading=heading, elevation=-1 * depth)
+        state.privacy = privacy.privacy_id
 
-                if vessel_name in self.prev_location:
-                    state.prev_location = self.prev_location[vessel_name]
+        if vessel_name in self.prev_location:
+            state.prev_location = self.prev_location[vessel_name]
 
-                state.location = rep_line.get_location()
-                self.prev_location[vessel_name] = state.location
+        state.location = location
+        self.prev_location[vessel_name] = state.location
 
     @staticmethod
     def degrees_for(degs, mins, secs, hemi: str):
@@ -8,9 +8,26 @@ import argparse  # noqa: E402
 import cmd  # noqa: E402
 from iterfzf import iterfzf  # noqa: E402
 import os  # noqa: E402
+from datetime import datetime  # noqa: E402
 from pepys_import.core.store.data_store import DataStore  # noqa: E402
 
 dirpath = os.path.dirname(os.path.abspath(__file__))
+# Format of the times of the window of "Export all"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_export_time(text):
+    """
+    Parse an optional time of the window of "Export all".
+
+    :param text: Time in TIME_FORMAT, or an empty string
+    :type text: String
+    :return: The time, or None if no time was given
+    :rtype: datetime
+    """
+    if not text.strip():
+        return None
+    return datetime.strptime(text.strip(), TIME_FORMAT)
 
 
 def create_postgres_data_store():
@@ -110,7 +127,10 @@ class InitialiseShell(cmd.Cmd):
 
 
 class AdminShell(cmd.Cmd):
-    intro = "\n--- Menu --- \n (1) Export\n " "(2) Initialise\n (3) Status\n (0) Exit\n"
+    intro = (
+        "\n--- Menu --- \n (1) Export\n "
+        "(2) Initialise\n (3) Status\n (4) Export all\n (0) Exit\n"
+    )
     prompt = "(pepys-admin) "
 
     def __init__(self, datastore, csv_path=dirpath):
@@ -122,6 +142,7 @@ class AdminShell(cmd.Cmd):
             "1": self.do_export,
             "2": self.do_initialise,
             "3": self.do_status,
+            "4": self.do_export_all,
         }
 
     def do_export(self, arg):
@@ -148,6 +169,23 @@ class AdminShell(cmd.Cmd):
             with self.datastore.session_scope():
                 self.datastore.export_datafile(selected_datafile_id, datafilename)
 
+    def do_export_all(self, arg):
+        "Export every datafile, or those with measurements in a time window"
+        folder = input("Folder to export the REP files to (default: current)\n")
+        folder = folder or "."
+        try:
+            start = parse_export_time(input(f"Start time ({TIME_FORMAT}, optional)\n"))
+            end = parse_export_time(input(f"End time ({TIME_FORMAT}, optional)\n"))
+        except ValueError:
+            print(f"Times must be given as {TIME_FORMAT}")
+            return
+
+        os.makedirs(folder, exist_ok=True)
+        paths = self.datastore.export_datafiles(
+            folder, start=start, end=end, workers=os.cpu_count() or 1
+        )
+        print("Exported {} Datafiles to {}.".format(len(paths), folder))
+
     def do_initialise(self, arg):
         "Allow the currently connected database to be configured"
         initialise = InitialiseShell(self.datastore, self, self.csv_path)
@@ -0,0 +1,107 @@
+import struct
+
+# Spatial reference of all stored locations (WGS 84)
+SRID = 4326
+# Flag of the EWKB geometry type telling that an SRID follows it
+SRID_FLAG = 0x20000000
+POINT = 1
+
+# Little endian byte order mark, point type with the SRID flag, SRID, x, y
+EWKB_POINT = struct.Struct("<BIIdd")
+# Start of the points written by encode_point, which can be decoded in one go
+EWKB_POINT_PREFIX = EWKB_POINT.pack(1, POINT | SRID_FLAG, SRID, 0, 0)[:9]
+COORDINATES = {"<": struct.Struct("<dd"), ">": struct.Struct(">dd")}
+GEOMETRY_TYPE = {"<": struct.Struct("<I"), ">": struct.Struct(">I")}
+
+EWKT_PREFIX = f"SRID={SRID};POINT("
+
+
+def encode_point(longitude, latitude):
+    """Encode a point as hexadecimal EWKB, with SRID 4326
+
+    :param longitude: Longitude in decimal degrees
+    :type longitude: float
+    :param latitude: Latitude in decimal degrees
+    :type latitude: float
+    :return: Hexadecimal EWKB
+    :rtype: String
+    """
+    return EWKB_POINT.pack(1, POINT | SRID_FLAG, SRID, longitude, latitude).hex()
+
+
+def decode_point(value):
+    """Decode a point from (E)WKB, in either byte order and with or without SRID
+
+    :param value: (E)WKB, as bytes or hexadecimal
+    :type value: bytes or String
+    :return: Longitude and latitude
+    :rtype: Tuple
+    """
+    if isinstance(value, str):
+        value = bytes.fromhex(value)
+    elif not isinstance(value, bytes):
+        value = bytes(value)
+    if value[:9] == EWKB_POINT_PREFIX and len(value) == EWKB_POINT.size:
+        return COORDINATES["<"].unpack_from(value, 9)
+
+    byte_order = "<" if value[0] == 1 else ">"
+    (geometry_type,) = GEOMETRY_TYPE[byte_order].unpack_from(value, 1)
+    if geometry_type & ~SRID_FLAG != POINT:
+        raise ValueError(f"Geometry type {geometry_type:#x} is not a 2D point")
+    offset = 9 if geometry_type & SRID_FLAG else 5
+    return COORDINATES[byte_order].unpack_from(value, offset)
+
+
+def encode_points(longitudes, latitudes):
+    """Encode points as hexadecimal EWKB, see :func:`encode_point`
+
+    :param longitudes: Longitudes in decimal degrees
+    :type longitudes: Iterable
+    :param latitudes: Latitudes in decimal degrees, in the same order
+    :type latitudes: Iterable
+    :return: Hexadecimal EWKB of each point
+    :rtype: List
+    """
+    pack = EWKB_POINT.pack
+    flags = POINT | SRID_FLAG
+    return [
+        pack(1, flags, SRID, longitude, latitude).hex()
+        for longitude, latitude in zip(longitudes, latitudes)
+    ]
+
+
+def decode_points(values):
+    """Decode points from (E)WKB, see :func:`decode_point`
+
+    :param values: (E)WKB of each point, as bytes or hexadecimal
+    :type values: Iterable
+    :return: Longitudes and latitudes, in the order of the points
+    :rtype: Tuple
+    """
+    longitudes = list()
+    latitudes = list()
+    for value in values:
+        longitude, latitude = decode_point(value)
+        longitudes.append(longitude)
+        latitudes.append(latitude)
+    return longitudes, latitudes
+
+
+def parse_ewkt_point(text):
+    """Read the coordinates of an EWKT point, as written by :meth:`Location.to_wkt`
+
+    :param text: EWKT, e.g. "SRID=4326;POINT(-1.25 50.5)"
+    :type text: String
+    :return: Longitude and latitude
+    :rtype: Tuple
+    """
+    start = len(EWKT_PREFIX)
+    longitude, latitude = text[start:-1].split()
+    return float(longitude), float(latitude)
+
+
+def ewkt_to_ewkb(text):
+    """Convert an EWKT point, as written by :meth:`Location.to_wkt`, to hexadecimal
+    EWKB without going through a geometry library
+    """
+    return encode_point(*parse_ewkt_point(text))
@@ -1,4 +1,8 @@
-from shapely import wkb
+from pepys_import.core.formats.ewkb import (
+    decode_point,
+    encode_point,
+    parse_ewkt_point,
+)
 
 
 class Location:
@@ -213,17 +217,15 @@ class Location:
     def to_wkt(self):
         return f"SRID=4326;POINT({self.longitude} {self.latitude})"
 
-    def set_from_wkb(self, wkb_string):
-        point = wkb.loads(wkb_string, hex=True)
+    def to_ewkb(self):
+        """Return the location as a hexadecimal EWKB point, with SRID 4326"""
+        return encode_point(self.longitude, self.latitude)
 
-        self._longitude = point.x
-        self._latitude = point.y
+    def set_from_wkb(self, wkb_string):
+        self._longitude, self._latitude = decode_point(wkb_string)
 
     def set_from_wkt_string(self, wkt_string):
-        longitude, latitude = wkt_string[16:-1].split()
-
-        self._latitude = float(latitude)
-        self._longitude = float(longitude)
+        self._longitude, self._latitude = parse_ewkt_point(wkt_string)
 
     def check_valid(self):
         if self._latitude is None:
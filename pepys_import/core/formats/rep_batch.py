@@ -0,0 +1,188 @@
+import numpy as np
+
+from pepys_import.core.formats.timestamp import parse_timestamps
+from pepys_import.utils.unit_utils import DEGREES_TO_RADIANS, KNOTS_TO_METRES_PER_SECOND
+
+# Number of tokens of a REP state line, before its optional text label
+STATE_TOKENS = 15
+
+
+class REPStateBatch:
+    """
+    Columns of the states parsed from a block of REP state lines by
+    :func:`parse_rep_states`, in the order of the lines.
+
+    Values are in SI units, as with :class:`REPLine`: radians, metres per second
+    and metres. Times are a datetime64[us] column, and the location a column of
+    latitudes and one of longitudes, in decimal degrees.
+
+    Rows whose ``valid`` flag is False weren't parsed, and hold placeholder values.
+    Those with an error the batch checks for, such as too few tokens or a date or
+    time of the wrong length, have its message in ``errors``, the same message
+    REPLine gives. The others are lines with some other error or oddity, which must
+    be parsed with :class:`REPLine` to get the result (and error messages) of a line
+    by itself.
+    """
+
+    def __init__(self, size):
+        self.valid = np.zeros(size, dtype=bool)
+        self.errors = [None] * size
+        self.times = np.zeros(size, dtype="datetime64[us]")
+        self.vessels = [None] * size
+        self.symbologies = [None] * size
+        self.latitudes = np.zeros(size)
+        self.longitudes = np.zeros(size)
+        self.headings = np.zeros(size)
+        self.speeds = np.zeros(size)
+        self.depths = np.zeros(size)
+
+    def __len__(self):
+        return len(self.valid)
+
+
+def parse_rep_states(texts, line_numbers=None):
+    """
+    Parse a block of REP state lines into columns, with vectorised conversions of
+    their dates, times, positions and values instead of parsing each line in turn.
+
+    A row is only marked valid when the line is in the usual layout, with a date
+    and time of fixed width, so that it gives exactly the values REPLine.parse
+    would give it. Lines with too few tokens, or a date or time of the wrong length,
+    get the error message REPLine would give them. Other lines, including those
+    with other errors, are left for REPLine.
+
+    :param texts: Text of each line
+    :type texts: List
+    :param line_numbers: Number of each line in its file, for the error messages.
+    Numbered from 1 if not given
+    :type line_numbers: List
+    :return: Columns of the states
+    :rtype: REPStateBatch
+    """
+    if line_numbers is None:
+        line_numbers = range(1, len(texts) + 1)
+    batch = REPStateBatch(len(texts))
+    tokens = [text.split() for text in texts]
+    token_counts = np.fromiter(map(len, tokens), dtype=np.int64, count=len(tokens))
+    for row in np.flatnonzero(token_counts < STATE_TOKENS).tolist():
+        message = f"Error on line {line_numbers[row]}. Not enough tokens: {texts[row]}"
+        batch.errors[row] = message
+    rows = np.flatnonzero(token_counts >= STATE_TOKENS)
+    if len(rows) == 0:
+        return batch
+    if len(rows) < len(tokens):
+        tokens = [tokens[row] for row in rows.tolist()]
+    # the i-th token of each line (and of the text labels, which are left out)
+    columns = list(zip(*tokens))[:STATE_TOKENS]
+
+    valid = np.ones(len(rows), dtype=bool)
+
+    times, ok = parse_timestamps(columns[0], columns[1])
+    valid &= ok
+    for index in np.flatnonzero(~ok).tolist():
+        row = rows[index]
+        batch.errors[row] = _timestamp_error(
+            line_numbers[row], columns[0][index], columns[1][index]
+        )
+
+    vessels = [vessel.strip('"') for vessel in columns[2]]
+    symbologies = columns[3]
+    valid &= np.fromiter(
+        map(_valid_symbology, symbologies), dtype=bool, count=len(rows)
+    )
+
+    latitudes, ok = _parse_dms(columns[4:8], 90, ("N", "S"))
+    valid &= ok
+    longitudes, ok = _parse_dms(columns[8:12], 180, ("E", "W"))
+    valid &= ok
+
+    headings, ok = _parse_floats(columns[12])
+    valid &= ok
+    headings = np.where(headings < 0, headings + 360, headings)
+    headings = np.where(headings > 360, headings - 360, headings)
+    speeds, ok = _parse_floats(columns[13])
+    valid &= ok
+    # REPLine rejects headings and speeds of zero, without an error
+    valid &= (headings != 0) & (speeds != 0)
+    valid &= ~np.isnan(headings) & ~np.isnan(speeds)
+    depths, ok = _parse_floats(columns[14])
+    valid &= ok
+
+    batch.valid[rows] = valid
+    batch.times[rows[valid]] = times[valid]
+    batch.latitudes[rows] = latitudes
+    batch.longitudes[rows] = longitudes
+    batch.headings[rows] = headings * DEGREES_TO_RADIANS
+    batch.speeds[rows] = speeds * KNOTS_TO_METRES_PER_SECOND
+    batch.depths[rows] = depths
+    if len(rows) == len(batch):
+        batch.vessels = vessels
+        batch.symbologies = list(symbologies)
+    else:
+        for row, vessel, symbology in zip(rows.tolist(), vessels, symbologies):
+            batch.vessels[row] = vessel
+            batch.symbologies[row] = symbology
+    return batch
+
+
+def _timestamp_error(line_number, date, time):
+    """The error message REPLine gives a date or time of the wrong length, if any"""
+    if len(date) != 6 and len(date) != 8:
+        return (
+            f"Error on line {line_number}. Date format {date} should be either 2 of 4 "
+            f"figure date, followed by month then date"
+        )
+    if len(time) != 6 and len(time) != 10:
+        return (
+            f"Line {line_number}. Error in Time format {time}. Should be HHMMSS[.SSS]"
+        )
+    return None
+
+
+def _parse_floats(strings):
+    """Convert strings to floats as float() does, with a flag for each of whether
+    it could be converted"""
+    count = len(strings)
+    try:
+        return np.fromiter(map(float, strings), dtype=float, count=count), True
+    except ValueError:
+        values = np.zeros(count)
+        ok = np.ones(count, dtype=bool)
+        for index, string in enumerate(strings):
+            try:
+                values[index] = float(string)
+            except ValueError:
+                ok[index] = False
+        return values, ok
+
+
+def _in_range(values, minimum, maximum):
+    # unlike the checks of Location, this leaves out NaN, which is left to REPLine
+    return (values >= minimum) & (values <= maximum)
+
+
+def _parse_dms(columns, max_degrees, hemispheres):
+    """Decimal degrees of the degrees, minutes, seconds and hemisphere columns of
+    latitudes or longitudes, checked as Location.set_latitude_dms does"""
+    degrees_strings, minutes_strings, seconds_strings, hemisphere_strings = columns
+    degrees, ok = _parse_floats(degrees_strings)
+    valid = ok & _in_range(degrees, -max_degrees, max_degrees)
+    minutes, ok = _parse_floats(minutes_strings)
+    valid &= ok & _in_range(minutes, 0, 60)
+    seconds, ok = _parse_floats(seconds_strings)
+    valid &= ok & _in_range(seconds, 0, 60)
+
+    hemisphere = np.array([value.upper() for value in hemisphere_strings])
+    valid &= (hemisphere == hemispheres[0]) | (hemisphere == hemispheres[1])
+
+    decimal_degrees = degrees + (minutes / 60) + (seconds / 3600)
+    decimal_degrees[hemisphere == hemispheres[1]] *= -1
+    # REPLine keeps positions beyond the pole or the antimeridian, such as 90 30 0 N,
+    # but they can't be given to Location as decimal degrees, so are left to it
+    valid &= _in_range(decimal_degrees, -max_degrees, max_degrees)
+    return decimal_degrees, valid
+
+
+def _valid_symbology(symbology):
+    symbology_values = symbology.split("[")
+    return len(symbology_values) <= 2 and len(symbology_values[0]) in (2, 5)
@@ -1,24 +1,15 @@
-from datetime import datetime
 from .location import Location
+from .timestamp import parse_timestamp
 from . import unit_registry
-from pepys_import.utils.unit_utils import convert_absolute_angle, convert_speed
+from pepys_import.utils.unit_utils import (
+    DEGREES_TO_RADIANS,
+    KNOTS_TO_METRES_PER_SECOND,
+    parse_absolute_angle,
+    parse_speed,
+)
 from pepys_import.file.highlighter.support.combine import combine_tokens
 
 
-def parse_timestamp(date, time):
-    if len(date) == 6:
-        format_str = "%y%m%d"
-    else:
-        format_str = "%Y%m%d"
-
-    if len(time) == 6:
-        format_str += "%H%M%S"
-    else:
-        format_str += "%H%M%S.%f"
-
-    return datetime.strptime(date + time, format_str)
-
-
 class REPLine:
     def __init__(self, line_number, line, separator):
         self.importer_name = "Replay File Format Importer"
@@ -31,6 +22,7 @@ class REPLine:
         self.vessel = None
         self.symbology = None
         self.location = None
+        # in SI units: radians and metres per second
         self.heading = None
         self.speed = None
         self.depth = None
@@ -156,22 +148,20 @@ class REPLine:
             long_degrees_token, long_mins_token, long_secs_token, long_hemi_token
         ).record(self.importer_name, "longitude", self.location, "DMS")
 
-        heading = convert_absolute_angle(
+        heading = parse_absolute_angle(
             heading_token.text, self.line_num, errors, error_type
         )
         if not heading:
             return False
 
-        self.heading = heading
-        heading_token.record(self.importer_name, "heading", self.heading, "degrees")
+        self.heading = heading * DEGREES_TO_RADIANS
+        heading_token.record(self.importer_name, "heading", heading, "degrees")
 
-        speed = convert_speed(
-            speed_token.text, unit_registry.knots, self.line_num, errors, error_type
-        )
+        speed = parse_speed(speed_token.text, self.line_num, errors, error_type)
         if not speed:
             return False
-        self.speed = speed
-        speed_token.record(self.importer_name, "speed", self.speed, "knots")
+        self.speed = speed * KNOTS_TO_METRES_PER_SECOND
+        speed_token.record(self.importer_name, "speed", speed, "knots")
 
         try:
             if depth_token == "NaN":
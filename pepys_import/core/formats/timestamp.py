@@ -0,0 +1,225 @@
+from datetime import datetime
+from functools import lru_cache
+from itertools import product
+
+import numpy as np
+
+# Number of distinct dates whose parsed values are kept. Files usually have the same
+# date on thousands of lines in a row, so a small cache will do
+DATE_CACHE_SIZE = 1024
+
+# Values of the fields of times, by their text, which also tells which texts are
+# valid, without converting and checking each field
+DIGITS = "0123456789"
+HOURS = {f"{hour:02d}": hour for hour in range(24)}
+MINUTES = {f"{minute:02d}": minute for minute in range(60)}
+# microseconds of fractions of a second of up to three digits, as read by %f
+MICROSECONDS = {
+    "".join(digits): int("".join(digits).ljust(6, "0"))
+    for length in range(1, 4)
+    for digits in product(DIGITS, repeat=length)
+}
+
+
+def parse_timestamp(date, time):
+    """
+    Parse a date written as YYMMDD or YYYYMMDD and a time written as HHMMSS or
+    HHMMSS.SSS, as in REP and NMEA files.
+
+    The fields of timestamps in these layouts are sliced out of the strings, with
+    the date parsed once for all the timestamps on that day, rather than going
+    through strptime, which is slow. Other strings go through strptime with the
+    format the layout would have, so the result (or the ValueError raised) is
+    always the same as strptime's.
+
+    :param date: Date, as YYMMDD or YYYYMMDD
+    :type date: String
+    :param time: Time, as HHMMSS or HHMMSS followed by a fraction of a second
+    :type time: String
+    :return: Timestamp
+    :rtype: datetime
+    """
+    parsed_date = _parse_compact_date(date)
+    if parsed_date is not None:
+        hour = HOURS.get(time[0:2])
+        minute = MINUTES.get(time[2:4])
+        second = MINUTES.get(time[4:6])
+        if len(time) == 6:
+            microsecond = 0
+        elif time[6:7] == ".":
+            microsecond = MICROSECONDS.get(time[7:])
+        else:
+            microsecond = None
+        if (
+            hour is not None
+            and minute is not None
+            and second is not None
+            and microsecond is not None
+        ):
+            try:
+                return datetime(*parsed_date, hour, minute, second, microsecond)
+            except ValueError:
+                # a day beyond the end of the month, which strptime reports
+                pass
+
+    if len(date) == 6:
+        format_str = "%y%m%d"
+    else:
+        format_str = "%Y%m%d"
+
+    if len(time) == 6:
+        format_str += "%H%M%S"
+    else:
+        format_str += "%H%M%S.%f"
+
+    return datetime.strptime(date + time, format_str)
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_compact_date(date):
+    """Year, month and day of a date written as YYMMDD or YYYYMMDD, or None if it
+    isn't in this layout, or the month or day are out of range"""
+    if len(date) not in (6, 8) or not _is_number(date):
+        return None
+    year, month_day = divmod(int(date), 10000)
+    month, day = divmod(month_day, 100)
+    if len(date) == 6:
+        # as %y, years from 69 are in the 20th century
+        year += 2000 if year < 69 else 1900
+    if not (1 <= month <= 12 and 1 <= day <= 31) or year == 0:
+        return None
+    return year, month, day
+
+
+def parse_delimited_timestamp(date, time):
+    """
+    Parse a date written as YYYY/MM/DD and a time written as HH:MM:SS, as in E-Trac
+    files, ignoring whitespace around them.
+
+    As with :func:`parse_timestamp`, the fields are sliced out of the strings in this
+    layout, and other strings go through strptime.
+
+    :param date: Date, as YYYY/MM/DD
+    :type date: String
+    :param time: Time, as HH:MM:SS
+    :type time: String
+    :return: Timestamp
+    :rtype: datetime
+    """
+    parsed_date = _parse_delimited_date(date)
+    time = time.strip()
+    if parsed_date is not None and len(time) == 8 and time[2] == ":" and time[5] == ":":
+        hour = HOURS.get(time[0:2])
+        minute = MINUTES.get(time[3:5])
+        second = MINUTES.get(time[6:8])
+        if hour is not None and minute is not None and second is not None:
+            try:
+                return datetime(*parsed_date, hour, minute, second)
+            except ValueError:
+                # a day beyond the end of the month, which strptime reports
+                pass
+
+    return datetime.strptime(date.strip() + " " + time, "%Y/%m/%d %H:%M:%S")
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_delimited_date(date):
+    """Year, month and day of a date written as YYYY/MM/DD, with whitespace around
+    it, or None if it isn't in this layout, or the month or day are out of range"""
+    date = date.strip()
+    if len(date) != 10 or date[4] != "/" or date[7] != "/":
+        return None
+    digits = date[0:4] + date[5:7] + date[8:10]
+    if not _is_number(digits):
+        return None
+    year, month_day = divmod(int(digits), 10000)
+    month, day = divmod(month_day, 100)
+    if not (1 <= month <= 12 and 1 <= day <= 31) or year == 0:
+        return None
+    return year, month, day
+
+
+def _is_number(text):
+    # only ASCII digits, which are all strptime takes in most fields
+    return all(character in DIGITS for character in text)
+
+
+def _digits(strings, width):
+    """Matrix of the digits of the first width characters of each string, with -1
+    for characters which aren't digits"""
+    codes = np.array(strings, dtype=f"U{width}").view(np.uint32)
+    digits = codes.reshape(len(strings), width).astype(np.int64) - ord("0")
+    digits[(digits < 0) | (digits > 9)] = -1
+    return digits
+
+
+def _number(digits, start, end):
+    """Number written by the digits in the given columns of the matrix"""
+    return digits[:, start:end] @ (10 ** np.arange(end - start - 1, -1, -1))
+
+
+def parse_timestamps(dates, times):
+    """
+    Vectorised :func:`parse_timestamp`, for columns of dates and times.
+
+    Only dates of the form YYMMDD or YYYYMMDD and times of the form HHMMSS or
+    HHMMSS.SSS are parsed. The others are flagged, to be parsed one at a time.
+
+    :param dates: Date of each timestamp
+    :type dates: Sequence
+    :param times: Time of each timestamp
+    :type times: Sequence
+    :return: datetime64[us] column of the timestamps, and a flag for each of whether
+    it was parsed
+    :rtype: Tuple
+    """
+    count = len(dates)
+    date_lengths = np.fromiter(map(len, dates), dtype=np.int64, count=count)
+    time_lengths = np.fromiter(map(len, times), dtype=np.int64, count=count)
+    long_dates = date_lengths == 8
+    long_times = time_lengths == 10
+    valid = (long_dates | (date_lengths == 6)) & (long_times | (time_lengths == 6))
+    # strings of other lengths are cut short or padded, and then not used
+    date_digits = _digits(dates, 8)
+    time_digits = _digits(times, 10)
+    decimal_points = np.array(times, dtype="U10").view(np.uint32)[6::10] == ord(".")
+
+    # the last two digits aren't there, in the short form
+    date_digit_count = np.where(long_dates, 8, 6)
+    valid &= ((date_digits >= 0) | (np.arange(8) >= date_digit_count[:, None])).all(
+        axis=1
+    )
+    valid &= (time_digits[:, :6] >= 0).all(axis=1)
+    valid &= ~long_times | (decimal_points & (time_digits[:, 7:] >= 0).all(axis=1))
+
+    short_years = _number(date_digits, 0, 2)
+    # as %y, years from 69 are in the 20th century
+    year = np.where(
+        long_dates,
+        _number(date_digits, 0, 4),
+        short_years + np.where(short_years < 69, 2000, 1900),
+    )
+    month = np.where(long_dates, _number(date_digits, 4, 6), _number(date_digits, 2, 4))
+    day = np.where(long_dates, _number(date_digits, 6, 8), _number(date_digits, 4, 6))
+    hour = _number(time_digits, 0, 2)
+    minute = _number(time_digits, 2, 4)
+    second = _number(time_digits, 4, 6)
+    microsecond = np.where(long_times, _number(time_digits, 7, 10) * 1000, 0)
+
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    valid &= (hour <= 23) & (minute <= 59) & (second <= 59)
+    # leave out what wasn't parsed, so that the arithmetic below can't overflow
+    year = np.where(valid, year, 1970)
+    month = np.where(valid, month, 1)
+    day = np.where(valid, day, 1)
+
+    month_start = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+    date = month_start.astype("datetime64[D]") + (day - 1)
+    # the day must be in the month, e.g. not the 31st of April
+    valid &= date.astype("datetime64[M]") == month_start
+
+    seconds = hour * 3600 + minute * 60 + second
+    timestamps = date.astype("datetime64[us]") + (
+        seconds * 1000000 + microsecond
+    ).astype("timedelta64[us]")
+    return timestamps, valid
@@ -1,3 +1,5 @@
+from itertools import chain
+
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from pepys_import.core.formats import unit_registry
@@ -10,6 +12,7 @@ from pepys_import.core.validators.enhanced_validator import EnhancedValidator
 from pepys_import.utils.import_utils import import_validators
 
 from pepys_import.core.formats.location import Location
+from pepys_import.core.store.state_columns import StateColumns
 
 
 LOCAL_BASIC_VALIDATORS = import_validators(LOCAL_BASIC_TESTS)
@@ -100,6 +103,9 @@ class PlatformMixin:
         :return: Created :class:`Sensor` entity
         :rtype: Sensor
         """
+        return data_store.get_sensor(self, sensor_name, sensor_type, privacy, change_id)
+
+    def _get_sensor(self, data_store, sensor_name, sensor_type, privacy, change_id):
         Sensor = data_store.db_classes.Sensor
 
         sensor = Sensor().find_sensor(data_store, sensor_name, self.platform_id)
@@ -141,6 +147,22 @@ class DatafileMixin:
         self.measurements[parser_name].append(state)
         return state
 
+    def create_state_columns(self, data_store, parser_name, **columns):
+        """Add states held as columns, see :class:`StateColumns` for the columns
+
+        :param data_store: A :class:`DataStore` object
+        :type data_store: DataStore
+        :param parser_name: Name of the importer which parsed the states
+        :type parser_name: String
+        :return: The columns of the states
+        :rtype: StateColumns
+        """
+        state_columns = StateColumns(
+            data_store.db_classes.State, self.datafile_id, **columns
+        )
+        self.measurements[parser_name].append(state_columns)
+        return state_columns
+
     def create_contact(self, data_store, platform, sensor, timestamp, parser_name):
         contact = data_store.db_classes.Contact(
             sensor_id=sensor.sensor_id, time=timestamp, source_id=self.datafile_id
@@ -180,7 +202,7 @@ class DatafileMixin:
         if validation_level == validation_constants.NONE_LEVEL:
             return True
         elif validation_level == validation_constants.BASIC_LEVEL:
-            for measurement in self.measurements[parser]:
+            for measurement in self.measurements_to_validate(parser, validation_level):
                 BasicValidator(measurement, errors, parser)
                 for basic_validator in LOCAL_BASIC_VALIDATORS:
                     basic_validator(measurement, errors, parser)
@@ -188,7 +210,7 @@ class DatafileMixin:
                 return True
             return False
         elif validation_level == validation_constants.ENHANCED_LEVEL:
-            for measurement in self.measurements[parser]:
+            for measurement in self.measurements_to_validate(parser, validation_level):
                 BasicValidator(measurement, errors, parser)
                 for basic_validator in LOCAL_BASIC_VALIDATORS:
                     basic_validator(measurement, errors, parser)
@@ -199,17 +221,86 @@ class DatafileMixin:
                 return True
             return False
 
-    def commit(self, data_store, change_id):
+    def measurements_to_validate(self, parser, validation_level):
+        """Yield the measurements of the importer to be validated. States held as
+        columns are given as :class:`State` objects, but only for the rows which may
+        not pass the validators, unless there are local validators to run as well
+
+        :param parser: Name of the importer
+        :type parser: String
+        :param validation_level: Validation level
+        :type validation_level: String
+        :rtype: Iterator
+        """
+        for measurement in self.measurements[parser]:
+            if not isinstance(measurement, StateColumns):
+                yield measurement
+                continue
+            if LOCAL_BASIC_VALIDATORS or LOCAL_ENHANCED_VALIDATORS:
+                rows = range(len(measurement))
+            else:
+                rows = measurement.rows_to_validate(validation_level)
+            for row in rows:
+                yield measurement.create_state(row)
+
+    def commit(self, data_store, change_id, batch_size=None):
+        """Submit the measurements of all importers to the DB
+
+        :param data_store: A :class:`DataStore` object
+        :type data_store: DataStore
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :param batch_size: If given, measurements and their logs are inserted in
+        batches of this many rows, otherwise they are submitted one by one
+        :type batch_size: Integer
+        :return: Extraction log, a line for each importer
+        :rtype: List
+        """
+        counts = self.submit_measurements(data_store, change_id, batch_size)
+        # measurement tables which aren't logged by row get a Log for the whole file
+        data_store.add_measurement_logs(
+            chain.from_iterable(self.measurements.values()), change_id
+        )
+        return self.extraction_log(counts)
+
+    def submit_measurements(self, data_store, change_id, batch_size=None):
+        """Submit the measurements of all importers to the DB, as :meth:`commit`
+        does, but without the Logs of the tables logged by datafile
+
+        :param data_store: A :class:`DataStore` object
+        :type data_store: DataStore
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :param batch_size: If given, measurements and their logs are inserted in
+        batches of this many rows, otherwise they are submitted one by one
+        :type batch_size: Integer
+        :return: Number of measurements submitted, by importer
+        :rtype: Dict
+        """
         # Since measurements are saved by their importer names, iterate over each key
         # and save its measurement objects.
-        extraction_log = list()
+        counts = dict()
         for key in self.measurements.keys():
-            for file in self.measurements[key]:
-                file.submit(data_store, change_id)
-            extraction_log.append(
-                f"{len(self.measurements[key])} measurement objects parsed by {key}."
+            if batch_size is None:
+                for file in self.measurements[key]:
+                    file.submit(data_store, change_id)
+            else:
+                data_store.bulk_add_measurements(
+                    self.measurements[key], change_id, batch_size
+                )
+            counts[key] = sum(
+                len(measurement) if isinstance(measurement, StateColumns) else 1
+                for measurement in self.measurements[key]
             )
-        return extraction_log
+        return counts
+
+    @staticmethod
+    def extraction_log(counts):
+        """The extraction log of the given numbers of measurements, by importer"""
+        return [
+            f"{number_of_measurements} measurement objects parsed by {key}."
+            for key, number_of_measurements in counts.items()
+        ]
 
 
 class SensorTypeMixin:
@@ -229,12 +320,37 @@ class StateMixin:
         data_store.session.add(self)
         data_store.session.flush()
         data_store.session.expire(self, ["_location"])
-        # Log new State object creation
-        data_store.add_to_logs(
-            table=constants.STATE, row_id=self.state_id, change_id=change_id
-        )
+        # Log new State object creation, unless it is logged with its datafile
+        if data_store.is_logged_by_row(constants.STATE):
+            data_store.add_to_logs(
+                table=constants.STATE, row_id=self.state_id, change_id=change_id
+            )
         return self
 
+    def set_si_values(self, speed=None, heading=None, course=None, elevation=None):
+        """
+        Set the speed, heading, course and elevation from floats already in SI
+        units, without the pint Quantities and unit checks of their properties.
+        Values which are None are left unset
+
+        :param speed: Speed in metres per second
+        :type speed: float
+        :param heading: Heading in radians
+        :type heading: float
+        :param course: Course in radians
+        :type course: float
+        :param elevation: Elevation in metres
+        :type elevation: float
+        """
+        if speed is not None:
+            self._speed = speed
+        if heading is not None:
+            self._heading = heading
+        if course is not None:
+            self._course = course
+        if elevation is not None:
+            self._elevation = elevation
+
     #
     # Speed properties
     #
@@ -362,10 +478,11 @@ class ContactMixin:
         data_store.session.add(self)
         data_store.session.flush()
         data_store.session.expire(self, ["_location"])
-        # Log new Contact object creation
-        data_store.add_to_logs(
-            table=constants.CONTACT, row_id=self.contact_id, change_id=change_id
-        )
+        # Log new Contact object creation, unless it is logged with its datafile
+        if data_store.is_logged_by_row(constants.CONTACT):
+            data_store.add_to_logs(
+                table=constants.CONTACT, row_id=self.contact_id, change_id=change_id
+            )
         return self
 
 
@@ -374,10 +491,11 @@ class CommentMixin:
         """Submit intermediate object to the DB"""
         data_store.session.add(self)
         data_store.session.flush()
-        # Log new Comment object creation
-        data_store.add_to_logs(
-            table=constants.COMMENT, row_id=self.comment_id, change_id=change_id
-        )
+        # Log new Comment object creation, unless it is logged with its datafile
+        if data_store.is_logged_by_row(constants.COMMENT):
+            data_store.add_to_logs(
+                table=constants.COMMENT, row_id=self.comment_id, change_id=change_id
+            )
         return self
 
 
@@ -427,7 +545,7 @@ class LocationPropertyMixin:
             if isinstance(self._location, str):
                 loc.set_from_wkt_string(self._location)
             else:
-                loc.set_from_wkb(self._location.desc)
+                loc.set_from_wkb(self._location.data)
 
             return loc
 
@@ -12,6 +12,7 @@ LOG = "Logs"
 EXTRACTION = "Extractions"
 TAG = "Tags"
 TAGGED_ITEM = "TaggedItems"
+TABLE_STATISTICS = "TableStatistics"
 PLATFORM_TYPE = "PlatformTypes"
 NATIONALITY = "Nationalities"
 GEOMETRY_TYPE = "GeometryTypes"
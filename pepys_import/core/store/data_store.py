@@ -1,24 +1,34 @@
 import os
 import math
+import multiprocessing
 
 from datetime import datetime
 from getpass import getuser
-from sqlalchemy import create_engine, or_
+from uuid import uuid4
+from sqlalchemy import create_engine, inspect, or_
 from sqlalchemy.event import listen
 from sqlalchemy.sql import select, func
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import OperationalError
 from importlib import import_module
 from contextlib import contextmanager
+from itertools import chain, count, islice
+from operator import itemgetter
+import heapq
+import numpy as np
 
 from paths import PEPYS_IMPORT_DIRECTORY
 from pepys_import.resolvers.default_resolver import DefaultResolver
 from pepys_import.utils.data_store_utils import import_from_csv
-from pepys_import.utils.geoalchemy_utils import load_spatialite
+from pepys_import.utils.geoalchemy_utils import load_spatialite, set_bulk_load_pragmas
 from pepys_import.core.store import constants
 from pepys_import.core.formats import unit_registry
 from .db_base import BasePostGIS, BaseSpatiaLite
 from .db_status import TableTypes
+from .export_worker import init_export_worker, export_datafile_in_worker
+from .lookup_cache import LookupCache
+from .postgres_copy import copy_rows
+from .state_columns import StateColumns
 
 from pepys_import import __version__
 from pepys_import.utils.branding_util import (
@@ -28,10 +38,38 @@ from pepys_import.utils.branding_util import (
 import pepys_import.utils.value_transforming_utils as transformer
 import pepys_import.utils.unit_utils as unit_converter
 from .table_summary import TableSummary, TableSummarySet
-from shapely import wkb
+from .table_statistics import (
+    discard_pending_statistics,
+    record_flushed_rows,
+    record_rows,
+    seed_statistics,
+    write_pending_statistics,
+)
 from pepys_import.core.formats.location import Location
 
 DEFAULT_DATA_PATH = os.path.join(PEPYS_IMPORT_DIRECTORY, "database", "default_data")
+# Measurement tables whose new rows can be logged by a single Log for each datafile
+MEASUREMENT_TABLES = [constants.STATE, constants.CONTACT, constants.COMMENT]
+# Columns of the tracks returned by get_track, in the order they are selected
+TRACK_COLUMNS = [
+    "time",
+    "latitude",
+    "longitude",
+    "elevation",
+    "heading",
+    "course",
+    "speed",
+]
+# Default number of states in each chunk of iter_track
+TRACK_CHUNK_SIZE = 100000
+# Number of rows fetched at a time, and size of the file buffer, when exporting
+EXPORT_CHUNK_SIZE = 10000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+# Spatially indexed columns whose index isn't maintained during bulk loads on SQLite
+BULK_LOAD_SPATIAL_INDEXES = [
+    (constants.STATE, "_location"),
+    (constants.CONTACT, "_location"),
+]
 USER = getuser()  # Login name of the current user
 
 
@@ -53,7 +91,19 @@ class DataStore(object):
         missing_data_resolver=DefaultResolver(),
         welcome_text="Pepys_import",
         show_status=True,
+        compact_logged_tables=None,
+        bulk_load=False,
     ):
+        """
+        :param compact_logged_tables: Measurement tables (of States, Contacts and
+        Comments) whose new rows get a single :class:`Log` for each datafile and
+        change, rather than a :class:`Log` each as the rows of other tables do
+        :type compact_logged_tables: List
+        :param bulk_load: On SQLite, whether to tune connections for loading large
+        amounts of data, trading durability on power loss for speed, and to let
+        imports suspend the maintenance of spatial indexes
+        :type bulk_load: bool
+        """
         if db_type == "postgres":
             self.db_classes = import_module("pepys_import.core.store.postgres_db")
             driver = "postgresql+psycopg2"
@@ -79,11 +129,15 @@ class DataStore(object):
             BasePostGIS.metadata.bind = self.engine
         elif db_type == "sqlite":
             listen(self.engine, "connect", load_spatialite)
+            if bulk_load:
+                listen(self.engine, "connect", set_bulk_load_pragmas)
             BaseSpatiaLite.metadata.bind = self.engine
 
         self.missing_data_resolver = missing_data_resolver
         self.welcome_text = welcome_text
         self.show_status = show_status
+        self.compact_logged_tables = set(compact_logged_tables or [])
+        self.bulk_load = bulk_load and db_type == "sqlite"
 
         # caches of known data
         self.privacies = {}
@@ -96,6 +150,15 @@ class DataStore(object):
         self.sensors = {}
         self.comment_types = {}
 
+        # results of search_* and synonym_search, for the current session
+        self.lookup_cache = LookupCache()
+
+        # entities resolved by get_platform, Platform.get_sensor and resolve_privacy
+        # during the current session, keyed by the values they were resolved from, so
+        # that importers can look them up for every line of a file. Cleared whenever
+        # a session starts or ends, as the caches above are, see session_scope
+        self.resolution_memo = {}
+
         # TEMP list of values for defaulted IDs, to be replaced by missing info lookup mechanism
         self.default_user_id = 1  # DevUser
 
@@ -156,11 +219,92 @@ class DataStore(object):
             except OperationalError:
                 raise Exception(f"Error creating database({self.db_name})! Quitting")
 
+        # Tables which existed before get the columns and indexes added since they
+        # were created
+        self.ensure_columns()
+        self.ensure_indexes()
+        self.ensure_table_statistics()
+
+    def ensure_columns(self):
+        """Add the columns defined by the models which are missing from the
+        database, e.g. because their table was created by an earlier version. The
+        columns are added empty, so only those which can be NULL can be added
+
+        :return: Names of the added columns, as table.column
+        :rtype: List
+        """
+        if self.db_type == "sqlite":
+            meta = BaseSpatiaLite.metadata
+        else:
+            meta = BasePostGIS.metadata
+
+        inspector = inspect(self.engine)
+        compiler = self.engine.dialect.ddl_compiler(self.engine.dialect, None)
+        preparer = compiler.preparer
+        added_columns = list()
+        with self.engine.begin() as connection:
+            for table in meta.sorted_tables:
+                existing_columns = {
+                    column["name"]
+                    for column in inspector.get_columns(table.name, schema=table.schema)
+                }
+                for column in table.columns:
+                    if column.name in existing_columns:
+                        continue
+                    if not column.nullable:
+                        raise Exception(
+                            f"Column {column.name} of table {table.name} is missing "
+                            "from the database, and can't be added as it can't be "
+                            "NULL. Quitting"
+                        )
+                    specification = compiler.get_column_specification(column)
+                    for foreign_key in column.foreign_keys:
+                        specification += " REFERENCES {} ({})".format(
+                            preparer.format_table(foreign_key.column.table),
+                            preparer.quote(foreign_key.column.name),
+                        )
+                    connection.execute(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {specification}"
+                    )
+                    added_columns.append(f"{table.name}.{column.name}")
+        return added_columns
+
+    def ensure_indexes(self):
+        """Create the indexes defined by the models which are missing from the
+        database, e.g. because their table was created by an earlier version
+
+        :return: Names of the created indexes
+        :rtype: List
+        """
+        if self.db_type == "sqlite":
+            meta = BaseSpatiaLite.metadata
+        else:
+            meta = BasePostGIS.metadata
+
+        inspector = inspect(self.engine)
+        created_indexes = list()
+        for table in meta.sorted_tables:
+            existing_indexes = {
+                index["name"]
+                for index in inspector.get_indexes(table.name, schema=table.schema)
+            }
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(self.engine)
+                    created_indexes.append(index.name)
+        return created_indexes
+
     @contextmanager
     def session_scope(self):
         """Provide a transactional scope around a series of operations."""
         db_session = sessionmaker(bind=self.engine)
         self.session = db_session()
+        listen(self.session, "after_flush", self.invalidate_lookup_cache)
+        listen(self.session, "after_flush", record_flushed_rows)
+        listen(self.session, "before_commit", self.write_table_statistics)
+        listen(self.session, "after_rollback", discard_pending_statistics)
+        self.clear_session_caches()
         try:
             yield self
             self.session.commit()
@@ -168,11 +312,105 @@ class DataStore(object):
             self.session.rollback()
             raise
         finally:
+            # the cached entities belong to this session, and may have been
+            # rolled back
+            self.clear_session_caches()
             self.session.close()
 
+    def ensure_table_statistics(self):
+        """Add the statistics of the tables which have none, e.g. because the
+        database was created by an earlier version, by counting their rows once.
+        From then on, they are kept up to date by each session, see
+        :meth:`write_table_statistics`
+
+        :return: Names of the tables whose statistics were added
+        :rtype: List
+        """
+        with self.engine.begin() as connection:
+            return seed_statistics(
+                connection,
+                self.db_classes.TableStatistic.__table__,
+                list(chain.from_iterable(self.meta_classes.values())),
+            )
+
+    def write_table_statistics(self, session):
+        """
+        Update the row counts and last creation dates of the tables written to by
+        the session, in its transaction, before it is committed.
+
+        Rows added and deleted through the ORM are recorded as they are flushed, and
+        rows added in bulk by :meth:`bulk_add_measurements`.
+
+        :param session: Session being committed
+        :type session: Session
+        """
+        session.flush()
+        write_pending_statistics(session, self.db_classes.TableStatistic.__table__)
+
+    def suspend_spatial_indexes(self):
+        """
+        In bulk load mode, stop maintaining the spatial indexes of the locations of
+        States and Contacts, rather than updating them by trigger for every new row.
+        Being done in the current session, the indexes are back as they were if it
+        is rolled back.
+
+        :return: Tables and columns whose index was suspended, to be given to
+        :meth:`rebuild_spatial_indexes` once the data is loaded
+        :rtype: List
+        """
+        suspended_indexes = list()
+        if not self.bulk_load:
+            return suspended_indexes
+
+        for table, column in BULK_LOAD_SPATIAL_INDEXES:
+            # Returns 0 if the column has no spatial index
+            disabled = self.session.execute(
+                select([func.DisableSpatialIndex(table, column)])
+            ).scalar()
+            if disabled:
+                self.session.execute(f'DROP TABLE IF EXISTS "idx_{table}_{column}"')
+                suspended_indexes.append((table, column))
+        return suspended_indexes
+
+    def rebuild_spatial_indexes(self, suspended_indexes):
+        """
+        Create again the spatial indexes suspended by
+        :meth:`suspend_spatial_indexes`, from all the rows of their tables at once
+
+        :param suspended_indexes: Tables and columns whose index was suspended
+        :type suspended_indexes: List
+        """
+        for table, column in suspended_indexes:
+            self.session.execute(select([func.CreateSpatialIndex(table, column)]))
+
+    def clear_session_caches(self):
+        """Forget the entities cached and memoised during the current session"""
+        self.lookup_cache.clear()
+        self.resolution_memo.clear()
+        for cache in [
+            self.privacies,
+            self.nationalities,
+            self.datafile_types,
+            self.datafiles,
+            self.platform_types,
+            self.platforms,
+            self.sensor_types,
+            self.sensors,
+            self.comment_types,
+        ]:
+            cache.clear()
+
     #############################################################
     # Other DataStore Methods
 
+    def invalidate_lookup_cache(self, session, flush_context):
+        """Forget the cached lookups of the tables written to by a flush"""
+        for instance in chain(session.new, session.dirty, session.deleted):
+            self.lookup_cache.invalidate(instance.__tablename__)
+            if isinstance(instance, self.db_classes.Synonym):
+                # synonym lookups are cached with the table the synonym is for
+                self.lookup_cache.invalidate(instance.table)
+
     def setup_table_type_mapping(self):
         """Setup a map of tables keyed by :class:`TableType`"""
         db_classes = dict(
@@ -506,68 +744,89 @@ class DataStore(object):
     #############################################################
     # Search/lookup functions
 
+    def cached_search(self, table, field, value):
+        """
+        Search for the first entity of the table with this value in the field, through
+        the lookup cache. Results are kept until the table is written to, or the
+        session ends.
+
+        :param table: Table object to query
+        :type table: :class:`BasePostGIS` or :class``BaseSpatiaLite
+        :param field: Field of the table to filter on
+        :type field: :class:`sqlalchemy.orm.attributes.InstrumentedAttribute`
+        :param value: Value to search for
+        :return: Returns found entity or None
+        """
+        return self.lookup_cache.get_or_load(
+            table.__tablename__,
+            (field.key, value),
+            lambda: self.session.query(table).filter(field == value).first(),
+        )
+
     def search_datafile_type(self, name):
         """Search for any datafile type with this name"""
-        return (
-            self.session.query(self.db_classes.DatafileType)
-            .filter(self.db_classes.DatafileType.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.DatafileType, self.db_classes.DatafileType.name, name
         )
 
     def search_datafile(self, name):
         """Search for any datafile with this name"""
-        return (
-            self.session.query(self.db_classes.Datafile)
-            .filter(self.db_classes.Datafile.reference == name)
+        return self.cached_search(
+            self.db_classes.Datafile, self.db_classes.Datafile.reference, name
+        )
+
+    def is_datafile_loaded_before(self, file_size, file_hash):
+        """Check whether a datafile with this content has already been imported
+
+        :param file_size: Size of the file in bytes
+        :type file_size: Integer
+        :param file_hash: Hexadecimal SHA-256 digest of the file
+        :type file_hash: String
+        :return: True if a committed datafile has the same size and digest
+        :rtype: bool
+        """
+        datafile = (
+            self.session.query(self.db_classes.Datafile.datafile_id)
+            .filter(self.db_classes.Datafile.hash == file_hash)
+            .filter(self.db_classes.Datafile.size == file_size)
             .first()
         )
+        return datafile is not None
 
     def search_platform(self, name):
         """Search for any platform with this name"""
-        return (
-            self.session.query(self.db_classes.Platform)
-            .filter(self.db_classes.Platform.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.Platform, self.db_classes.Platform.name, name
         )
 
     def search_platform_type(self, name):
         """Search for any platform type with this name"""
-        return (
-            self.session.query(self.db_classes.PlatformType)
-            .filter(self.db_classes.PlatformType.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.PlatformType, self.db_classes.PlatformType.name, name
         )
 
     def search_nationality(self, name):
         """Search for any nationality with this name"""
-        return (
-            self.session.query(self.db_classes.Nationality)
-            .filter(self.db_classes.Nationality.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.Nationality, self.db_classes.Nationality.name, name
         )
 
     def search_sensor(self, name):
         """Search for any sensor type featuring this name"""
-        return (
-            self.session.query(self.db_classes.Sensor)
-            .filter(self.db_classes.Sensor.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.Sensor, self.db_classes.Sensor.name, name
         )
 
     def search_sensor_type(self, name):
         """Search for any sensor type featuring this name"""
-        return (
-            self.session.query(self.db_classes.SensorType)
-            .filter(self.db_classes.SensorType.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.SensorType, self.db_classes.SensorType.name, name
         )
 
     def search_privacy(self, name):
         """Search for any privacy with this name"""
-        return (
-            self.session.query(self.db_classes.Privacy)
-            .filter(self.db_classes.Privacy.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.Privacy, self.db_classes.Privacy.name, name
         )
 
     #############################################################
@@ -584,7 +843,15 @@ class DataStore(object):
         :type pk_field: :class:`sqlalchemy.orm.attributes.InstrumentedAttribute`
         :return: Returns found entity or None
         """
+        # cached along with the lookups of the table, as adding a synonym
+        # invalidates them (see invalidate_lookup_cache)
+        return self.lookup_cache.get_or_load(
+            table.__tablename__,
+            ("synonym", name),
+            lambda: self._synonym_search(name, table, pk_field),
+        )
 
+    def _synonym_search(self, name, table, pk_field):
         synonym = (
             self.session.query(self.db_classes.Synonym)
             .filter(
@@ -624,7 +891,9 @@ class DataStore(object):
             pk_field=self.db_classes.Datafile.datafile_id,
         )
 
-    def get_datafile(self, datafile_name=None, datafile_type=None, change_id=None):
+    def get_datafile(
+        self, datafile_name=None, datafile_type=None, change_id=None, file_hash=None
+    ):
         """
         Adds an entry to the datafiles table of the specified name (path)
         and type if not already present. It uses find_datafile method to search existing datafiles.
@@ -635,6 +904,9 @@ class DataStore(object):
         :type datafile_type: DatafileType
         :param change_id: ID of the :class:`Change` object
         :type change_id: Integer or UUID
+        :param file_hash: Digest of the file's content. A Datafile of the same name
+        which was imported from different content isn't reused
+        :type file_hash: String
         :return:  Created Datafile entity
         :rtype: Datafile
         """
@@ -642,6 +914,13 @@ class DataStore(object):
         # Check for name match in Datafile and Synonym Tables
         if datafile_name:
             datafile = self.find_datafile(datafile_name=datafile_name)
+            if (
+                datafile
+                and file_hash is not None
+                and datafile.hash is not None
+                and datafile.hash != file_hash
+            ):
+                datafile = None
             if datafile:
                 # found object should be initialised because of _measurement variable
                 datafile.__init__()
@@ -734,7 +1013,81 @@ class DataStore(object):
         :type change_id: Integer or UUID
         :return: Created Platform entity
         """
+        memo_key = (
+            "platform",
+            platform_name,
+            nationality,
+            platform_type,
+            privacy,
+            trigraph,
+            quadgraph,
+            pennant_number,
+        )
+        if platform_name and memo_key in self.resolution_memo:
+            return self.resolution_memo[memo_key]
+
+        platform = self._get_platform(
+            platform_name,
+            nationality,
+            platform_type,
+            privacy,
+            trigraph,
+            quadgraph,
+            pennant_number,
+            change_id,
+        )
+        if platform_name:
+            self.resolution_memo[memo_key] = platform
+        return platform
 
+    def get_sensor(
+        self, platform, sensor_name=None, sensor_type=None, privacy=None, change_id=None
+    ):
+        """
+        Lookup or create a sensor of this name for the given :class:`Platform`, see
+        :meth:`Platform.get_sensor`. Sensors are resolved once per session.
+
+        :param platform: Platform hosting the :class:`Sensor`
+        :type platform: Platform
+        :param sensor_name: Name of :class:`Sensor`
+        :type sensor_name: String
+        :param sensor_type: Type of :class:`Sensor`
+        :type sensor_type: SensorType
+        :param privacy: Name of :class:`Privacy`
+        :type privacy: String
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :return: Created :class:`Sensor` entity
+        :rtype: Sensor
+        """
+        sensor_type_id = None if sensor_type is None else sensor_type.sensor_type_id
+        memo_key = (
+            "sensor",
+            platform.platform_id,
+            sensor_name,
+            sensor_type_id,
+            privacy,
+        )
+        if memo_key in self.resolution_memo:
+            return self.resolution_memo[memo_key]
+
+        sensor = platform._get_sensor(
+            self, sensor_name, sensor_type, privacy, change_id
+        )
+        self.resolution_memo[memo_key] = sensor
+        return sensor
+
+    def _get_platform(
+        self,
+        platform_name,
+        nationality,
+        platform_type,
+        privacy,
+        trigraph,
+        quadgraph,
+        pennant_number,
+        change_id,
+    ):
         # Check for name match in Platform and Synonym Tables
         if platform_name:
             platform = self.find_platform(platform_name)
@@ -789,14 +1142,33 @@ class DataStore(object):
             change_id=change_id,
         )
 
+    def resolve_privacy(self, change_id):
+        """
+        Resolve the privacy of imported measurements with the missing data resolver,
+        once per session.
+
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :return: Resolved :class:`Privacy` entity
+        :rtype: Privacy
+        """
+        memo_key = ("privacy",)
+        if memo_key not in self.resolution_memo:
+            self.resolution_memo[memo_key] = self.missing_data_resolver.resolve_privacy(
+                self, change_id
+            )
+        return self.resolution_memo[memo_key]
+
     def get_status(
         self,
         report_measurement: bool = False,
         report_metadata: bool = False,
         report_reference: bool = False,
+        approximate: bool = False,
     ):
         """
-        Provides a summary of the contents of the :class:`DataStore`.
+        Provides a summary of the contents of the :class:`DataStore`, from the
+        statistics kept of each table, see :class:`TableSummary`.
 
         :param report_measurement: Boolean flag includes Metadata Tables
         :type report_measurement: Boolean
@@ -804,6 +1176,9 @@ class DataStore(object):
         :type report_metadata: Boolean
         :param report_reference: Boolean flag includes Metadata Tables
         :type report_reference: Boolean
+        :param approximate: Boolean flag uses the estimates of the database for
+        tables without statistics, rather than counting their rows
+        :type approximate: Boolean
         :return: The summary of the contents of the :class:`DataStore`
         :rtype: TableSummarySet
         """
@@ -813,21 +1188,21 @@ class DataStore(object):
             # Create measurement table list
             measurement_table_objects = self.meta_classes[TableTypes.MEASUREMENT]
             for table_object in list(measurement_table_objects):
-                ts = TableSummary(self.session, table_object)
+                ts = TableSummary(self.session, table_object, approximate)
                 table_summaries.append(ts)
 
         if report_metadata:
             # Create metadata table list
             metadata_table_objects = self.meta_classes[TableTypes.METADATA]
             for table_object in list(metadata_table_objects):
-                ts = TableSummary(self.session, table_object)
+                ts = TableSummary(self.session, table_object, approximate)
                 table_summaries.append(ts)
 
         if report_reference:
             # Create reference table list
             reference_table_objects = self.meta_classes[TableTypes.REFERENCE]
             for table_object in list(reference_table_objects):
-                ts = TableSummary(self.session, table_object)
+                ts = TableSummary(self.session, table_object, approximate)
                 table_summaries.append(ts)
 
         table_summaries_set = TableSummarySet(table_summaries)
@@ -836,10 +1211,8 @@ class DataStore(object):
 
     def search_comment_type(self, name):
         """Search for any comment type featuring this name"""
-        return (
-            self.session.query(self.db_classes.CommentType)
-            .filter(self.db_classes.CommentType.name == name)
-            .first()
+        return self.cached_search(
+            self.db_classes.CommentType, self.db_classes.CommentType.name, name
         )
 
     def add_to_comment_types(self, name, change_id):
@@ -881,6 +1254,307 @@ class DataStore(object):
 
         return comment_type
 
+    def bulk_add_measurements(self, measurements, change_id, batch_size):
+        """
+        Adds the given measurements, and a :class:`Log` row for each of them in the
+        tables logged by row (see :meth:`add_measurement_logs` for the others), with
+        batched multi-row INSERTs instead of flushing one object at a time.
+
+        Primary keys are assigned here (the next free IDs on SQLite, new UUIDs on
+        PostgreSQL), so that the Log rows can refer to them. The measurements are
+        not added to the session. On PostgreSQL, each batch is streamed in with
+        COPY rather than INSERTed.
+
+        :param measurements: :class:`State`, :class:`Contact` or :class:`Comment`
+        objects, not yet submitted, and :class:`StateColumns`, whose rows are
+        inserted from the columns and whose IDs are kept in ``state_ids``
+        :type measurements: List
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :param batch_size: Number of rows inserted by each statement
+        :type batch_size: Integer
+        """
+        # keep measurements of each class together, in their original order
+        measurements_by_class = dict()
+        for measurement in measurements:
+            if isinstance(measurement, StateColumns):
+                measurement_class = measurement.state_class
+            else:
+                measurement_class = type(measurement)
+            measurements_by_class.setdefault(measurement_class, list()).append(
+                measurement
+            )
+
+        now = datetime.utcnow()
+        for measurement_class, class_measurements in measurements_by_class.items():
+            mapper = inspect(measurement_class)
+            pk_column = mapper.primary_key[0]
+            pk_key = mapper.get_property_by_column(pk_column).key
+            columns = [(attr.key, attr.columns[0]) for attr in mapper.column_attrs]
+            if self.db_type == "sqlite":
+                next_id = (self.session.query(func.max(pk_column)).scalar() or 0) + 1
+                row_ids = count(next_id)
+            else:
+                row_ids = iter(uuid4, None)
+            logged_by_row = self.is_logged_by_row(measurement_class.__tablename__)
+            all_mappings = self._measurement_mappings(
+                class_measurements,
+                columns,
+                pk_key,
+                row_ids,
+                ewkb=self.db_type == "postgres",
+            )
+
+            while True:
+                mappings = list(islice(all_mappings, batch_size))
+                if not mappings:
+                    break
+                logs = list()
+                for mapping in mappings:
+                    if mapping["created_date"] is None:
+                        mapping["created_date"] = now
+                    if logged_by_row:
+                        logs.append(
+                            {
+                                "table": measurement_class.__tablename__,
+                                "id": mapping[pk_key],
+                                "change_id": change_id,
+                                "created_date": now,
+                            }
+                        )
+                if self.db_type == "postgres":
+                    rows = [
+                        {column.name: mapping[key] for key, column in columns}
+                        for mapping in mappings
+                    ]
+                    copy_rows(self.session, measurement_class.__table__, rows)
+                    for log in logs:
+                        log["log_id"] = uuid4()
+                    copy_rows(self.session, self.db_classes.Log.__table__, logs)
+                else:
+                    self.session.bulk_insert_mappings(measurement_class, mappings)
+                    self.session.bulk_insert_mappings(self.db_classes.Log, logs)
+                record_rows(
+                    self.session,
+                    measurement_class.__tablename__,
+                    added=len(mappings),
+                    created_date=max(mapping["created_date"] for mapping in mappings),
+                )
+                if logs:
+                    record_rows(
+                        self.session, constants.LOG, added=len(logs), created_date=now,
+                    )
+
+    @staticmethod
+    def _measurement_mappings(measurements, columns, pk_key, row_ids, ewkb=False):
+        """Yield the column values of the measurements, by attribute, with primary
+        keys taken from row_ids. The rows of :class:`StateColumns` are taken straight
+        from the columns, without :class:`State` objects, with their locations as
+        EWKB if ewkb is set, see :meth:`StateColumns.mappings`"""
+        empty_mapping = dict.fromkeys(key for key, _ in columns)
+        for measurement in measurements:
+            if isinstance(measurement, StateColumns):
+                measurement.state_ids = list()
+                for row in measurement.mappings(ewkb):
+                    row_id = next(row_ids)
+                    measurement.state_ids.append(row_id)
+                    mapping = dict(empty_mapping)
+                    mapping.update(row)
+                    mapping[pk_key] = row_id
+                    yield mapping
+            else:
+                row_id = next(row_ids)
+                setattr(measurement, pk_key, row_id)
+                yield {key: getattr(measurement, key) for key, _ in columns}
+
+    def is_logged_by_row(self, table):
+        """Whether each new row of the table gets a :class:`Log` of its own
+
+        :param table: Name of the table
+        :type table: String
+        :rtype: bool
+        """
+        return (
+            table not in MEASUREMENT_TABLES or table not in self.compact_logged_tables
+        )
+
+    def add_measurement_logs(self, measurements, change_id):
+        """
+        Adds a single :class:`Log` for the measurements of each table and datafile,
+        for the tables whose logging is compact, see ``compact_logged_tables``. The
+        measurements must have been submitted already, so that they have their IDs.
+
+        :param measurements: :class:`State`, :class:`Contact` or :class:`Comment`
+        objects, and :class:`StateColumns`
+        :type measurements: List
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :return: Created :class:`Log` entities
+        :rtype: List
+        """
+        return self.add_ranges_to_logs(
+            self.measurement_log_ranges(measurements), change_id
+        )
+
+    def measurement_log_ranges(self, measurements, ranges=None):
+        """
+        The first ID, last ID and number of rows of the given measurements, by table
+        and datafile, for the tables whose logging is compact, see
+        :meth:`add_measurement_logs`.
+
+        :param measurements: :class:`State`, :class:`Contact` or :class:`Comment`
+        objects, and :class:`StateColumns`, submitted already
+        :type measurements: List
+        :param ranges: Ranges of measurements submitted earlier, which are extended
+        by those of the given measurements
+        :type ranges: Dict
+        :return: Ranges of the measurements, by table and datafile ID
+        :rtype: Dict
+        """
+        if ranges is None:
+            ranges = dict()
+        for measurement in measurements:
+            state_columns = isinstance(measurement, StateColumns)
+            if state_columns:
+                table = measurement.state_class.__tablename__
+            else:
+                table = measurement.__tablename__
+            if self.is_logged_by_row(table):
+                continue
+            if state_columns:
+                row_ids = measurement.state_ids
+                if not row_ids:
+                    continue
+            else:
+                mapper = inspect(measurement).mapper
+                row_ids = [mapper.primary_key_from_instance(measurement)[0]]
+            key = (table, measurement.source_id)
+            first_id, last_id, row_count = min(row_ids), max(row_ids), len(row_ids)
+            if key in ranges:
+                first_id = min(first_id, ranges[key][0])
+                last_id = max(last_id, ranges[key][1])
+                row_count += ranges[key][2]
+            ranges[key] = (first_id, last_id, row_count)
+        return ranges
+
+    def add_ranges_to_logs(self, ranges, change_id):
+        """
+        Adds a single :class:`Log` for each range of measurements, see
+        :meth:`measurement_log_ranges`
+
+        :param ranges: First ID, last ID and number of rows, by table and datafile ID
+        :type ranges: Dict
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :return: Created :class:`Log` entities
+        :rtype: List
+        """
+        return [
+            self.add_range_to_logs(
+                table=table,
+                first_id=first_id,
+                last_id=last_id,
+                row_count=row_count,
+                datafile_id=datafile_id,
+                change_id=change_id,
+            )
+            for (table, datafile_id), (first_id, last_id, row_count) in ranges.items()
+        ]
+
+    def get_track(self, platform, start=None, end=None):
+        """
+        Get the states of a platform as columns of NumPy arrays, read with a single
+        SELECT, without building a :class:`State` and pint Quantities for each row.
+
+        Values are in SI units: elevation in metres, heading and course in radians,
+        speed in metres per second. Missing values are NaN.
+
+        :param platform: Platform, or its name
+        :type platform: Platform or String
+        :param start: Earliest time of the states, if any
+        :type start: datetime
+        :param end: Latest time of the states, if any
+        :type end: datetime
+        :return: Arrays of the time, latitude, longitude, elevation, heading,
+        course and speed of the states, ordered by time, by column name
+        :rtype: Dict
+        """
+        rows = self.session.execute(self._track_query(platform, start, end))
+        return self._track_arrays(rows.fetchall())
+
+    def iter_track(self, platform, start=None, end=None, chunk_size=TRACK_CHUNK_SIZE):
+        """
+        Get the states of a platform in chunks of columns, as returned by
+        :meth:`get_track`, for tracks too long to be held in memory at once. On
+        PostgreSQL the rows are fetched from a server side cursor.
+
+        :param platform: Platform, or its name
+        :type platform: Platform or String
+        :param start: Earliest time of the states, if any
+        :type start: datetime
+        :param end: Latest time of the states, if any
+        :type end: datetime
+        :param chunk_size: Maximum number of states in each chunk
+        :type chunk_size: Integer
+        :return: Arrays of each chunk of states, by column name
+        :rtype: Iterator
+        """
+        query = self._track_query(platform, start, end).execution_options(
+            stream_results=True
+        )
+        rows = self.session.execute(query)
+        try:
+            while True:
+                chunk = rows.fetchmany(chunk_size)
+                if not chunk:
+                    return
+                yield self._track_arrays(chunk)
+        finally:
+            rows.close()
+
+    def _track_query(self, platform, start, end):
+        if isinstance(platform, str):
+            platform_name = platform
+            platform = self.search_platform(platform_name)
+            if platform is None:
+                raise ValueError(f"No platform found with the name '{platform_name}'")
+        State = self.db_classes.State
+        Sensor = self.db_classes.Sensor
+        location = State.__table__.c._location
+
+        sensor_ids = select([Sensor.sensor_id]).where(
+            Sensor.host == platform.platform_id
+        )
+        query = (
+            select(
+                [
+                    State.time,
+                    func.ST_Y(location),
+                    func.ST_X(location),
+                    State._elevation,
+                    State._heading,
+                    State._course,
+                    State._speed,
+                ]
+            )
+            .where(State.sensor_id.in_(sensor_ids))
+            .order_by(State.time)
+        )
+        if start is not None:
+            query = query.where(State.time >= start)
+        if end is not None:
+            query = query.where(State.time <= end)
+        return query
+
+    @staticmethod
+    def _track_arrays(rows):
+        columns = list(zip(*rows)) or [()] * len(TRACK_COLUMNS)
+        track = {"time": np.array(columns[0], dtype="datetime64[us]")}
+        for name, values in zip(TRACK_COLUMNS[1:], columns[1:]):
+            # NULLs become NaN
+            track[name] = np.array(values, dtype=np.float64)
+        return track
+
     # End of Measurements
     #############################################################
     # Reference Type Maintenance
@@ -1101,6 +1775,45 @@ class DataStore(object):
 
         return log
 
+    def add_range_to_logs(
+        self, table, first_id, last_id, row_count, datafile_id, change_id
+    ):
+        """
+        Adds a single :class:`Log` for the rows of the table created from the
+        datafile by the change, instead of one for each row. Its ID is the lowest ID
+        of the rows, and its last ID the highest one.
+
+        IDs are sequential on SQLite, so the rows are those from the first to the
+        last ID. On PostgreSQL they are random UUIDs, which don't make a range, so
+        the rows are found by their source datafile.
+
+        :param table: Name of the table
+        :type table: String
+        :param first_id: Lowest ID of the rows
+        :type first_id: Integer or UUID
+        :param last_id: Highest ID of the rows
+        :type last_id: Integer or UUID
+        :param row_count: Number of rows
+        :type row_count: Integer
+        :param datafile_id: ID of the :class:`Datafile` the rows were read from
+        :type datafile_id: Integer or UUID
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :return: Created :class:`Log` entity
+        """
+        log = self.db_classes.Log(
+            table=table,
+            id=first_id,
+            last_id=last_id,
+            row_count=row_count,
+            datafile_id=datafile_id,
+            change_id=change_id,
+        )
+        self.session.add(log)
+        self.session.flush()
+
+        return log
+
     def add_to_changes(self, user, modified, reason):
         """
         Adds the specified event to the :class:`Change`table if not already present.
@@ -1129,6 +1842,12 @@ class DataStore(object):
         with self.session_scope():
             for table in reversed(meta.sorted_tables):
                 self.session.execute(table.delete())
+            # every table is now known to be empty
+            seed_statistics(
+                self.session,
+                self.db_classes.TableStatistic.__table__,
+                list(chain.from_iterable(self.meta_classes.values())),
+            )
 
     def get_all_datafiles(self):
         """
@@ -1231,137 +1950,319 @@ class DataStore(object):
                 )
         return platform.name
 
-    def export_datafile(self, datafile_id, datafile):
+    def export_datafile(self, datafile_id, datafile, start=None, end=None):
         """
-        Get states, contacts and comments based on Datafile ID.
+        Export the states, contacts and comments of a datafile to a REP file, in
+        time order.
+
+        Measurements are read with one query per table, which also fetches the names
+        of their platforms and sensors, and are streamed from the database in chunks,
+        so that datafiles of any size are exported in bounded memory.
 
         :param datafile_id:  ID of Datafile
         :type datafile_id: String
+        :param datafile: Name of the REP file, without its extension
+        :type datafile: String
+        :param start: If given, only measurements from this time are exported
+        :type start: datetime
+        :param end: If given, only measurements up to this time are exported
+        :type end: datetime
         """
-        f = open("{}.rep".format(datafile), "w+")
-        states = (
-            self.session.query(self.db_classes.State)
-            .filter(self.db_classes.State.source_id == datafile_id)
-            .all()
+        state_lines = (
+            (row.time, self._state_rep_line(row))
+            for row in self._stream_rows(
+                self._export_states_query(datafile_id, start, end)
+            )
         )
-
-        contacts = (
-            self.session.query(self.db_classes.Contact)
-            .filter(self.db_classes.Contact.source_id == datafile_id)
-            .all()
+        contact_lines = (
+            (row.time, self._contact_rep_line(row))
+            for row in self._stream_rows(
+                self._export_contacts_query(datafile_id, start, end)
+            )
         )
-
-        comments = (
-            self.session.query(self.db_classes.Comment)
-            .filter(self.db_classes.Comment.source_id == datafile_id)
-            .all()
+        comment_lines = (
+            (row.time, self._comment_rep_line(row))
+            for row in self._stream_rows(
+                self._export_comments_query(datafile_id, start, end)
+            )
         )
 
-        line_number = 0
-
-        # export states
-        for i, state in enumerate(states):
-            line_number += 1
-            #  load platform name from cache.
-            try:
-                platform_name = self.get_cached_platform_name(sensor_id=state.sensor_id)
-            except Exception as ex:
-                print(str(ex))
-                platform_name = "[Not Found]"
-
-            if state.elevation is None:
-                depthStr = "NaN"
-            elif state.elevation == 0.0:
-                depthStr = "0.0"
-            else:
-                depthStr = -1 * state.elevation.magnitude
-
-            state_rep_line = [
-                transformer.format_datatime(state.time),
-                '"' + platform_name + '"',
-                "AA",
-                transformer.format_point(
-                    state.location.longitude, state.location.latitude
-                ),
-                str(unit_converter.convert_radian_to_degree(state.heading))
-                if state.heading
-                else "0",
-                str(unit_converter.convert_mps_to_knot(state.speed))
-                if state.speed
-                else "0",
-                depthStr,
-            ]
-            data = " ".join(state_rep_line)
-            f.write(data + "\r\n")
-
-        # Export contacts
-        for i, contact in enumerate(contacts):
-            line_number += 1
-            #  load platform name from cache.
-            platform_name = "[Not Found]"
-            sensor_name = "[Not Found]"
-            try:
-                platform_name = self.get_cached_platform_name(
-                    sensor_id=contact.sensor_id
-                )
-                sensor_name = self.get_cached_sensor_name(sensor_id=contact.sensor_id)
-            except Exception as ex:
-                print(str(ex))
-
-            # wkb hex conversion to "point"
-            point = None
-            if contact.location is not None:
-                point = wkb.loads(contact.location.desc, hex=True)
-
-            contact_rep_line = [
-                transformer.format_datatime(contact.time),
-                platform_name,
-                "@@",
-                transformer.format_point(point.y, point.x) if point else "NULL",
-                str(math.degrees(contact.bearing)) if contact.bearing else "NULL",
-                "NULL",  # unit_converter.convert_meter_to_yard(contact.range) if contact.range else "NULL",
-                sensor_name,
-                "N/A",
+        with open(
+            "{}.rep".format(datafile), "w", buffering=EXPORT_BUFFER_SIZE, newline=""
+        ) as f:
+            # each query is ordered by time, merge them as they are read. Lines with
+            # the same time are written states first, then contacts and comments
+            for _, data in heapq.merge(
+                state_lines, contact_lines, comment_lines, key=itemgetter(0)
+            ):
+                f.write(data + "\r\n")
+
+    def export_datafiles(
+        self, folder, datafile_ids=None, start=None, end=None, workers=1
+    ):
+        """
+        Export several datafiles to REP files in a folder, one file each, see
+        :meth:`export_datafile`.
+
+        With more than one worker, datafiles are exported by a pool of processes,
+        each streaming whole datafiles through its own connection to the database.
+        In-memory databases, which other processes can't reach, are always exported
+        by this process. This method opens its own sessions, so it must not be called
+        within :meth:`session_scope`.
+
+        :param folder: Folder the REP files are written to
+        :type folder: String
+        :param datafile_ids: IDs of the datafiles to export, all of them if None
+        :type datafile_ids: List
+        :param start: If given, only measurements from this time are exported, and
+        datafiles without any are skipped
+        :type start: datetime
+        :param end: If given, only measurements up to this time are exported, and
+        datafiles without any are skipped
+        :type end: datetime
+        :param workers: Number of worker processes
+        :type workers: Integer
+        :return: Paths of the REP files written
+        :rtype: List
+        """
+        with self.session_scope():
+            datafiles = self._datafiles_to_export(datafile_ids, start, end)
+
+        tasks = list()
+        names = set()
+        for datafile_id, reference in datafiles:
+            name = (reference or str(datafile_id)).replace(".", "_")
+            unique_name = name
+            suffix = 1
+            while unique_name in names:
+                suffix += 1
+                unique_name = f"{name}_{suffix}"
+            names.add(unique_name)
+            tasks.append((datafile_id, os.path.join(folder, unique_name), start, end))
+
+        if workers > 1 and len(tasks) > 1 and self.db_name != ":memory:":
+            with multiprocessing.Pool(
+                min(workers, len(tasks)),
+                initializer=init_export_worker,
+                initargs=(type(self), self.connection_parameters()),
+            ) as pool:
+                paths = pool.map(export_datafile_in_worker, tasks)
+        else:
+            paths = list()
+            for datafile_id, path, _, _ in tasks:
+                with self.session_scope():
+                    self.export_datafile(datafile_id, path, start, end)
+                paths.append(f"{path}.rep")
+        return paths
+
+    def _datafiles_to_export(self, datafile_ids, start, end):
+        """IDs and references of the datafiles to export, restricted to those with
+        measurements between start and end if either is given"""
+        Datafile = self.db_classes.Datafile
+        query = self.session.query(Datafile.datafile_id, Datafile.reference)
+        if datafile_ids is not None:
+            query = query.filter(Datafile.datafile_id.in_(list(datafile_ids)))
+        if start is not None or end is not None:
+            sources = [
+                self._in_time_window(select([table.source_id]), table.time, start, end)
+                for table in [
+                    self.db_classes.State,
+                    self.db_classes.Contact,
+                    self.db_classes.Comment,
+                ]
             ]
+            query = query.filter(
+                or_(*[Datafile.datafile_id.in_(source) for source in sources])
+            )
+        return query.order_by(Datafile.reference).all()
 
-            ambigous_bearing = None  # TODO: ambigous bearing.
-            if ambigous_bearing or contact.freq:
-                contact_rep_line.insert(0, ";SENSOR2:")
-
-                contact_rep_line.insert(
-                    6, str(ambigous_bearing) if ambigous_bearing else "NULL",
-                )
+    def connection_parameters(self):
+        """Arguments to create another :class:`DataStore` on the same database, e.g.
+        in another process
 
-                contact_rep_line.insert(
-                    7, str(contact.freq) if contact.freq else "NULL",
+        :return: Keyword arguments of :class:`DataStore`
+        :rtype: Dict
+        """
+        url = self.engine.url
+        return {
+            "db_username": url.username or "",
+            "db_password": url.password or "",
+            "db_host": url.host or "",
+            "db_port": url.port or 0,
+            "db_name": self.db_name,
+            "db_type": self.db_type,
+            "compact_logged_tables": list(self.compact_logged_tables),
+            "bulk_load": self.bulk_load,
+        }
+
+    def _stream_rows(self, query, chunk_size=EXPORT_CHUNK_SIZE):
+        """Yield the rows of the query, fetched in chunks (with a server side cursor
+        on PostgreSQL)"""
+        rows = self.session.execute(query.execution_options(stream_results=True))
+        try:
+            while True:
+                chunk = rows.fetchmany(chunk_size)
+                if not chunk:
+                    return
+                yield from chunk
+        finally:
+            rows.close()
+
+    def _export_states_query(self, datafile_id, start=None, end=None):
+        State = self.db_classes.State
+        Sensor = self.db_classes.Sensor
+        Platform = self.db_classes.Platform
+        location = State.__table__.c._location
+        query = (
+            select(
+                [
+                    State.time,
+                    Platform.name.label("platform_name"),
+                    func.ST_Y(location).label("latitude"),
+                    func.ST_X(location).label("longitude"),
+                    State._heading.label("heading"),
+                    State._speed.label("speed"),
+                    State._elevation.label("elevation"),
+                ]
+            )
+            .select_from(
+                State.__table__.outerjoin(
+                    Sensor.__table__, Sensor.sensor_id == State.sensor_id
+                ).outerjoin(Platform.__table__, Platform.platform_id == Sensor.host)
+            )
+            .where(State.source_id == datafile_id)
+            .order_by(State.time)
+        )
+        return self._in_time_window(query, State.time, start, end)
+
+    def _export_contacts_query(self, datafile_id, start=None, end=None):
+        Contact = self.db_classes.Contact
+        Sensor = self.db_classes.Sensor
+        Platform = self.db_classes.Platform
+        location = Contact.__table__.c._location
+        query = (
+            select(
+                [
+                    Contact.time,
+                    Platform.name.label("platform_name"),
+                    Sensor.name.label("sensor_name"),
+                    func.ST_Y(location).label("latitude"),
+                    func.ST_X(location).label("longitude"),
+                    Contact.bearing,
+                    Contact.freq,
+                ]
+            )
+            .select_from(
+                Contact.__table__.outerjoin(
+                    Sensor.__table__, Sensor.sensor_id == Contact.sensor_id
+                ).outerjoin(Platform.__table__, Platform.platform_id == Sensor.host)
+            )
+            .where(Contact.source_id == datafile_id)
+            .order_by(Contact.time)
+        )
+        return self._in_time_window(query, Contact.time, start, end)
+
+    def _export_comments_query(self, datafile_id, start=None, end=None):
+        Comment = self.db_classes.Comment
+        CommentType = self.db_classes.CommentType
+        Platform = self.db_classes.Platform
+        query = (
+            select(
+                [
+                    Comment.time,
+                    Platform.name.label("platform_name"),
+                    CommentType.name.label("comment_type_name"),
+                    Comment.content,
+                ]
+            )
+            .select_from(
+                Comment.__table__.outerjoin(
+                    Platform.__table__, Platform.platform_id == Comment.platform_id
+                ).outerjoin(
+                    CommentType.__table__,
+                    CommentType.comment_type_id == Comment.comment_type_id,
                 )
-            else:
-                contact_rep_line.insert(0, ";SENSOR:")
-            print(contact_rep_line)
-            data = " ".join(contact_rep_line)
-            print(data)
-            f.write(data + "\r\n")
-
-        for i, comment in enumerate(comments):
-            vessel_name = self.get_cached_platform_name(platform_id=comment.platform_id)
-            message = comment.content
-            comment_type_name = self.get_cached_comment_type_name(
-                comment.comment_type_id
             )
+            .where(Comment.source_id == datafile_id)
+            .order_by(Comment.time)
+        )
+        return self._in_time_window(query, Comment.time, start, end)
+
+    @staticmethod
+    def _in_time_window(query, time_column, start, end):
+        """Restrict the query to the rows whose time is between start and end, either
+        of which can be None to leave that side open"""
+        if start is not None:
+            query = query.where(time_column >= start)
+        if end is not None:
+            query = query.where(time_column <= end)
+        return query
+
+    @staticmethod
+    def _state_rep_line(row):
+        if row.elevation is None:
+            depth = "NaN"
+        elif row.elevation == 0.0:
+            depth = "0.0"
+        else:
+            depth = str(-1 * row.elevation)
+
+        state_rep_line = [
+            transformer.format_datatime(row.time),
+            '"' + (row.platform_name or "[Not Found]") + '"',
+            "AA",
+            transformer.format_point(row.latitude, row.longitude),
+            str(math.degrees(row.heading)) if row.heading else "0",
+            str(round(row.speed / unit_converter.KNOTS_TO_METRES_PER_SECOND, 3))
+            if row.speed
+            else "0",
+            depth,
+        ]
+        return " ".join(state_rep_line)
+
+    @staticmethod
+    def _contact_rep_line(row):
+        contact_rep_line = [
+            transformer.format_datatime(row.time),
+            row.platform_name or "[Not Found]",
+            "@@",
+            transformer.format_point(row.latitude, row.longitude)
+            if row.latitude is not None
+            else "NULL",
+            str(math.degrees(row.bearing)) if row.bearing else "NULL",
+            "NULL",  # unit_converter.convert_meter_to_yard(contact.range) if contact.range else "NULL",
+            row.sensor_name or "[Not Found]",
+            "N/A",
+        ]
 
-            comment_rep_line = [
-                transformer.format_datatime(comment.time),
-                vessel_name,
-                comment_type_name,
-                message,
-            ]
+        ambigous_bearing = None  # TODO: ambigous bearing.
+        if ambigous_bearing or row.freq:
+            contact_rep_line.insert(0, ";SENSOR2:")
 
-            if comment_type_name == "None":
-                comment_rep_line.insert(0, ";NARRATIVE:")
-                del comment_rep_line[3]
-            else:
-                comment_rep_line.insert(0, ";NARRATIVE2:")
+            contact_rep_line.insert(
+                6, str(ambigous_bearing) if ambigous_bearing else "NULL",
+            )
+
+            contact_rep_line.insert(
+                7, str(row.freq) if row.freq else "NULL",
+            )
+        else:
+            contact_rep_line.insert(0, ";SENSOR:")
+        return " ".join(contact_rep_line)
+
+    @staticmethod
+    def _comment_rep_line(row):
+        comment_type_name = str(row.comment_type_name)
+        comment_rep_line = [
+            transformer.format_datatime(row.time),
+            row.platform_name or "[Not Found]",
+            comment_type_name,
+            row.content,
+        ]
 
-            data = " ".join(comment_rep_line)
-            f.write(data + "\r\n")
-        f.close()
+        if comment_type_name == "None":
+            comment_rep_line.insert(0, ";NARRATIVE:")
+            del comment_rep_line[3]
+        else:
+            comment_rep_line.insert(0, ";NARRATIVE2:")
+        return " ".join(comment_rep_line)
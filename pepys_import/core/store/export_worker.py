@@ -0,0 +1,35 @@
+# The DataStore of each worker process, set up by init_export_worker
+_data_store = None
+
+
+def init_export_worker(data_store_class, connection_parameters):
+    """
+    Set up a worker process of DataStore.export_datafiles, with its own connection to
+    the database.
+
+    :param data_store_class: Class of the DataStore that owns the pool
+    :type data_store_class: type
+    :param connection_parameters: Arguments to create the DataStore of the worker,
+    see :meth:`DataStore.connection_parameters`
+    :type connection_parameters: Dict
+    """
+    global _data_store
+    _data_store = data_store_class(
+        **connection_parameters, welcome_text=None, show_status=False
+    )
+
+
+def export_datafile_in_worker(task):
+    """
+    Export a single datafile in a worker process, see :meth:`DataStore.export_datafile`
+
+    :param task: ID of the datafile, path of the REP file without its extension, and
+    start and end of the time window
+    :type task: Tuple
+    :return: Path of the REP file written
+    :rtype: String
+    """
+    datafile_id, path, start, end = task
+    with _data_store.session_scope():
+        _data_store.export_datafile(datafile_id, path, start, end)
+    return f"{path}.rep"
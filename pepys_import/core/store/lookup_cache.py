@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+# Maximum number of lookup results kept by default
+DEFAULT_MAX_SIZE = 10000
+
+
+class LookupCache:
+    """
+    Bounded, least recently used cache of the results of DataStore lookups.
+
+    Results are stored by table and lookup key (e.g. the name searched for), and
+    misses are loaded through the given function. Writing to a table invalidates
+    all the results stored for it, including lookups that found nothing.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        """
+        :param max_size: Maximum number of results kept, the least recently used
+        ones are evicted beyond it
+        :type max_size: Integer
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # keys of the entries of each table, to invalidate them without a scan
+        self._keys_by_table = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_load(self, table, key, load):
+        """Return the cached result of the lookup, or load and cache it
+
+        :param table: Name of the table the lookup reads
+        :type table: String
+        :param key: Arguments of the lookup
+        :param load: Function doing the lookup, called on a miss
+        :type load: Callable
+        :return: Result of the lookup
+        """
+        cache_key = (table, key)
+        if cache_key in self._entries:
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return self._entries[cache_key]
+
+        self.misses += 1
+        value = load()
+        self._entries[cache_key] = value
+        self._keys_by_table.setdefault(table, set()).add(cache_key)
+        if len(self._entries) > self.max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._keys_by_table[evicted_key[0]].discard(evicted_key)
+            self.evictions += 1
+        return value
+
+    def invalidate(self, table):
+        """Forget the results of all lookups of the table
+
+        :param table: Name of the table written to
+        :type table: String
+        """
+        for cache_key in self._keys_by_table.pop(table, ()):
+            del self._entries[cache_key]
+            self.invalidations += 1
+
+    def clear(self):
+        """Forget all results, keeping the statistics"""
+        self._entries.clear()
+        self._keys_by_table.clear()
+
+    def stats(self):
+        """Statistics of the use of the cache since it was created
+
+        :return: Numbers of hits, misses, evictions and invalidated results, the
+        current size and the hit rate
+        :rtype: Dict
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "size": len(self._entries),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
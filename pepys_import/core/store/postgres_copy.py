@@ -0,0 +1,88 @@
+import io
+
+from datetime import datetime
+from geoalchemy2 import Geometry
+
+from pepys_import.core.formats.ewkb import ewkt_to_ewkb
+
+# Written for NULL values: the default NULL of the CSV format of COPY, an unquoted
+# empty field. Every other value is quoted, so that no text can be read as NULL
+NULL = ""
+
+
+def format_value(column, value):
+    """Format a value of the given column as a field of a COPY CSV row
+
+    :param column: Column the value is stored in
+    :type column: Column
+    :param value: Value of the column
+    :return: Text of the field
+    :rtype: String
+    """
+    if value is None:
+        return NULL
+    if isinstance(column.type, Geometry):
+        if isinstance(value, str):
+            # points are kept as EWKT by LocationPropertyMixin, send them as EWKB
+            value = ewkt_to_ewkb(value)
+        else:
+            # a WKBElement, already holding the hexadecimal EWKB
+            value = value.desc
+    elif isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, float):
+        value = repr(value)
+    else:
+        value = str(value)
+    return '"' + value.replace('"', '""') + '"'
+
+
+def rows_to_csv(table, rows):
+    """Write the rows in the CSV format of COPY
+
+    :param table: Table the rows are copied to
+    :type table: Table
+    :param rows: Rows, as dictionaries of column names to values
+    :type rows: List
+    :return: Column names, and the CSV text of the rows
+    :rtype: Tuple
+    """
+    columns = list(table.columns)
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(
+            ",".join(format_value(column, row.get(column.name)) for column in columns)
+        )
+        buffer.write("\n")
+    buffer.seek(0)
+    return [column.name for column in columns], buffer
+
+
+def copy_rows(session, table, rows):
+    """Stream the rows into the table with COPY ... FROM STDIN, in the transaction
+    of the session
+
+    All columns are sent, so primary keys and defaults must already be set.
+
+    :param session: Session of a :class:`DataStore` on PostgreSQL
+    :type session: Session
+    :param table: Table the rows are copied to
+    :type table: Table
+    :param rows: Rows, as dictionaries of column names to values
+    :type rows: List
+    """
+    if not rows:
+        return
+    column_names, buffer = rows_to_csv(table, rows)
+    columns = ", ".join(f'"{name}"' for name in column_names)
+    query = (
+        f'COPY "{table.schema}"."{table.name}" ({columns}) '
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    # rows added through the ORM (e.g. the Datafile) must be there first
+    session.flush()
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(query, buffer)
+    finally:
+        cursor.close()
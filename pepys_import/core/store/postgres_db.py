@@ -1,6 +1,15 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DATE, ForeignKey, DateTime
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Boolean,
+    DATE,
+    ForeignKey,
+    DateTime,
+    Index,
+)
 from sqlalchemy.dialects.postgresql import UUID, TIMESTAMP, DOUBLE_PRECISION
 from sqlalchemy.orm import relationship
 
@@ -56,7 +65,10 @@ class Sensor(BasePostGIS, SensorMixin):
     __tablename__ = constants.SENSOR
     table_type = TableTypes.METADATA
     table_type_id = 2
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Sensors_name_host", "name", "host"),
+        {"schema": "pepys"},
+    )
 
     sensor_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(150), nullable=False)
@@ -75,7 +87,12 @@ class Platform(BasePostGIS, PlatformMixin):
     __tablename__ = constants.PLATFORM
     table_type = TableTypes.METADATA
     table_type_id = 3
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Platforms_name", "name"),
+        Index("ix_Platforms_trigraph", "trigraph"),
+        Index("ix_Platforms_quadgraph", "quadgraph"),
+        {"schema": "pepys"},
+    )
 
     platform_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(150), nullable=False)
@@ -148,7 +165,10 @@ class Datafile(BasePostGIS, DatafileMixin):
     __tablename__ = constants.DATAFILE
     table_type = TableTypes.METADATA
     table_type_id = 6  # Only needed for tables referenced by Entry table
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Datafiles_reference", "reference"),
+        {"schema": "pepys"},
+    )
 
     datafile_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     simulated = Column(Boolean)
@@ -162,6 +182,8 @@ class Datafile(BasePostGIS, DatafileMixin):
     )
     reference = Column(String(150))
     url = Column(String(150))
+    size = Column(Integer)
+    hash = Column(String(64), index=True)
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
@@ -169,7 +191,10 @@ class Synonym(BasePostGIS):
     __tablename__ = constants.SYNONYM
     table_type = TableTypes.METADATA
     table_type_id = 7
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Synonyms_synonym_table", "synonym", "table"),
+        {"schema": "pepys"},
+    )
 
     synonym_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     table = Column(String(150), nullable=False)
@@ -205,6 +230,10 @@ class Log(BasePostGIS):
     change_id = Column(
         UUID(as_uuid=True), ForeignKey("pepys.Changes.change_id"), nullable=False
     )
+    # set by the single Log of the measurements of a datafile, see add_range_to_logs
+    last_id = Column(UUID(as_uuid=True))
+    row_count = Column(Integer)
+    datafile_id = Column(UUID(as_uuid=True), ForeignKey("pepys.Datafiles.datafile_id"))
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
@@ -249,6 +278,19 @@ class TaggedItem(BasePostGIS):
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
+class TableStatistic(BasePostGIS):
+    __tablename__ = constants.TABLE_STATISTICS
+    table_type = TableTypes.METADATA
+    table_type_id = 35
+    __table_args__ = {"schema": "pepys"}
+
+    # maintained by each transaction of a DataStore, see table_statistics
+    table_name = Column(String(150), primary_key=True)
+    row_count = Column(Integer, nullable=False)
+    last_created_date = Column(DateTime)
+    created_date = Column(DateTime, default=datetime.utcnow)
+
+
 # Reference Tables
 class PlatformType(BasePostGIS):
     __tablename__ = constants.PLATFORM_TYPE
@@ -428,7 +470,11 @@ class State(BasePostGIS, StateMixin, ElevationPropertyMixin, LocationPropertyMix
     __tablename__ = constants.STATE
     table_type = TableTypes.MEASUREMENT
     table_type_id = 28
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_States_sensor_id_time", "sensor_id", "time"),
+        Index("ix_States_source_id", "source_id"),
+        {"schema": "pepys"},
+    )
 
     state_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     time = Column(TIMESTAMP, nullable=False)
@@ -456,7 +502,11 @@ class Contact(BasePostGIS, ContactMixin, LocationPropertyMixin):
     __tablename__ = constants.CONTACT
     table_type = TableTypes.MEASUREMENT
     table_type_id = 29
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Contacts_sensor_id_time", "sensor_id", "time"),
+        Index("ix_Contacts_source_id", "source_id"),
+        {"schema": "pepys"},
+    )
 
     contact_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     name = Column(String(150))
@@ -541,7 +591,11 @@ class Comment(BasePostGIS, CommentMixin):
     __tablename__ = constants.COMMENT
     table_type = TableTypes.MEASUREMENT
     table_type_id = 32
-    __table_args__ = {"schema": "pepys"}
+    __table_args__ = (
+        Index("ix_Comments_platform_id_time", "platform_id", "time"),
+        Index("ix_Comments_source_id", "source_id"),
+        {"schema": "pepys"},
+    )
 
     comment_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
     platform_id = Column(
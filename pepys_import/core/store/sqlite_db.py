@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, Boolean, DATE, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DATE, DateTime, Index
 from sqlalchemy.dialects.sqlite import TIMESTAMP, REAL
 
 from geoalchemy2 import Geometry
@@ -42,6 +42,7 @@ class Sensor(BaseSpatiaLite, SensorMixin):
     __tablename__ = constants.SENSOR
     table_type = TableTypes.METADATA
     table_type_id = 2
+    __table_args__ = (Index("ix_Sensors_name_host", "name", "host"),)
 
     sensor_id = Column(Integer, primary_key=True)
     name = Column(String(150), nullable=False)
@@ -54,6 +55,11 @@ class Platform(BaseSpatiaLite, PlatformMixin):
     __tablename__ = constants.PLATFORM
     table_type = TableTypes.METADATA
     table_type_id = 3
+    __table_args__ = (
+        Index("ix_Platforms_name", "name"),
+        Index("ix_Platforms_trigraph", "trigraph"),
+        Index("ix_Platforms_quadgraph", "quadgraph"),
+    )
 
     platform_id = Column(Integer, primary_key=True)
     name = Column(String(150), nullable=False)
@@ -105,6 +111,7 @@ class Datafile(BaseSpatiaLite, DatafileMixin):
     __tablename__ = constants.DATAFILE
     table_type = TableTypes.METADATA
     table_type_id = 6
+    __table_args__ = (Index("ix_Datafiles_reference", "reference"),)
 
     datafile_id = Column(Integer, primary_key=True)
     simulated = Column(Boolean, nullable=False)
@@ -112,6 +119,8 @@ class Datafile(BaseSpatiaLite, DatafileMixin):
     datafile_type_id = Column(Integer, nullable=False)
     reference = Column(String(150))
     url = Column(String(150))
+    size = Column(Integer)
+    hash = Column(String(64), index=True)
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
@@ -119,6 +128,7 @@ class Synonym(BaseSpatiaLite):
     __tablename__ = constants.SYNONYM
     table_type = TableTypes.METADATA
     table_type_id = 7
+    __table_args__ = (Index("ix_Synonyms_synonym_table", "synonym", "table"),)
 
     synonym_id = Column(Integer, primary_key=True)
     table = Column(String(150), nullable=False)
@@ -150,6 +160,10 @@ class Log(BaseSpatiaLite):
     field = Column(String(150))
     new_value = Column(String(150))
     change_id = Column(Integer, nullable=False)
+    # set by the single Log of the measurements of a datafile, see add_range_to_logs
+    last_id = Column(Integer)
+    row_count = Column(Integer)
+    datafile_id = Column(Integer)
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
@@ -189,6 +203,18 @@ class TaggedItem(BaseSpatiaLite):
     created_date = Column(DateTime, default=datetime.utcnow)
 
 
+class TableStatistic(BaseSpatiaLite):
+    __tablename__ = constants.TABLE_STATISTICS
+    table_type = TableTypes.METADATA
+    table_type_id = 35
+
+    # maintained by each transaction of a DataStore, see table_statistics
+    table_name = Column(String(150), primary_key=True)
+    row_count = Column(Integer, nullable=False)
+    last_created_date = Column(DateTime)
+    created_date = Column(DateTime, default=datetime.utcnow)
+
+
 # Reference Tables
 class PlatformType(BaseSpatiaLite):
     __tablename__ = constants.PLATFORM_TYPE
@@ -352,6 +378,10 @@ class State(BaseSpatiaLite, StateMixin, ElevationPropertyMixin, LocationProperty
     __tablename__ = constants.STATE
     table_type = TableTypes.MEASUREMENT
     table_type_id = 28
+    __table_args__ = (
+        Index("ix_States_sensor_id_time", "sensor_id", "time"),
+        Index("ix_States_source_id", "source_id"),
+    )
 
     state_id = Column(Integer, primary_key=True)
     time = Column(TIMESTAMP, nullable=False)
@@ -375,6 +405,10 @@ class Contact(BaseSpatiaLite, ContactMixin, LocationPropertyMixin):
     __tablename__ = constants.CONTACT
     table_type = TableTypes.MEASUREMENT
     table_type_id = 29
+    __table_args__ = (
+        Index("ix_Contacts_sensor_id_time", "sensor_id", "time"),
+        Index("ix_Contacts_source_id", "source_id"),
+    )
 
     contact_id = Column(Integer, primary_key=True)
     name = Column(String(150))
@@ -444,6 +478,10 @@ class Comment(BaseSpatiaLite, CommentMixin):
     __tablename__ = constants.COMMENT
     table_type = TableTypes.MEASUREMENT
     table_type_id = 32
+    __table_args__ = (
+        Index("ix_Comments_platform_id_time", "platform_id", "time"),
+        Index("ix_Comments_source_id", "source_id"),
+    )
 
     comment_id = Column(Integer, primary_key=True)
     platform_id = Column(Integer)
@@ -0,0 +1,242 @@
+import numpy as np
+
+from geoalchemy2 import WKBElement
+
+from pepys_import.core.formats.ewkb import SRID, encode_point, encode_points
+from pepys_import.core.formats.location import Location
+from pepys_import.core.validators import constants as validation_constants
+
+# Radius of the earth in kilometres, as used by the enhanced validator
+EARTH_RADIUS = 6371
+# Rows this close to a limit of the vectorised checks are still given to the
+# validators, so that rounding can't make them pass here and fail there
+TOLERANCE = 1e-6
+
+
+class StateColumns:
+    """
+    States parsed from a block of lines, held as columns rather than as
+    :class:`State` objects, for importers which parse many lines at once. They are
+    added to a datafile with :meth:`DatafileMixin.create_state_columns`, and
+    inserted straight from the columns by :meth:`DataStore.bulk_add_measurements`.
+
+    Values are in SI units, as given to :meth:`State.set_si_values`, and locations
+    are in decimal degrees. The previous location of the platform of each row, used
+    by the enhanced validator, is NaN for the first state of a platform.
+
+    The validators still see rows as :class:`State` objects, see
+    :meth:`rows_to_validate`.
+    """
+
+    def __init__(
+        self,
+        state_class,
+        source_id,
+        sensor_ids,
+        platform_names,
+        sensor_names,
+        times,
+        latitudes,
+        longitudes,
+        headings,
+        speeds,
+        elevations,
+        prev_latitudes,
+        prev_longitudes,
+    ):
+        """
+        :param state_class: :class:`State` class of the data store
+        :type state_class: type
+        :param source_id: ID of the datafile the states are parsed from
+        :type source_id: Integer or UUID
+        :param sensor_ids: ID of the sensor of each state
+        :type sensor_ids: List
+        :param platform_names: Name of the platform of each state
+        :type platform_names: List
+        :param sensor_names: Name of the sensor of each state
+        :type sensor_names: List
+        :param times: Times, as datetime64[us]
+        :type times: numpy.ndarray
+        :param latitudes: Latitudes in decimal degrees
+        :type latitudes: numpy.ndarray
+        :param longitudes: Longitudes in decimal degrees
+        :type longitudes: numpy.ndarray
+        :param headings: Headings in radians
+        :type headings: numpy.ndarray
+        :param speeds: Speeds in metres per second
+        :type speeds: numpy.ndarray
+        :param elevations: Elevations in metres
+        :type elevations: numpy.ndarray
+        :param prev_latitudes: Latitude of the previous state of the platform
+        :type prev_latitudes: numpy.ndarray
+        :param prev_longitudes: Longitude of the previous state of the platform
+        :type prev_longitudes: numpy.ndarray
+        """
+        self.state_class = state_class
+        self.source_id = source_id
+        self.sensor_ids = sensor_ids
+        self.platform_names = platform_names
+        self.sensor_names = sensor_names
+        self.times = times
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.headings = headings
+        self.speeds = speeds
+        self.elevations = elevations
+        self.prev_latitudes = prev_latitudes
+        self.prev_longitudes = prev_longitudes
+        # IDs of the rows, once they are submitted
+        self.state_ids = None
+
+    def __len__(self):
+        return len(self.times)
+
+    def create_state(self, row):
+        """The state of a row, as a :class:`State` object which isn't added to the
+        session, with the previous location of its platform
+
+        :param row: Index of the row
+        :type row: Integer
+        :rtype: State
+        """
+        state = self.state_class(
+            sensor_id=self.sensor_ids[row],
+            time=self.times[row].tolist(),
+            source_id=self.source_id,
+        )
+        state.platform_name = self.platform_names[row]
+        state.sensor_name = self.sensor_names[row]
+        state.set_si_values(
+            speed=float(self.speeds[row]),
+            heading=float(self.headings[row]),
+            elevation=float(self.elevations[row]),
+        )
+        state.location = _location(self.latitudes[row], self.longitudes[row])
+        if not np.isnan(self.prev_latitudes[row]):
+            state.prev_location = _location(
+                self.prev_latitudes[row], self.prev_longitudes[row]
+            )
+        return state
+
+    def create_states(self):
+        """The states of all rows, see :meth:`create_state`
+
+        :rtype: List
+        """
+        return [self.create_state(row) for row in range(len(self))]
+
+    def submit(self, data_store, change_id):
+        """Submit the states to the DB one at a time, as :meth:`State.submit` does"""
+        states = self.create_states()
+        for state in states:
+            state.submit(data_store, change_id)
+        self.state_ids = [state.state_id for state in states]
+
+    def mappings(self, ewkb=False):
+        """
+        Yield the column values of each row, by attribute of :class:`State`, as given
+        to ``bulk_insert_mappings``, so the rows are the same as those of submitted
+        :class:`State` objects.
+
+        :param ewkb: Whether to give the locations as EWKB, encoded from the columns
+        in one go, which PostgreSQL reads as it is. Otherwise they are EWKT, as
+        :class:`Location` writes them, which is what SpatiaLite reads
+        :type ewkb: bool
+        :rtype: Iterator
+        """
+        if ewkb:
+            locations = [
+                WKBElement(point, srid=SRID, extended=True)
+                for point in encode_points(
+                    self.longitudes.tolist(), self.latitudes.tolist()
+                )
+            ]
+        else:
+            locations = [
+                f"SRID={SRID};POINT({longitude} {latitude})"
+                for longitude, latitude in zip(
+                    self.longitudes.tolist(), self.latitudes.tolist()
+                )
+            ]
+        for values in zip(
+            self.times.tolist(),
+            self.sensor_ids,
+            locations,
+            self.elevations.tolist(),
+            self.headings.tolist(),
+            self.speeds.tolist(),
+        ):
+            time, sensor_id, location, elevation, heading, speed = values
+            yield {
+                "time": time,
+                "sensor_id": sensor_id,
+                "_location": location,
+                "_elevation": elevation,
+                "_heading": heading,
+                "_speed": speed,
+                "source_id": self.source_id,
+            }
+
+    def rows_to_validate(self, validation_level):
+        """
+        Rows which may not pass the checks of :class:`BasicValidator`, and of
+        :class:`EnhancedValidator` at the enhanced level, found with vectorised
+        versions of those checks. Only these rows need to be given to the validators,
+        which report the errors.
+
+        :param validation_level: Validation level
+        :type validation_level: String
+        :return: Indices of the rows
+        :rtype: List
+        """
+        headings = np.degrees(self.headings)
+        passing = (
+            _within(self.latitudes, -90, 90)
+            & _within(self.longitudes, -180, 180)
+            & _within(headings, 0, 360)
+        )
+        if validation_level == validation_constants.ENHANCED_LEVEL:
+            has_prev = ~np.isnan(self.prev_latitudes)
+            longitude_1 = np.radians(self.prev_longitudes)
+            latitude_1 = np.radians(self.prev_latitudes)
+            longitude_2 = np.radians(self.longitudes)
+            latitude_2 = np.radians(self.latitudes)
+            diff_longitude = longitude_2 - longitude_1
+            diff_latitude = latitude_2 - latitude_1
+
+            # course_heading_loose_match_with_location, with no course
+            y = np.sin(diff_longitude) * np.cos(latitude_2)
+            x = np.cos(latitude_1) * np.sin(latitude_2) - np.sin(latitude_1) * np.cos(
+                latitude_2
+            ) * np.cos(diff_longitude)
+            bearings = (np.degrees(np.arctan2(y, x)) + 360) % 360
+            bearing_errors = 180 - np.abs(np.abs(headings - bearings) - 180)
+            matching = bearing_errors < 90 - TOLERANCE
+
+            # speed_loose_match_with_location, which takes the distance between the
+            # locations as kilometres per hour
+            a = (
+                np.sin(diff_latitude / 2) ** 2
+                + np.cos(latitude_1)
+                * np.cos(latitude_2)
+                * np.sin(diff_longitude / 2) ** 2
+            )
+            distances = 2 * np.arcsin(np.sqrt(a)) * EARTH_RADIUS
+            calculated_speeds = distances / 3.6
+            matching &= calculated_speeds < self.speeds * 10 - TOLERANCE
+
+            passing &= ~has_prev | matching
+        return np.flatnonzero(~passing).tolist()
+
+
+def _within(values, minimum, maximum):
+    # NaN, which the validators reject, is left out as well
+    return (values > minimum + TOLERANCE) & (values < maximum - TOLERANCE)
+
+
+def _location(latitude, longitude):
+    # set as a location read from the database is, without the range checks, which
+    # a previous location beyond the pole, as kept by REPLine, wouldn't pass
+    location = Location()
+    location.set_from_wkb(encode_point(float(longitude), float(latitude)))
+    return location
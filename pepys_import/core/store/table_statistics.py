@@ -0,0 +1,202 @@
+from sqlalchemy import case, func, select, text
+
+from pepys_import.core.store import constants
+
+# Keys of Session.info holding the changes to the statistics not written yet, and
+# whether the TableStatistics table exists in the database of the session
+PENDING_STATISTICS = "pending_table_statistics"
+STATISTICS_EXIST = "table_statistics_exist"
+
+
+def statistics_table(metadata):
+    """The TableStatistics table of the given metadata
+
+    :param metadata: Metadata of the models of a database type
+    :type metadata: MetaData
+    :rtype: Table
+    """
+    for table in metadata.tables.values():
+        if table.name == constants.TABLE_STATISTICS:
+            return table
+    return None
+
+
+def statistics_exist(session, statistics):
+    """Whether the TableStatistics table exists in the database of the session, which
+    isn't the case for databases created by earlier versions until they are
+    initialised again"""
+    if STATISTICS_EXIST not in session.info:
+        connection = session.connection()
+        session.info[STATISTICS_EXIST] = connection.dialect.has_table(
+            connection, statistics.name, schema=statistics.schema
+        )
+    return session.info[STATISTICS_EXIST]
+
+
+def record_rows(session, table_name, added=0, deleted=0, created_date=None):
+    """
+    Record rows added to or deleted from a table in the current transaction, to be
+    written to TableStatistics by :func:`write_pending_statistics`.
+
+    :param session: Session the rows were written by
+    :type session: Session
+    :param table_name: Name of the table
+    :type table_name: String
+    :param added: Number of rows added
+    :type added: Integer
+    :param deleted: Number of rows deleted
+    :type deleted: Integer
+    :param created_date: Latest creation date of the added rows
+    :type created_date: datetime
+    """
+    if table_name == constants.TABLE_STATISTICS:
+        return
+    pending = session.info.setdefault(PENDING_STATISTICS, dict())
+    row_count, last_created_date = pending.get(table_name, (0, None))
+    if created_date is not None and (
+        last_created_date is None or created_date > last_created_date
+    ):
+        last_created_date = created_date
+    pending[table_name] = (row_count + added - deleted, last_created_date)
+
+
+def record_flushed_rows(session, flush_context):
+    """Listener of the "after_flush" event of a session, recording the rows its ORM
+    objects added and deleted"""
+    for instance in session.new:
+        record_rows(
+            session,
+            instance.__tablename__,
+            added=1,
+            created_date=getattr(instance, "created_date", None),
+        )
+    for instance in session.deleted:
+        record_rows(session, instance.__tablename__, deleted=1)
+
+
+def discard_pending_statistics(session):
+    """Listener of the "after_rollback" event of a session, forgetting the rows
+    recorded in the transaction rolled back"""
+    session.info.pop(PENDING_STATISTICS, None)
+
+
+def write_pending_statistics(session, statistics):
+    """
+    Apply the recorded changes to TableStatistics, in the transaction of the session,
+    with a single UPDATE for each table written to.
+
+    Tables without statistics are left alone, so that they are counted when they are
+    summarised, see :class:`TableSummary`.
+
+    :param session: Session the rows were written by
+    :type session: Session
+    :param statistics: TableStatistics table
+    :type statistics: Table
+    """
+    pending = session.info.pop(PENDING_STATISTICS, None)
+    if not pending or not statistics_exist(session, statistics):
+        return
+    for table_name, (row_count, created_date) in pending.items():
+        values = {"row_count": statistics.c.row_count + row_count}
+        if created_date is not None:
+            last_created_date = statistics.c.last_created_date
+            values["last_created_date"] = case(
+                [
+                    (last_created_date.is_(None), created_date),
+                    (last_created_date < created_date, created_date),
+                ],
+                else_=last_created_date,
+            )
+        session.execute(
+            statistics.update()
+            .where(statistics.c.table_name == table_name)
+            .values(values)
+        )
+
+
+def count_rows(session, table):
+    """Number of rows and latest creation date of the model's table, with a scan
+
+    :param session: Session or connection to query with
+    :type session: Session
+    :param table: Model of the table
+    :type table: SQLAlchemy Declarative Base
+    :return: Number of rows, and the latest creation date or None if it is empty
+    :rtype: Tuple
+    """
+    return tuple(
+        session.execute(
+            select([func.count(), func.max(table.created_date)]).select_from(
+                table.__table__
+            )
+        ).first()
+    )
+
+
+def estimate_row_count(session, table):
+    """
+    Number of rows of the model's table as estimated by the database from its last
+    analysis: reltuples of pg_class on PostgreSQL, sqlite_stat1 on SQLite.
+
+    :param session: Session to query with
+    :type session: Session
+    :param table: Model of the table
+    :type table: SQLAlchemy Declarative Base
+    :return: Estimated number of rows, or None if the table hasn't been analysed
+    :rtype: Integer
+    """
+    table_name = table.__tablename__
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        estimate = session.execute(
+            text("SELECT reltuples FROM pg_class WHERE oid = CAST(:name AS regclass)"),
+            {"name": f'"{table.__table__.schema}"."{table_name}"'},
+        ).scalar()
+        # -1 for tables never analysed
+        if estimate is None or estimate < 0:
+            return None
+        return int(estimate)
+
+    if not connection.dialect.has_table(connection, "sqlite_stat1"):
+        return None
+    stat = session.execute(
+        text("SELECT stat FROM sqlite_stat1 WHERE tbl = :name LIMIT 1"),
+        {"name": table_name},
+    ).scalar()
+    if stat is None:
+        return None
+    # the first number of each row of sqlite_stat1 is the number of rows of the table
+    return int(stat.split()[0])
+
+
+def seed_statistics(session, statistics, tables):
+    """
+    Add the statistics of the model tables which have none, counting their rows.
+
+    :param session: Session or connection to write with
+    :type session: Session
+    :param statistics: TableStatistics table
+    :type statistics: Table
+    :param tables: Models of the tables
+    :type tables: List
+    :return: Names of the tables whose statistics were added
+    :rtype: List
+    """
+    known_tables = {
+        row.table_name for row in session.execute(select([statistics.c.table_name]))
+    }
+    seeded_tables = list()
+    for table in tables:
+        table_name = table.__tablename__
+        if table_name in known_tables or table_name == constants.TABLE_STATISTICS:
+            continue
+        row_count, last_created_date = count_rows(session, table)
+        session.execute(
+            statistics.insert().values(
+                table_name=table_name,
+                row_count=row_count,
+                last_created_date=last_created_date,
+            )
+        )
+        seeded_tables.append(table_name)
+    return seeded_tables
@@ -1,35 +1,68 @@
+from sqlalchemy import select
 from tabulate import tabulate
 
+from .table_statistics import (
+    count_rows,
+    estimate_row_count,
+    statistics_exist,
+    statistics_table,
+    write_pending_statistics,
+)
+
 
 class TableSummary(object):
     """
-    A summary of the contents of a table, which sends query to DB and finds
-    number of rows and creation date of last item added.
+    A summary of the contents of a table: its number of rows and the creation date
+    of the last item added.
+
+    They are read from the statistics maintained by each transaction of a
+    :class:`DataStore` (see table_statistics). For tables without statistics, e.g.
+    in databases created by an earlier version, rows are counted, unless an
+    approximate summary is asked for and the database has estimated the number of
+    rows, in which case the creation date isn't known.
 
     :param session: Bounded session for querying table
     :type session: SQLAlchemy Session
     :param table: SQLAlchemy Table object
     :type table_name: SQLAlchemy Declarative Base
+    :param approximate: Whether to use the estimate of the database for tables
+    without statistics
+    :type approximate: bool
     """
 
-    def __init__(self, session, table):
+    def __init__(self, session, table, approximate=False):
         self.session = session
         self.table = table
         self.table_name = self.table.__tablename__
+        self.approximate = approximate
         self.number_of_rows = None
         self.created_date = None
         self.table_summary()
 
     def table_summary(self):
-        number_of_rows = self.session.query(self.table).count()
-        last_row = (
-            self.session.query(self.table)
-            .order_by(self.table.created_date.desc())
-            .first()
-        )
+        row = None
+        statistics = statistics_table(self.table.__table__.metadata)
+        if statistics is not None and statistics_exist(self.session, statistics):
+            # rows added by this transaction are recorded when they are flushed
+            self.session.flush()
+            write_pending_statistics(self.session, statistics)
+            row = self.session.execute(
+                select([statistics.c.row_count, statistics.c.last_created_date]).where(
+                    statistics.c.table_name == self.table_name
+                )
+            ).first()
+
+        if row is None and self.approximate:
+            number_of_rows = estimate_row_count(self.session, self.table)
+            if number_of_rows is not None:
+                row = (number_of_rows, None)
+        if row is None:
+            row = count_rows(self.session, self.table)
+
+        number_of_rows, last_created_date = row
         created_date = "-"
-        if last_row:
-            created_date = str(last_row.created_date)
+        if last_created_date:
+            created_date = str(last_created_date)
         self.number_of_rows = number_of_rows
         self.created_date = created_date
 
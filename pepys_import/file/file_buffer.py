@@ -0,0 +1,130 @@
+import hashlib
+import os
+
+# Files in streaming mode are hashed in chunks of this many bytes
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileBuffer:
+    """
+    The content of a datafile, read from disk once and shared by everything that
+    looks at it during an import: the content digest, importer sniffing, and the
+    lines and char index of the HighlightedFile.
+
+    The bytes are only kept until the text has been decoded, and the text is only
+    decoded when it is first needed, so a file that is skipped because of its digest
+    is never decoded.
+
+    In streaming mode the content isn't kept in memory. The digest is worked out
+    chunk by chunk, and the lines are read from disk every time they are iterated
+    over. The measurements parsed from the file are still held until it is
+    committed, and no usages are recorded to highlight it.
+    """
+
+    # Encodings tried in order when decoding the file. The last one maps
+    # (almost) every byte, so that any file can be sniffed
+    ENCODINGS = ["utf-8", "windows-1252"]
+
+    def __init__(self, path: str, streaming=False):
+        """
+        :param path: Full path of the file
+        :type path: String
+        :param streaming: Whether to read the file again each time it is needed,
+        rather than keeping it in memory
+        :type streaming: bool
+        """
+        self.path = path
+        self.streaming = streaming
+        self.size = os.path.getsize(path)
+        self._bytes = None
+        self._hash = None
+        self._text = None
+        self._lines = None
+
+    @classmethod
+    def decode(cls, raw):
+        """Decode the given bytes, with universal newlines"""
+        for encoding in cls.ENCODINGS[:-1]:
+            try:
+                text = raw.decode(encoding)
+                break
+            except UnicodeDecodeError:
+                continue
+        else:
+            text = raw.decode(cls.ENCODINGS[-1], errors="replace")
+        # Same newline handling as opening the file in text mode
+        return text.replace("\r\n", "\n").replace("\r", "\n")
+
+    def _read_bytes(self):
+        if self._bytes is None:
+            with open(self.path, "rb") as f:
+                self._bytes = f.read()
+        return self._bytes
+
+    @property
+    def hash(self):
+        """Hexadecimal SHA-256 digest of the file content"""
+        if self._hash is None:
+            if self.streaming:
+                file_hash = hashlib.sha256()
+                with open(self.path, "rb") as f:
+                    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                        file_hash.update(chunk)
+                self._hash = file_hash.hexdigest()
+            else:
+                self._hash = hashlib.sha256(self._read_bytes()).hexdigest()
+        return self._hash
+
+    @property
+    def text(self):
+        """Decoded content of the file, with universal newlines"""
+        if self._text is None:
+            raw = self._read_bytes()
+            self._text = self.decode(raw)
+            # The bytes aren't needed once decoded, so work out the digest first
+            if self._hash is None:
+                self._hash = hashlib.sha256(raw).hexdigest()
+            self._bytes = None
+        return self._text
+
+    @property
+    def lines(self):
+        """Lines of the file, without their line endings"""
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    def iter_lines(self):
+        """
+        Yield the lines of the file, without their line endings. In streaming mode
+        they are read from disk one at a time
+        """
+        if not self.streaming:
+            yield from self.lines
+            return
+        with open(self.path, "rb") as f:
+            for raw_line in f:
+                # A lone "\r" ends a line too, as it does in text mode
+                yield from self.decode(raw_line).splitlines()
+
+    @property
+    def first_line(self):
+        """First line of the file, including its line ending"""
+        if self.streaming:
+            with open(self.path, "rb") as f:
+                first_line = self.decode(f.readline())
+            end = first_line.find("\n")
+            return first_line if end == -1 else first_line[: end + 1]
+        end = self.text.find("\n")
+        if end == -1:
+            return self.text
+        return self.text[: end + 1]
+
+    def split_contents(self):
+        """
+        Content of the file split on each line ending, as given to importers. In
+        streaming mode the lines are returned as an iterator rather than a list
+        """
+        if self.streaming:
+            return self.iter_lines()
+        return self.text.split("\n")
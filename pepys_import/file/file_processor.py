@@ -1,12 +1,16 @@
 import inspect
 import importlib.util
 import json
+import multiprocessing
 import os
+import queue
 import shutil
 import sys
+import threading
 
 from datetime import datetime
 from getpass import getuser
+from itertools import chain
 from stat import S_IREAD
 
 from paths import IMPORTERS_DIRECTORY
@@ -15,13 +19,55 @@ from pepys_import.core.store.data_store import DataStore
 from pepys_import.core.store.table_summary import TableSummary, TableSummarySet
 from pepys_import.file.highlighter.highlighter import HighlightedFile
 from pepys_import.file.importer import Importer
+from pepys_import.file.file_buffer import FileBuffer
+from pepys_import.file.parse_worker import (
+    create_scratch_store,
+    init_parse_worker,
+    parse_file_in_batches,
+    parse_file_in_worker,
+)
 from pepys_import.utils.import_utils import import_module_
 
 USER = getuser()
+# Number of measurements inserted by each statement when a datafile is committed
+COMMIT_BATCH_SIZE = 1000
+# Number of batches of measurements (and parsed files they belong to) waiting to be
+# committed in pipelined mode
+PIPELINE_QUEUE_SIZE = 4
 
 
 class FileProcessor:
-    def __init__(self, filename=None, archive=False):
+    def __init__(
+        self,
+        filename=None,
+        archive=False,
+        streaming_size=None,
+        commit_batch_size=COMMIT_BATCH_SIZE,
+        highlight_page_size=None,
+        highlight=True,
+    ):
+        """
+        :param filename: Database file to use, if no DataStore is given to process
+        :type filename: String
+        :param archive: Whether to move the imported files to the output folder
+        :type archive: bool
+        :param streaming_size: Files larger than this many bytes are read line by
+        line in streaming mode, rather than being held in memory (never, if None).
+        Only the text of the file isn't held: its measurements are kept until it is
+        committed, as for any file, and no highlighted version of it is written
+        :type streaming_size: Integer
+        :param commit_batch_size: Number of measurements inserted at a time when a
+        datafile is committed (one by one, through the ORM, if None)
+        :type commit_batch_size: Integer
+        :param highlight_page_size: Highlighted files with more characters than this
+        are written as pages of about this many characters, with an index of them
+        (as a single page, if None)
+        :type highlight_page_size: Integer
+        :param highlight: Whether to record which parts of each file are imported,
+        and write a highlighted version of it. Importers can parse files faster
+        without, e.g. REP state lines are then parsed in vectorised batches
+        :type highlight: bool
+        """
         self.importers = []
         # Register local importers if any exists
         if LOCAL_PARSERS:
@@ -47,9 +93,18 @@ class FileProcessor:
                 os.makedirs(ARCHIVE_PATH)
             self.output_path = ARCHIVE_PATH
         self.archive = archive
+        self.streaming_size = streaming_size
+        self.commit_batch_size = commit_batch_size
+        self.highlight_page_size = highlight_page_size
+        self.highlight = highlight
 
     def process(
-        self, path: str, data_store: DataStore = None, descend_tree: bool = True
+        self,
+        path: str,
+        data_store: DataStore = None,
+        descend_tree: bool = True,
+        workers: int = 1,
+        pipelined: bool = False,
     ):
         """Process the data in the given path
 
@@ -59,6 +114,12 @@ class FileProcessor:
         :type data_store: DataStore
         :param descend_tree: Whether to recursively descend through the folder tree
         :type descend_tree: bool
+        :param workers: Number of processes parsing the files of a folder. With more
+        than one, files are parsed in parallel and committed by this process
+        :type workers: int
+        :param pipelined: Whether to parse the files of a folder in a background
+        thread, while the previous ones are committed by this one
+        :type pipelined: bool
         """
         dir_path = os.path.dirname(path)
         # create output folder if not exists
@@ -120,11 +181,15 @@ class FileProcessor:
                 )
                 print(first_table_summary_set.report("==Before=="))
 
+                # in bulk load mode, spatial indexes are built once at the end
+                suspended_indexes = data_store.suspend_spatial_indexes()
                 filename = os.path.abspath(path)
                 current_path = os.path.dirname(path)
                 processed_ctr = self.process_file(
                     filename, current_path, data_store, processed_ctr
                 )
+                data_store.rebuild_spatial_indexes(suspended_indexes)
+
                 states_sum = TableSummary(
                     data_store.session, data_store.db_classes.State
                 )
@@ -166,9 +231,21 @@ class FileProcessor:
             )
             print(first_table_summary_set.report("==Before=="))
 
+            # in bulk load mode, spatial indexes are built once at the end
+            suspended_indexes = data_store.suspend_spatial_indexes()
             # capture path in absolute form
             abs_path = os.path.abspath(path)
-            if descend_tree:
+            if workers > 1:
+                file_paths = self.list_files(abs_path, descend_tree)
+                processed_ctr = self.process_files_in_parallel(
+                    file_paths, data_store, processed_ctr, workers
+                )
+            elif pipelined:
+                file_paths = self.list_files(abs_path, descend_tree)
+                processed_ctr = self.process_files_pipelined(
+                    file_paths, data_store, processed_ctr
+                )
+            elif descend_tree:
                 # loop through this folder and children
                 for current_path, folders, files in os.walk(abs_path):
                     for file in files:
@@ -182,6 +259,7 @@ class FileProcessor:
                         processed_ctr = self.process_file(
                             file, abs_path, data_store, processed_ctr
                         )
+            data_store.rebuild_spatial_indexes(suspended_indexes)
 
             states_sum = TableSummary(data_store.session, data_store.db_classes.State)
             contacts_sum = TableSummary(
@@ -204,112 +282,517 @@ class FileProcessor:
         # file may have full path, therefore extract basename and split it
         basename = os.path.basename(file)
         filename, file_extension = os.path.splitext(basename)
+        full_path = os.path.join(current_path, basename)
+
+        # the suffix and filename checks don't need the content, so files that no
+        # importer handles are never read
+        good_importers = self.select_importers_by_name(full_path)
+        if not good_importers:
+            return processed_ctr
+
+        # skip the file if its content has been imported before, ahead of any
+        # sniffing or parsing
+        # the file is read once, and its content shared by all the steps below
+        file_buffer = self.create_file_buffer(full_path)
+        file_size, file_hash = file_buffer.size, file_buffer.hash
+        if data_store.is_datafile_loaded_before(file_size, file_hash):
+            print(f"'{basename}' is skipped, it has already been imported.")
+            return processed_ctr
+
+        good_importers = self.select_importers_by_content(good_importers, file_buffer)
+
+        # if good importers list is empty, return processed_ctr,
+        # which means the file is not processed
+        if not good_importers:
+            return processed_ctr
+
+        # ok, let these importers handle the file
+        reason = f"Importing '{basename}'."
+        change = data_store.add_to_changes(
+            user=USER, modified=datetime.utcnow(), reason=reason
+        )
+        datafile = data_store.get_datafile(
+            basename, file_extension, change.change_id, file_hash
+        )
+
+        errors = self.load_and_validate(
+            full_path,
+            good_importers,
+            data_store,
+            datafile,
+            change.change_id,
+            file_buffer,
+        )
+        processed_ctr += len(good_importers)
+
+        # If all tests pass for all parsers, commit datafile
+        if not errors:
+            # the digest is only stored once the datafile has been committed, so
+            # that a file which failed validation is parsed again by the next run
+            datafile.size = file_size
+            datafile.hash = file_hash
+            self.commit_datafile(full_path, datafile, data_store, change.change_id)
+        else:
+            self.write_error_log(full_path, errors)
+
+        return processed_ctr
+
+    def process_files_in_parallel(self, file_paths, data_store, processed_ctr, workers):
+        """Parse the given files in a pool of worker processes, and commit them here
+
+        Each worker sniffs, parses, highlights, validates and digests a file against
+        its own scratch :class:`DataStore`, and sends back the resulting measurements.
+        This process is the only writer: it skips the files whose content has been
+        imported before, resolves the platforms and sensors of the measurements of
+        the others against `data_store` and commits them, file by file, in the order
+        the files were given.
+
+        :param file_paths: Full paths of the files to process
+        :type file_paths: List
+        :param data_store: Database to commit the measurements to
+        :type data_store: DataStore
+        :param processed_ctr: Number of times files have been processed so far
+        :type processed_ctr: Integer
+        :param workers: Number of worker processes
+        :type workers: Integer
+        :return: Updated processed_ctr
+        :rtype: Integer
+        """
+        with multiprocessing.Pool(
+            workers, initializer=init_parse_worker, initargs=(self,)
+        ) as pool:
+            # imap keeps the workers parsing the next files while this process
+            # is writing the results of the previous ones to the database
+            for parsed_file in pool.imap(parse_file_in_worker, file_paths):
+                if parsed_file is not None:
+                    processed_ctr = self.commit_parsed_file(
+                        parsed_file, data_store, processed_ctr
+                    )
+
+        return processed_ctr
+
+    def process_files_pipelined(self, file_paths, data_store, processed_ctr):
+        """Parse the given files in a background thread, and commit them in this one
+
+        Files are parsed as by :meth:`process_files_in_parallel`, one at a time, and
+        handed over through a queue of at most PIPELINE_QUEUE_SIZE items: each parsed
+        file, followed by its batches of measurements and None. Files are parsed
+        while the database is written to, and the measurements of a large file are
+        committed batch by batch as they come, without more than a few batches
+        waiting in memory. Only this thread, which owns the session of `data_store`,
+        uses it.
+
+        :param file_paths: Full paths of the files to process
+        :type file_paths: List
+        :param data_store: Database to commit the measurements to
+        :type data_store: DataStore
+        :param processed_ctr: Number of times files have been processed so far
+        :type processed_ctr: Integer
+        :return: Updated processed_ctr
+        :rtype: Integer
+        """
+        parsed_items = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        stop = threading.Event()
+        parser = threading.Thread(
+            target=self.parse_files_into_queue,
+            args=(file_paths, parsed_items, stop),
+            name="pepys-parser",
+            daemon=True,
+        )
+        parser.start()
+
+        def get_item():
+            item = parsed_items.get()
+            if isinstance(item, BaseException):
+                raise item
+            return item
+
+        try:
+            while True:
+                parsed_file = get_item()
+                if parsed_file is None:
+                    break
+                # its batches follow it on the queue, up to None
+                parsed_file.batches = iter(get_item, None)
+                processed_ctr = self.commit_parsed_file(
+                    parsed_file, data_store, processed_ctr
+                )
+                # the batches of a skipped file are left on the queue
+                for _ in parsed_file.batches:
+                    pass
+        finally:
+            # let the parser thread finish, if writing failed
+            stop.set()
+            parser.join()
+
+        return processed_ctr
+
+    def parse_files_into_queue(self, file_paths, parsed_items, stop):
+        """
+        Parse the given files, putting each parsed file on the queue, followed by its
+        batches of measurements and None, and a last None once all are parsed. An
+        error is put on the queue, in place of the next item, if parsing fails.
+        Blocks while the queue is full, until the stop event is set
+
+        :param file_paths: Full paths of the files to parse
+        :type file_paths: List
+        :param parsed_items: Queue the parsed files and batches are put on
+        :type parsed_items: Queue
+        :param stop: Event set by the writer when it doesn't take more files
+        :type stop: Event
+        """
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    parsed_items.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            # created here, as the connection of an in-memory database can only be
+            # used by the thread which opened it
+            scratch_store = create_scratch_store()
+            for full_path in file_paths:
+                if stop.is_set():
+                    return
+                items = parse_file_in_batches(self, scratch_store, full_path)
+                parsed_file = next(items, None)
+                # nothing is put for the files no importer can handle
+                if parsed_file is None:
+                    continue
+                for item in chain([parsed_file], items, [None]):
+                    if not put(item):
+                        # closed here, as the scratch database belongs to this thread
+                        items.close()
+                        return
+        except Exception as ex:
+            put(ex)
+            return
+        put(None)
+
+    def commit_parsed_file(self, parsed_file, data_store, processed_ctr):
+        """Commit the measurements of a file parsed away from the database, unless
+        its content has been imported before
+
+        :param parsed_file: File parsed by :func:`parse_file`
+        :type parsed_file: ParsedFile
+        :param data_store: Database to commit the measurements to
+        :type data_store: DataStore
+        :param processed_ctr: Number of times files have been processed so far
+        :type processed_ctr: Integer
+        :return: Updated processed_ctr
+        :rtype: Integer
+        """
+        basename = os.path.basename(parsed_file.full_path)
+        file_size, file_hash = parsed_file.file_size, parsed_file.file_hash
+        # checked here rather than by the workers, so that a file is also skipped
+        # if the same content was committed earlier in this batch
+        if data_store.is_datafile_loaded_before(file_size, file_hash):
+            print(f"'{basename}' is skipped, it has already been imported.")
+            return processed_ctr
+
+        # the datafile is recorded whether the file passed validation or not, as
+        # by process_file
+        _, file_extension = os.path.splitext(basename)
+        reason = f"Importing '{basename}'."
+        change = data_store.add_to_changes(
+            user=USER, modified=datetime.utcnow(), reason=reason
+        )
+        datafile = data_store.get_datafile(
+            basename, file_extension, change.change_id, file_hash
+        )
+        processed_ctr += parsed_file.importer_count
+        if parsed_file.errors:
+            self.write_error_log(parsed_file.full_path, parsed_file.errors)
+            return processed_ctr
+
+        datafile.size = file_size
+        datafile.hash = file_hash
+        # each batch is committed as it is restored, and the datafile gets the same
+        # extraction log and Logs as if it was committed in one go
+        counts = dict.fromkeys(parsed_file.parser_names, 0)
+        log_ranges = dict()
+        for batch in parsed_file.batches:
+            parsed_file.restore_batch(data_store, datafile, change.change_id, batch)
+            batch_counts = datafile.submit_measurements(
+                data_store, change.change_id, self.commit_batch_size
+            )
+            for parser_name, number_of_measurements in batch_counts.items():
+                counts[parser_name] += number_of_measurements
+            data_store.measurement_log_ranges(
+                chain.from_iterable(datafile.measurements.values()), log_ranges
+            )
+        data_store.add_ranges_to_logs(log_ranges, change.change_id)
+        self.write_extraction_log(
+            parsed_file.full_path, datafile.extraction_log(counts)
+        )
+        self.archive_file(parsed_file.full_path)
+        return processed_ctr
+
+    @staticmethod
+    def list_files(abs_path, descend_tree):
+        """List the full paths of the files to process, in the order they are walked
+
+        :param abs_path: Absolute folder path
+        :type abs_path: String
+        :param descend_tree: Whether to recursively descend through the folder tree
+        :type descend_tree: bool
+        :return: Full file paths
+        :rtype: List
+        """
+        if descend_tree:
+            return [
+                os.path.join(current_path, file)
+                for current_path, folders, files in os.walk(abs_path)
+                for file in files
+            ]
+        return [file.path for file in os.scandir(abs_path) if file.is_file()]
+
+    def create_file_buffer(self, full_path):
+        """Create the buffer holding the content of the file, in streaming mode if
+        the file is larger than streaming_size
+
+        :param full_path: Full file path
+        :type full_path: String
+        :return: Buffer of the file
+        :rtype: FileBuffer
+        """
+        streaming = (
+            self.streaming_size is not None
+            and os.path.getsize(full_path) > self.streaming_size
+        )
+        return FileBuffer(full_path, streaming=streaming)
+
+    def select_importers(self, full_path, file_buffer=None):
+        """Find the registered importers that can handle the given file
+
+        :param full_path: Full file path
+        :type full_path: String
+        :param file_buffer: Content of the file, read here if not given
+        :type file_buffer: FileBuffer
+        :return: Importers that accepted the file
+        :rtype: List
+        """
+        good_importers = self.select_importers_by_name(full_path)
+
+        # tests are starting to get expensive. Check
+        # we have some file importers left
+        if not good_importers:
+            return good_importers
+
+        if file_buffer is None:
+            file_buffer = self.create_file_buffer(full_path)
+        return self.select_importers_by_content(good_importers, file_buffer)
+
+    def select_importers_by_name(self, full_path):
+        """Find the registered importers that accept the suffix and name of the
+        given file, without reading it
+
+        :param full_path: Full file path
+        :type full_path: String
+        :return: Importers that accepted the name of the file
+        :rtype: List
+        """
+        basename = os.path.basename(full_path)
+        filename, file_extension = os.path.splitext(basename)
         # make copy of list of importers
         good_importers = self.importers.copy()
 
-        full_path = os.path.join(current_path, basename)
-        # print("Checking:" + str(full_path))
-
         # start with file suffixes
         tmp_importers = good_importers.copy()
         for importer in tmp_importers:
-            # print("Checking suffix:" + str(importer))
             if not importer.can_load_this_type(file_extension):
                 good_importers.remove(importer)
 
         # now the filename
         tmp_importers = good_importers.copy()
         for importer in tmp_importers:
-            # print("Checking filename:" + str(importer))
             if not importer.can_load_this_filename(filename):
                 good_importers.remove(importer)
 
-        # tests are starting to get expensive. Check
-        # we have some file importers left
-        if len(good_importers) > 0:
-
-            # now the first line
-            tmp_importers = good_importers.copy()
-            first_line = self.get_first_line(full_path)
-            for importer in tmp_importers:
-                # print("Checking first_line:" + str(importer))
-                if not importer.can_load_this_header(first_line):
-                    good_importers.remove(importer)
-
-            # Create a HighlightedFile instance for the file
-            highlighted_file = HighlightedFile(full_path)
-
-            # Get the file contents, for the final check
-            file_contents = self.get_file_contents(full_path)
-
-            # lastly the contents
-            tmp_importers = good_importers.copy()
-            for importer in tmp_importers:
-                if not importer.can_load_this_file(file_contents):
-                    good_importers.remove(importer)
-
-            # if good importers list is empty, return processed_ctr,
-            # which means the file is not processed
-            if not good_importers:
-                return processed_ctr
-
-            # ok, let these importers handle the file
-            reason = f"Importing '{basename}'."
-            change = data_store.add_to_changes(
-                user=USER, modified=datetime.utcnow(), reason=reason
-            )
-            datafile = data_store.get_datafile(
-                basename, file_extension, change.change_id
-            )
+        return good_importers
+
+    @staticmethod
+    def select_importers_by_content(importers, file_buffer):
+        """Find which of the given importers accept the first line and the content
+        of the file
+
+        :param importers: Importers that accepted the name of the file
+        :type importers: List
+        :param file_buffer: Content of the file
+        :type file_buffer: FileBuffer
+        :return: Importers that accepted the file
+        :rtype: List
+        """
+        good_importers = importers.copy()
+
+        # now the first line
+        tmp_importers = good_importers.copy()
+        first_line = file_buffer.first_line
+        for importer in tmp_importers:
+            if not importer.can_load_this_header(first_line):
+                good_importers.remove(importer)
+
+        # Get the file contents, for the final check
+        file_contents = file_buffer.split_contents()
 
-            # Run all parsers
-            for importer in good_importers:
-                processed_ctr += 1
+        # lastly the contents
+        tmp_importers = good_importers.copy()
+        for importer in tmp_importers:
+            if not importer.can_load_this_file(file_contents):
+                good_importers.remove(importer)
+
+        return good_importers
+
+    @staticmethod
+    def load_by_line(
+        importers, data_store, full_path, highlighted_file, datafile, change_id
+    ):
+        """Run importers which load by line over the file in a single pass, handing
+        each line to each importer in turn, so that the file is only read and each
+        line only split into tokens once
+
+        :param importers: Importers that accepted the file and load by line
+        :type importers: List
+        :param data_store: Database used to resolve platforms and sensors
+        :type data_store: DataStore
+        :param full_path: Full file path
+        :type full_path: String
+        :param highlighted_file: Contents of the file
+        :type highlighted_file: HighlightedFile
+        :param datafile: Datafile the measurements are stored against
+        :type datafile: Datafile
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        """
+        for importer in importers:
+            importer.prepare_to_load(full_path, datafile)
+
+        for line_number, line in enumerate(highlighted_file.lines(), 1):
+            for importer in importers:
+                importer.load_this_line(
+                    data_store, line_number, line, datafile, change_id
+                )
+        for importer in importers:
+            importer.finish_loading(data_store, datafile, change_id)
+
+    def load_and_validate(
+        self, full_path, importers, data_store, datafile, change_id, file_buffer=None
+    ):
+        """Run the importers over the file, export its highlighted version and
+        validate the measurements they created
+
+        :param full_path: Full file path
+        :type full_path: String
+        :param importers: Importers that accepted the file
+        :type importers: List
+        :param data_store: Database used to resolve platforms and sensors
+        :type data_store: DataStore
+        :param datafile: Datafile the measurements are stored against
+        :type datafile: Datafile
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        :param file_buffer: Content of the file, read here if not given
+        :type file_buffer: FileBuffer
+        :return: Parsing and validation errors of all importers
+        :rtype: List
+        """
+        filename, _ = os.path.splitext(os.path.basename(full_path))
+
+        # Create a HighlightedFile instance for the file
+        if file_buffer is None:
+            file_buffer = self.create_file_buffer(full_path)
+        highlighted_file = HighlightedFile(
+            full_path,
+            file_buffer=file_buffer,
+            streaming=file_buffer.streaming,
+            highlight=self.highlight,
+        )
+
+        # Run all parsers, those loading by line together in a single pass over the
+        # file, in the place of the first of them
+        line_importers = [importer for importer in importers if importer.loads_by_line]
+        for importer in importers:
+            if not importer.loads_by_line:
                 importer.load_this_file(
-                    data_store, full_path, highlighted_file, datafile, change.change_id
+                    data_store, full_path, highlighted_file, datafile, change_id
+                )
+            elif importer is line_importers[0]:
+                self.load_by_line(
+                    line_importers,
+                    data_store,
+                    full_path,
+                    highlighted_file,
+                    datafile,
+                    change_id,
                 )
 
-            # Write highlighted output to file
+        # Write highlighted output to file. Usages aren't recorded in streaming mode,
+        # so there is nothing to highlight
+        if file_buffer.streaming and self.highlight:
+            print(
+                f"'{os.path.basename(full_path)}' is read in streaming mode, "
+                "no highlighted version of it is written."
+            )
+        elif highlighted_file.highlight:
             highlighted_output_path = os.path.join(
                 self.directory_path, f"{filename}_highlighted.html"
             )
 
-            highlighted_file.export(highlighted_output_path, include_key=True)
-
-            # Run all validation tests
-            errors = list()
-            for importer in good_importers:
-                # Call related validation tests, extend global errors lists if the
-                # importer has errors
-                if not datafile.validate(
-                    validation_level=importer.validation_level,
-                    errors=importer.errors,
-                    parser=importer.short_name,
-                ):
-                    errors.extend(importer.errors)
-
-            # If all tests pass for all parsers, commit datafile
-            if not errors:
-                log = datafile.commit(data_store, change.change_id)
-                # write extraction log to output folder
-                with open(
-                    os.path.join(self.directory_path, f"{filename}_output.log"), "w",
-                ) as f:
-                    f.write("\n".join(log))
-                if self.archive is True:
-                    # move original file to output folder
-                    new_path = os.path.join(self.input_files_path, basename)
-                    shutil.move(full_path, new_path)
-                    # make it read-only
-                    os.chmod(new_path, S_IREAD)
-            else:
-                # write error log to the output folder
-                with open(
-                    os.path.join(self.directory_path, f"{filename}_errors.log"), "w",
-                ) as f:
-                    json.dump(errors, f, ensure_ascii=False, indent=4)
+            highlighted_file.export(
+                highlighted_output_path,
+                include_key=True,
+                page_size=self.highlight_page_size,
+            )
 
-        return processed_ctr
+        # Run all validation tests
+        errors = list()
+        for importer in importers:
+            # Call related validation tests, extend global errors lists if the
+            # importer has errors
+            if not datafile.validate(
+                validation_level=importer.validation_level,
+                errors=importer.errors,
+                parser=importer.short_name,
+            ):
+                errors.extend(importer.errors)
+        return errors
+
+    def commit_datafile(self, full_path, datafile, data_store, change_id):
+        """Commit the measurements of the datafile, write the extraction log and
+        archive the original file if requested"""
+        log = datafile.commit(data_store, change_id, self.commit_batch_size)
+        self.write_extraction_log(full_path, log)
+        self.archive_file(full_path)
+
+    def write_extraction_log(self, full_path, log):
+        """Write the extraction log of the committed file to the output folder"""
+        filename, _ = os.path.splitext(os.path.basename(full_path))
+        with open(
+            os.path.join(self.directory_path, f"{filename}_output.log"), "w",
+        ) as f:
+            f.write("\n".join(log))
+
+    def archive_file(self, full_path):
+        """Move the committed file to the output folder, if requested"""
+        basename = os.path.basename(full_path)
+        if self.archive is True:
+            # move original file to output folder
+            new_path = os.path.join(self.input_files_path, basename)
+            shutil.move(full_path, new_path)
+            # make it read-only
+            os.chmod(new_path, S_IREAD)
+
+    def write_error_log(self, full_path, errors):
+        """Write the errors of the file to the output folder"""
+        filename, _ = os.path.splitext(os.path.basename(full_path))
+        with open(
+            os.path.join(self.directory_path, f"{filename}_errors.log"), "w",
+        ) as f:
+            json.dump(errors, f, ensure_ascii=False, indent=4)
 
     def register_importer(self, importer):
         """Adds the supplied importer to the list of import modules
@@ -341,28 +824,3 @@ class FileProcessor:
                             # Create an object of the class, add it to importers
                             obj = class_()
                             self.importers.append(obj)
-
-    @staticmethod
-    def get_first_line(file_path: str):
-        """Retrieve the first line from the file
-
-        :param file_path: Full file path
-        :type file_path: String
-        :return: First line of text
-        :rtype: String
-        """
-        try:
-            with open(file_path, "r", encoding="windows-1252") as f:
-                first_line = f.readline()
-            return first_line
-        except UnicodeDecodeError:
-            return None
-
-    @staticmethod
-    def get_file_contents(full_path: str):
-        try:
-            with open(full_path, "r", encoding="windows-1252") as f:
-                lines = f.read().split("\n")
-            return lines
-        except UnicodeDecodeError:
-            return None
@@ -1,4 +1,8 @@
-from .support.char import Char
+from itertools import islice
+
+from pepys_import.file.file_buffer import FileBuffer
+from .support.char import Char  # noqa: F401
+from .support.usages import UsageStore
 from pepys_import.file.highlighter.support.line import Line
 from .support.export import export_report
 from .support.token import SubToken
@@ -10,18 +14,45 @@ class HighlightedFile:
     then export a highlighted version of the file that indicates extraction
     """
 
-    def __init__(self, filename: str, number_of_lines=None):
+    def __init__(
+        self,
+        filename: str,
+        number_of_lines=None,
+        file_buffer=None,
+        streaming=False,
+        highlight=True,
+    ):
         """
         Constructor for this object
         Args:
             filename (str): The name of the file to be parsed/reported upon
             number_of_lines(int) Number of lines that should be shown
                    in the output (all lines if None)
+            file_buffer (FileBuffer): Content of the file, if it has already been
+                   read (read on first use otherwise)
+            streaming (bool): Whether to read the lines lazily, one at a time, so
+                   that the text of the file isn't held in memory. Usages aren't
+                   recorded in this mode, and export writes nothing
+            highlight (bool): Whether to record usages, for export. If not,
+                   export writes nothing, and importers may parse the lines in a
+                   faster way which doesn't record them
         """
-        self.chars = []
+        self.chars = UsageStore()
         self.filename = filename
         self.dict_color = {}
         self.number_of_lines = number_of_lines
+        self.file_buffer = file_buffer
+        self.streaming = streaming
+        # usages are never recorded in streaming mode
+        self.highlight = highlight and not streaming
+
+    def get_file_buffer(self):
+        """
+        Return the content of the file, reading it from disk the first time only
+        """
+        if self.file_buffer is None:
+            self.file_buffer = FileBuffer(self.filename, streaming=self.streaming)
+        return self.file_buffer
 
     def chars_debug(self):
         """
@@ -33,33 +64,35 @@ class HighlightedFile:
     def lines(self):
         """
         Slice the file into lines and return a list of Line objects
+        (or a generator of them, in streaming mode)
         """
         if self.number_of_lines is None:
+            if self.streaming:
+                return self.streamed_lines()
             return self.not_limited_lines()
         elif self.number_of_lines <= 0:
             print("Non-positive number of lines. Please provide positive number")
             exit(1)
+        elif self.streaming:
+            return self.streamed_lines()
         else:
             return self.limited_lines()
 
-    def export(self, filename: str, include_key=False):
+    def export(self, filename: str, include_key=False, page_size=None):
         """
         Provide highlighted summary for this file
         Args:
             filename (str): The name of the destination for the HTML output
             include_key (bool): Whether to include a key at the bottom of the output
             showing what each colour refers to
+            page_size (int): Number of characters after which the output is split
+            into pages, with an index of them written to filename (never if None)
         """
         if len(self.chars) > 0:
-            export_report(filename, self.chars, self.dict_color, include_key)
+            export_report(filename, self.chars, self.dict_color, include_key, page_size)
 
     def limited_contents(self):
-        with open(self.filename, "r") as file:
-            whole_file_contents = file.read()
-
-        lines_list = whole_file_contents.splitlines()
-
-        lines_list = lines_list[0 : self.number_of_lines]
+        lines_list = self.get_file_buffer().lines[0 : self.number_of_lines]
         limited_contents = "\n".join(str(e) for e in lines_list)
 
         return limited_contents, lines_list
@@ -80,43 +113,54 @@ class HighlightedFile:
         """
         Return a list of Line objects for each line in the file
         """
-        with open(self.filename, "r") as file:
-            file_contents = file.read()
-
-        lines_list = file_contents.splitlines()
-        lines = self.create_lines(file_contents, lines_list)
+        file_buffer = self.get_file_buffer()
+        lines = self.create_lines(file_buffer.text, file_buffer.lines)
 
         return lines
 
+    def streamed_lines(self):
+        """
+        Yield a Line object for each line in the file, reading the file as they are
+        consumed (up to self.number_of_lines lines, if given)
+        """
+        lines_iter = self.get_file_buffer().iter_lines()
+        if self.number_of_lines is not None:
+            lines_iter = islice(lines_iter, self.number_of_lines)
+        yield from self.iter_line_objects(lines_iter)
+
     def fill_char_array_if_needed(self):
-        if len(self.chars) > 0:
-            # Char array already filled, so no need to do anything
+        if len(self.chars) > 0 or not self.highlight:
+            # Usage store already filled (or not kept at all, when not
+            # highlighting), so no need to do anything
             return
 
         if self.number_of_lines is None:
-            with open(self.filename, "r") as f:
-                file_contents = f.read()
+            file_contents = self.get_file_buffer().text
         elif self.number_of_lines <= 0:
             print("Non-positive number of lines. Please provide positive number")
             exit(1)
         else:
             file_contents, _ = self.limited_contents()
 
-        # Initialise the char index (self.chars), with one Char entry for
-        # each character in the file. (Note: a reference to this char array is
-        # given to each SubToken)
-        for char in file_contents:
-            char_obj = Char(char)
-            self.chars.append(char_obj)
+        # Give the text of the file to the usage store (self.chars), which
+        # records the usages of ranges of its characters. (Note: a reference to
+        # this store is given to each SubToken)
+        self.chars.fill(file_contents)
 
     def create_lines(self, file_contents, lines_list):
         """
         Create individual Line objects
-        for each line, with appropriate references to the character array
+        for each line, with appropriate references to the usage store
+        """
+        return list(self.iter_line_objects(lines_list))
+
+    def iter_line_objects(self, lines_list):
+        """
+        Yield a Line object for each of the given lines, with appropriate references
+        to the usage store
         """
         # Keeps track of which character in the file a line starts on
         line_start_counter = 0
-        lines = []
 
         # For each line in the file create a Line object with a SubToken
         # object as its child, keeping track of the length of the line
@@ -125,14 +169,12 @@ class HighlightedFile:
             line_length = len(this_line)
             line_span = (0, len(this_line))
             # Create SubToken object to keep track of the line length, the line itself
-            # the start character of the line in the file, and a reference to the overall
-            # list of characters
+            # the start character of the line in the file, and a reference to the usage
+            # store of the characters
             subToken = SubToken(
                 line_span, this_line, int(line_start_counter), self.chars
             )
             new_l = Line([subToken], self)
-            lines.append(new_l)
+            yield new_l
             # Update the starting character of the line ready for next time
             line_start_counter += line_length + 1
-
-        return lines
@@ -1,23 +1,30 @@
 class Char:
     """
-    Object used to store information on a specific character.
+    Object giving access to a specific character of a HighlightedFile.
 
-    Stores the character letter itself, plus a list of usages of the character.
+    Gives the character letter itself, plus a list of usages of the character.
 
-    A list of these is kept in HighlightedFile.chars (and also available through
-    SubToken.chars), and iterating through this list is used to create the final
-    highlighted file.
+    These are created on demand when indexing or iterating through
+    HighlightedFile.chars, a UsageStore: the usages are not kept per character,
+    but worked out from the ranges recorded in the store whenever they are read.
     """
 
     # For efficiency, define the attributes that are allowed to be used on this
     # object here - so Python uses a list not a dict to store the attributes, and
     # is more efficient
-    # (We may potentially have millions of Char objects for a long file)
-    __slots__ = ["letter", "usages"]
+    __slots__ = ["store", "index"]
 
-    def __init__(self, letter):
-        self.letter = letter
-        self.usages = []
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def letter(self):
+        return self.store.text[self.index]
+
+    @property
+    def usages(self):
+        return self.store.usages_at(self.index)
 
     def __repr__(self):
         return f"Char: {self.letter} with {len(self.usages)} usage(s)"
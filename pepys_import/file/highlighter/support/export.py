@@ -1,53 +1,140 @@
+import os
+
 from .color_picker import hex_color_for, mean_color_for, color_for
 
+# Size of the buffer the HTML is written through
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+HTML_HEADER = """<html>
+    <head>
+    </head>
+    <body style="font-family: Courier">
+    """
+
+HTML_FOOTER = """</body>
+    </html>"""
+
 
-def export_report(filename, chars, dict_colors, include_key=False):
+def export_report(filename, chars, dict_colors, include_key=False, page_size=None):
     """
     Export a HTML report showing all the extraction usages for the file.
 
     :param filename: Output filename
-    :param chars: Characters array (should be HighlightedFile.chars)
+    :param chars: Usage store of the characters (should be HighlightedFile.chars)
     :param dict_colors: Dictionary specifying colors to use (should be HighlightedFile.dict_colors)
     :param include_key: Whether to include a key at the bottom defining the usages of the colors
-
-    This basically loops through all of the characters in the characters array, and then creates
-    the relevant <span> tags for each character based on the usages stored for that character.
+    :param page_size: If the file has more characters than this, the report is split into pages
+    of about this many characters (ending at the end of a line), written next to the output file
+    with a "_page<number>" suffix, and the output file is an index of the pages
+    :return: Paths of the files written
+
+    This basically loops through the runs of characters which have the same usages, as given
+    by the usage store, and then creates the relevant <span> tags for each run based on
+    those usages. The color and tooltip of each combination of usages is worked out once.
     """
+    pages = page_bounds(chars.text, page_size)
+    # descriptions of each combination of usages met so far
+    descriptions = {}
+
+    if len(pages) == 1:
+        with open(filename, "w", buffering=EXPORT_BUFFER_SIZE) as f_out:
+            f_out.write(HTML_HEADER)
+            write_spans(f_out, chars, chars.segments(), descriptions, dict_colors)
+            if include_key:
+                write_key(f_out, dict_colors)
+            f_out.write(HTML_FOOTER)
+        return [filename]
+
+    base, extension = os.path.splitext(filename)
+    page_filenames = [
+        f"{base}_page{number}{extension}" for number in range(1, len(pages) + 1)
+    ]
+    segments = chars.segments()
+    segment = next(segments, None)
+    for page_filename, (page_start, page_end) in zip(page_filenames, pages):
+        # the runs of characters of the page, splitting the one running over its end
+        page_segments = []
+        while segment is not None and segment[0] < page_end:
+            start, end, usage_ids = segment
+            page_segments.append((start, min(end, page_end), usage_ids))
+            if end > page_end:
+                segment = (page_end, end, usage_ids)
+                break
+            segment = next(segments, None)
+
+        with open(page_filename, "w", buffering=EXPORT_BUFFER_SIZE) as f_out:
+            f_out.write(HTML_HEADER)
+            write_spans(f_out, chars, page_segments, descriptions, dict_colors)
+            f_out.write(HTML_FOOTER)
+
+    with open(filename, "w") as f_out:
+        f_out.write(HTML_HEADER)
+        f_out.write("<h3>Pages</h3><ul>")
+        first_line = 1
+        for page_filename, (page_start, page_end) in zip(page_filenames, pages):
+            last_line = first_line + chars.text.count("\n", page_start, page_end - 1)
+            f_out.write(
+                '<li><a href="'
+                + os.path.basename(page_filename)
+                + '">Lines '
+                + str(first_line)
+                + " to "
+                + str(last_line)
+                + "</a></li>"
+            )
+            first_line = last_line + 1
+        f_out.write("</ul>")
+        if include_key:
+            write_key(f_out, dict_colors)
+        f_out.write(HTML_FOOTER)
+    return [filename] + page_filenames
 
-    f_out = open(filename, "w")
 
-    html_header = """<html>
-    <head>
-    </head>
-    <body style="font-family: Courier">
+def page_bounds(text, page_size=None):
     """
+    Split the text into pages of whole lines.
 
-    f_out.write(html_header)
+    :param text: Text of the file
+    :param page_size: Number of characters after which a page ends, at the end of the
+    current line (a single page if None)
+    :return: Start and end index of each page
+    """
+    if page_size is None or len(text) <= page_size:
+        return [(0, len(text))]
+
+    pages = []
+    start = 0
+    while start < len(text):
+        end = text.find("\n", start + page_size - 1) + 1
+        if end == 0:
+            end = len(text)
+        pages.append((start, end))
+        start = end
+    return pages
 
+
+def write_spans(f_out, chars, segments, descriptions, dict_colors):
+    """
+    Write the given runs of characters, in <span> tags showing their usages.
+
+    :param f_out: File to write to
+    :param chars: Usage store of the characters
+    :param segments: Runs of characters, as given by UsageStore.segments
+    :param descriptions: Descriptions of the combinations of usages met so far, by
+    usage IDs, updated with the new ones
+    :param dict_colors: Dictionary specifying colors to use
+    """
     last_hash = ""
 
-    for char in chars:
-        letter = char.letter
-        this_hash = ""
-        this_message = ""
-        colors = []
-        multi_usages = len(char.usages) > 1
-        for usage in char.usages:
-            this_hash += usage.tool_field
-            needs_new_line = this_message != ""
-            colors.append(color_for(usage.tool_field, dict_colors))
-            if needs_new_line:
-                this_message += "&#013;"
-            if multi_usages:
-                this_message += "-"
-            this_message += usage.tool_field + ", " + usage.message
+    for start, end, usage_ids in segments:
+        if usage_ids not in descriptions:
+            descriptions[usage_ids] = describe_usages(
+                [chars.usage(usage_id) for usage_id in usage_ids], dict_colors
+            )
+        this_hash, this_message, hex_color = descriptions[usage_ids]
 
         # do we have anything to shade?
         if this_hash != "":
-            # generate/retrieve a color for this hash
-            new_color = mean_color_for(colors)
-            hex_color = hex_color_for(new_color)
-
             # are we already in hash?
             if last_hash != "":
                 # is it the different to this one?
@@ -74,35 +161,61 @@ def export_report(filename, chars, dict_colors, include_key=False):
         elif last_hash != "":
             f_out.write("</span>")
 
-        # just check if it's newline
-        if letter == "\n":
-            f_out.write("<br>")
-        else:
-            f_out.write(letter)
+        # newlines are written as line breaks
+        f_out.write(chars.text[start:end].replace("\n", "<br>"))
 
         last_hash = this_hash
 
     if last_hash != "":
         f_out.write("</span>")
 
-    # also provide a key
-    if include_key:
-        f_out.write("<hr/><h3>Color Key</h3><ul>")
-        for key in dict_colors:
-            color = dict_colors[key]
-            hex_color = hex_color_for(color)
-            f_out.write(
-                '<li><span style="background-color:'
-                + hex_color
-                + '">'
-                + key
-                + "</span></li>"
-            )
-        f_out.write("</ul>")
 
-    html_footer = """</body>
-    </html>"""
+def write_key(f_out, dict_colors):
+    """
+    Write a key defining the usages of the colors.
 
-    f_out.write(html_footer)
+    :param f_out: File to write to
+    :param dict_colors: Dictionary specifying colors to use
+    """
+    f_out.write("<hr/><h3>Color Key</h3><ul>")
+    for key in dict_colors:
+        color = dict_colors[key]
+        hex_color = hex_color_for(color)
+        f_out.write(
+            '<li><span style="background-color:'
+            + hex_color
+            + '">'
+            + key
+            + "</span></li>"
+        )
+    f_out.write("</ul>")
+
+
+def describe_usages(usages, dict_colors):
+    """
+    Describe the usages of a run of characters for export_report.
 
-    f_out.close()
+    :param usages: SingleUsage objects, in the order they were recorded
+    :param dict_colors: Dictionary specifying colors to use
+    :return: The hash identifying the combination of usages, the message shown for it and its
+    color (empty strings if there are no usages)
+    """
+    this_hash = ""
+    this_message = ""
+    colors = []
+    multi_usages = len(usages) > 1
+    for usage in usages:
+        this_hash += usage.tool_field
+        needs_new_line = this_message != ""
+        colors.append(color_for(usage.tool_field, dict_colors))
+        if needs_new_line:
+            this_message += "&#013;"
+        if multi_usages:
+            this_message += "-"
+        this_message += usage.tool_field + ", " + usage.message
+
+    hex_color = ""
+    if this_hash != "":
+        # generate/retrieve a color for this hash
+        hex_color = hex_color_for(mean_color_for(colors))
+    return this_hash, this_message, hex_color
@@ -1,6 +1,7 @@
-from re import finditer
-from .token import Token, SubToken
-from .usages import SingleUsage
+from array import array
+
+from .token import TokenList
+from .tokenizer import CSV_DELIM, WHITESPACE_DELIM, split_tokens
 
 
 class Line:
@@ -10,10 +11,8 @@ class Line:
     Has methods to get a list of Tokens in the line, and to record a usage of the whole line.
     """
 
-    WHITESPACE_DELIM = "\\S+"
-    CSV_DELIM = (
-        r'(?:,"|^")(""|[\w\W]*?)(?=",|"$)|(?:,(?!")|^(?!"))([^,]*?)(?=$|,)|(\r\n|\n)'
-    )
+    WHITESPACE_DELIM = WHITESPACE_DELIM
+    CSV_DELIM = CSV_DELIM
 
     def __init__(self, list_of_subtokens, hf_instance):
         """
@@ -24,6 +23,8 @@ class Line:
         """
         self.children = list_of_subtokens
         self.highlighted_file = hf_instance
+        # token lists already split, by regular expression and strip characters
+        self._tokens = dict()
 
     def __repr__(self):
         res = "Line: "
@@ -48,44 +49,46 @@ class Line:
 
     def tokens(self, reg_exp=WHITESPACE_DELIM, strip_char=""):
         """
-        Returns a list of Token objects for each token in the line.
+        Returns a TokenList, giving a Token object for each token in the line.
 
         Tokens are generated by splitting by the given regular expression, using it as the
         delimiter. The strip_char argument is any characters to remove after splitting -
         so we don't get the delimiters themselves in the returned values.
         Whitespace is also stripped.
-        """
-        self.tokens_array = []
-
-        for child in self.children:
-            for match in finditer(reg_exp, child.text):
-                token_str = match.group()
-                # special handling, we may need to strip a leading delimiter
-                if strip_char != "":
-                    char_index = token_str.find(strip_char)
-                    if char_index == 0:
-                        token_str = token_str[1:]
-                        # and ditch any new whitespace
-                    token_str = token_str.strip()
-
-                subtoken = SubToken(
-                    match.span(), token_str, int(child.line_start), child.chars
-                )
-
-                # the token object expects an array of SubTokens, as it could be
-                # a composite object
-                list_of_subtokens = [subtoken]
-
-                self.tokens_array.append(
-                    Token(list_of_subtokens, self.highlighted_file)
-                )
 
+        Splitting on whitespace or commas doesn't go through the regular expression (see
+        split_tokens), and Token objects are only created when they are accessed. The
+        line is only split once for each regular expression, so importers reading the
+        same line share its tokens.
+        """
+        key = (reg_exp, strip_char)
+        if key in self._tokens:
+            self.tokens_array = self._tokens[key]
+            return self.tokens_array
+
+        if len(self.children) == 1:
+            texts, spans = split_tokens(self.children[0].text, reg_exp, strip_char)
+            child_indexes = None
+        else:
+            texts = []
+            spans = array("l")
+            child_indexes = array("l")
+            for child_index, child in enumerate(self.children):
+                child_texts, child_spans = split_tokens(child.text, reg_exp, strip_char)
+                texts.extend(child_texts)
+                spans.extend(child_spans)
+                child_indexes.extend([child_index] * len(child_texts))
+
+        self.tokens_array = TokenList(
+            self.highlighted_file, texts, spans, self.children, child_indexes
+        )
+        self._tokens[key] = self.tokens_array
         return self.tokens_array
 
     def record(self, tool: str, field: str, value: str, units: str = "n/a"):
         """
-        Record a usage of the whole line, by adding a SingleUsage object to each of the
-        relevant characters in the char array referenced by each SubToken child.
+        Record a usage of the whole line, by recording the range of characters of each
+        SubToken child in the UsageStore they reference.
 
         Args:
             tool(str):  name of the module handling the import
@@ -93,12 +96,14 @@ class Line:
             value(str): what value the token provided
             units(str): the units of the token
         """
+        if not self.highlighted_file.highlight:
+            # there is no char array to record usages on, when not highlighting
+            return
         self.highlighted_file.fill_char_array_if_needed()
 
         tool_field = tool + "/" + field
         message = "Value:" + str(value) + " Units:" + str(units)
 
+        usage_id = self.children[0].chars.add_usage(tool_field, message)
         for child in self.children:
-            for i in range(int(child.start()), int(child.end())):
-                usage = SingleUsage(tool_field, message)
-                child.chars[i].usages.append(usage)
+            child.chars.record(int(child.start()), int(child.end()), usage_id)
@@ -1,5 +1,4 @@
 from pepys_import.file.highlighter.highlighter import HighlightedFile
-from pepys_import.file.highlighter.support.char import Char
 from pepys_import.file.highlighter.support.token import SubToken
 from pepys_import.file.highlighter.support.line import Line
 
@@ -15,10 +14,8 @@ def create_test_line_object(line_str):
     # Create a highlighted file object but with no filename attached
     test_hf = HighlightedFile(None)
 
-    # Fill the chars array manually
-    for char in line_str:
-        char_obj = Char(char)
-        test_hf.chars.append(char_obj)
+    # Fill the usage store manually
+    test_hf.chars.fill(line_str)
 
     # Create a line object ready to return
     line_span = (0, len(line_str))
@@ -1,4 +1,4 @@
-from .usages import SingleUsage
+from collections.abc import Sequence
 
 
 class SubToken:
@@ -11,7 +11,7 @@ class SubToken:
 
     Each SubToken object keeps track of the span (start and end characters) of the SubToken,
     the text that is contained within the SubToken, the character index that the line starts at
-    and a reference to the overall character array created by HighlightedFile.
+    and a reference to the UsageStore of the characters created by HighlightedFile.
     """
 
     def __init__(self, span, text, line_start, chars):
@@ -86,23 +86,77 @@ class Token:
             value(str): what value the token provided
             units(str): the units of the token
 
-        This adds SingleUsage objects to each of the relevant characters in the
-        character array stored by the SubToken objects that are children of this object.
+        This adds a single usage to the UsageStore referenced by the SubToken objects
+        that are children of this object, and records it on the range of characters
+        of each of them.
         """
+        if not self.highlighted_file.highlight:
+            # there is no char array to record usages on, when not highlighting
+            return
         self.highlighted_file.fill_char_array_if_needed()
 
         tool_field = tool + "/" + field
         message = "Value:" + str(value) + " Units:" + str(units)
 
+        # Note: subtoken.chars is a reference to a single UsageStore that was
+        # originally created by the HighlightedFile class, so all SubToken objects
+        # record their ranges in the same store
+        chars = self.children[0].chars
+        usage_id = chars.add_usage(tool_field, message)
         # This loop gives us each SubToken that is a child of this Token
         for subtoken in self.children:
-            start = subtoken.start()
-            end = subtoken.end()
-            for i in range(start, end):
-                usage = SingleUsage(tool_field, message)
-                # Note: subtoken.chars is a reference to a single char array
-                # that was originally created by the HighlightedFile class
-                # So each time round the loop we're actually altering the same
-                # char array, even though it is accessed via different SubToken
-                # objects
-                subtoken.chars[i].usages.append(usage)
+            subtoken.chars.record(subtoken.start(), subtoken.end(), usage_id)
+
+
+class TokenList(Sequence):
+    """
+    The tokens of a Line, as returned by Line.tokens.
+
+    Only the text and span of each token are kept, in compact arrays: Token (and
+    SubToken) objects are created when the tokens are accessed, e.g. to read their
+    text or record their usage.
+    """
+
+    def __init__(self, highlighted_file, texts, spans, subtokens, child_indexes=None):
+        """
+        :param highlighted_file: HighlightedFile the line belongs to
+        :param texts: Text of each token
+        :param spans: Flat array of the start and end of each token in its line
+        :param subtokens: SubToken children of the line
+        :param child_indexes: Index of the child of the line each token comes from,
+        if it has more than one
+        """
+        self.highlighted_file = highlighted_file
+        self.texts = texts
+        self.spans = spans
+        self.subtokens = subtokens
+        self.child_indexes = child_indexes
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.token(i) for i in range(*index.indices(len(self.texts)))]
+        if index < 0:
+            index += len(self.texts)
+        if not 0 <= index < len(self.texts):
+            raise IndexError("token index out of range")
+        return self.token(index)
+
+    def token(self, index):
+        """Create the Token at the given index"""
+        if self.child_indexes is None:
+            child = self.subtokens[0]
+        else:
+            child = self.subtokens[self.child_indexes[index]]
+        subtoken = SubToken(
+            (self.spans[2 * index], self.spans[2 * index + 1]),
+            self.texts[index],
+            int(child.line_start),
+            child.chars,
+        )
+        return Token([subtoken], self.highlighted_file)
+
+    def __repr__(self):
+        return "TokenList: " + repr(self.texts)
@@ -0,0 +1,144 @@
+from array import array
+from re import compile
+
+WHITESPACE_DELIM = "\\S+"
+CSV_DELIM = (
+    r'(?:,"|^")(""|[\w\W]*?)(?=",|"$)|(?:,(?!")|^(?!"))([^,]*?)(?=$|,)|(\r\n|\n)'
+)
+
+_compiled_expressions = {}
+
+
+def split_tokens(text, reg_exp=WHITESPACE_DELIM, strip_char=""):
+    """
+    Split the text of a line into tokens, as Line.tokens does.
+
+    Splitting on whitespace, and on commas with CSV_DELIM and "," as strip_char, is
+    done with str.split, or with quoted_csv_tokens for CSV lines with quotes. Lines
+    over several lines of text, and other regular expressions, go through the
+    regular expression.
+
+    :param text: Text of the line
+    :param reg_exp: Regular expression matching each token
+    :param strip_char: Delimiter to remove from the start of each token, which is
+    then stripped of whitespace
+    :return: The text of each token, and a flat array of the start and end of the
+    span of each token in the line
+    """
+    if reg_exp == WHITESPACE_DELIM and strip_char == "":
+        return whitespace_tokens(text)
+    if reg_exp == CSV_DELIM and strip_char == ",":
+        if '"' not in text:
+            return csv_tokens(text)
+        if "\n" not in text and "\r" not in text:
+            return quoted_csv_tokens(text)
+    return regex_tokens(text, reg_exp, strip_char)
+
+
+def whitespace_tokens(text):
+    """Split the text on whitespace, see split_tokens"""
+    texts = text.split()
+    spans = array("l")
+    find = text.find
+    position = 0
+    for token in texts:
+        # only whitespace can come before the token, so this finds the token itself
+        position = find(token, position)
+        spans.append(position)
+        position += len(token)
+        spans.append(position)
+    return texts, spans
+
+
+def csv_tokens(text):
+    """
+    Split text without quotes on commas, see split_tokens. As with CSV_DELIM, the
+    span of each field but the first starts at the comma before it, and a comma at
+    the start of the line starts the first field rather than ending an empty one
+    """
+    fields = text.split(",")
+    texts = [field.strip() for field in fields]
+    spans = array("l", [0, len(fields[0])])
+    position = len(fields[0])
+    for field in fields[1:]:
+        spans.append(position)
+        position += len(field) + 1
+        spans.append(position)
+    if len(fields) > 1 and fields[0] == "":
+        del texts[0]
+        del spans[:2]
+    return texts, spans
+
+
+def quoted_csv_tokens(text):
+    """
+    Split text with quotes on commas, see split_tokens. As with CSV_DELIM, a field
+    starting with a quote ends at the first quote followed by a comma or by the end
+    of the line, and its token keeps the opening quote. A quoted field which isn't
+    closed gives no token, and the line carries on at the next comma.
+
+    The regular expression looks for the closing quote over the rest of the line
+    for each field, so a line with many unclosed quotes takes quadratic time. Here
+    the line is read from start to end once, as a closing quote which can't be
+    found after one field can't be found after any later field either.
+    """
+    texts = []
+    spans = array("l")
+    find = text.find
+    length = len(text)
+    last_quote = length - 1 if text.endswith('"') else -1
+    # fields whose content starts from here aren't closed
+    unclosed = length + 1
+
+    start = 0
+    while start != -1:
+        has_comma = text.startswith(",", start)
+        content = start + has_comma
+        if not text.startswith('"', content):
+            # unquoted field, up to the next comma
+            end = find(",", content)
+            if end == -1:
+                end = length
+        else:
+            content += 1
+            end = find('",', content) if content < unclosed else -1
+            if content <= last_quote and (end == -1 or last_quote < end):
+                end = last_quote
+            if end == -1:
+                unclosed = min(unclosed, content)
+                if start == 0 and has_comma:
+                    # the start of the line makes an empty field before the comma
+                    texts.append("")
+                    spans.extend((0, 0))
+                start = find(",", start + 1)
+                continue
+
+        token = text[start:end]
+        if has_comma:
+            token = token[1:]
+        texts.append(token.strip())
+        spans.extend((start, end))
+        start = find(",", end)
+    return texts, spans
+
+
+def regex_tokens(text, reg_exp, strip_char=""):
+    """Split the text with a regular expression, see split_tokens"""
+    pattern = _compiled_expressions.get(reg_exp)
+    if pattern is None:
+        pattern = _compiled_expressions[reg_exp] = compile(reg_exp)
+
+    texts = []
+    spans = array("l")
+    for match in pattern.finditer(text):
+        token_str = match.group()
+        # special handling, we may need to strip a leading delimiter
+        if strip_char != "":
+            char_index = token_str.find(strip_char)
+            if char_index == 0:
+                token_str = token_str[1:]
+                # and ditch any new whitespace
+            token_str = token_str.strip()
+        texts.append(token_str)
+        spans.extend(match.span())
+    return texts, spans
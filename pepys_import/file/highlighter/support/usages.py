@@ -1,13 +1,169 @@
+from array import array
+
+from .char import Char
+
+
 class SingleUsage:
     """
     Stores information on a single usage of a character.
 
     Contains two fields: tool_field and message.
 
-    Objects created from this class are stored in the usages list
-    on Char objects.
+    Objects created from this class are returned by UsageStore.usages_at, and
+    by the usages property of Char objects.
     """
 
     def __init__(self, tool_field, message):
         self.tool_field = tool_field
         self.message = message
+
+
+class UsageStore:
+    """
+    Stores the text of a HighlightedFile and the usages recorded on it.
+
+    Rather than keeping a list of usages for every character, each call to record
+    adds a single (start, end, usage_id) range to compact arrays, and each usage is
+    kept once, as the IDs of its interned tool_field and message strings. The
+    usages of each character are worked out from the ranges when they are needed,
+    e.g. by export_report, which walks the runs of characters given by segments.
+
+    A reference to this store is given to each SubToken (as SubToken.chars), and
+    it can be indexed like the list of Char objects it replaces.
+    """
+
+    def __init__(self, text=""):
+        self.text = text
+        # ranges of recorded usages, in the order they were recorded
+        self._starts = array("q")
+        self._ends = array("q")
+        self._usage_ids = array("q")
+        # tool_field and message string IDs of each usage
+        self._usage_tool_fields = array("q")
+        self._usage_messages = array("q")
+        # interned strings, and the ID of each of them
+        self._strings = []
+        self._string_ids = {}
+
+    def __len__(self):
+        return len(self.text)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Char(self, i) for i in range(*index.indices(len(self.text)))]
+        if index < 0:
+            index += len(self.text)
+        if not 0 <= index < len(self.text):
+            raise IndexError("character index out of range")
+        return Char(self, index)
+
+    def __iter__(self):
+        for index in range(len(self.text)):
+            yield Char(self, index)
+
+    def fill(self, text):
+        """Set the text the usages are recorded on"""
+        self.text = text
+
+    def intern(self, string):
+        """Return the ID of the string, adding it to the interned strings if needed"""
+        string_id = self._string_ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = string_id
+        return string_id
+
+    def add_usage(self, tool_field, message):
+        """
+        Add a usage, to be recorded on one or more ranges of characters
+
+        :param tool_field: Name of the tool and field, separated by a slash
+        :param message: Description of the value and units
+        :return: ID of the usage
+        """
+        usage_id = len(self._usage_tool_fields)
+        self._usage_tool_fields.append(self.intern(tool_field))
+        self._usage_messages.append(self.intern(message))
+        return usage_id
+
+    def record(self, start, end, usage_id):
+        """
+        Record a usage of the characters from start up to (but not including) end
+
+        :param start: Index of the first character
+        :param end: Index after the last character
+        :param usage_id: ID of the usage, as returned by add_usage
+        """
+        if end > start:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._usage_ids.append(usage_id)
+
+    def usage(self, usage_id):
+        """Return the SingleUsage with the given ID"""
+        return SingleUsage(
+            self._strings[self._usage_tool_fields[usage_id]],
+            self._strings[self._usage_messages[usage_id]],
+        )
+
+    def usages_at(self, index):
+        """
+        Return the usages of the character at the given index, in the order they
+        were recorded. This scans all the ranges, so is meant for checking single
+        characters: use segments to go through the whole text
+        """
+        usage_ids = [
+            usage_id
+            for start, end, usage_id in zip(self._starts, self._ends, self._usage_ids)
+            if start <= index < end
+        ]
+        return [self.usage(usage_id) for usage_id in sorted(usage_ids)]
+
+    def segments(self):
+        """
+        Yield the consecutive runs of characters which have the same usages, as
+        (start, end, usage_ids) tuples covering the whole text, the usage IDs being
+        in the order they were recorded (and repeated if a usage was recorded more
+        than once on the characters)
+        """
+        starts = self._starts
+        ends = self._ends
+        usage_ids = self._usage_ids
+        count = len(starts)
+        # past the end of any range, for when the starts or ends run out
+        past_end = float("inf")
+        by_start = sorted(range(count), key=starts.__getitem__)
+        by_end = sorted(range(count), key=ends.__getitem__)
+
+        # number of times each usage covers the current position
+        active = {}
+        position = 0
+        next_start = 0
+        next_end = 0
+        while next_start < count or next_end < count:
+            boundary = min(
+                starts[by_start[next_start]] if next_start < count else past_end,
+                ends[by_end[next_end]] if next_end < count else past_end,
+            )
+            if boundary > position:
+                yield position, boundary, self._active_usage_ids(active)
+                position = boundary
+            while next_end < count and ends[by_end[next_end]] == boundary:
+                usage_id = usage_ids[by_end[next_end]]
+                active[usage_id] -= 1
+                if active[usage_id] == 0:
+                    del active[usage_id]
+                next_end += 1
+            while next_start < count and starts[by_start[next_start]] == boundary:
+                usage_id = usage_ids[by_start[next_start]]
+                active[usage_id] = active.get(usage_id, 0) + 1
+                next_start += 1
+        if len(self) > position:
+            yield position, len(self), ()
+
+    @staticmethod
+    def _active_usage_ids(active):
+        return tuple(
+            usage_id for usage_id in sorted(active) for _ in range(active[usage_id])
+        )
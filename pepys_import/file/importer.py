@@ -55,12 +55,29 @@ class Importer(ABC):
         :rtype: bool
         """
 
+    # Whether the importer loads a file a line at a time, see LineImporter
+    loads_by_line = False
+
     def load_this_file(self, data_store, path, file_object, datafile, change_id):
         """Handles the loading of this data file
 
         Performs the common operations that must be performed before the
         load_this_file method is called, then performs the load
         """
+        self.prepare_to_load(path, datafile)
+
+        # perform load
+        self._load_this_file(data_store, path, file_object, datafile, change_id)
+
+    def prepare_to_load(self, path, datafile):
+        """Performs the common operations that must be performed before the
+        file is loaded, either whole or a line at a time
+
+        :param path: File path
+        :type path: String
+        :param datafile: DataFile object
+        :type datafile: DataFile
+        """
         basename = os.path.basename(path)
         print(f"{self.short_name} working on {basename}")
         self.errors = list()
@@ -68,9 +85,6 @@ class Importer(ABC):
         datafile.measurements[self.short_name] = list()
         self.prev_location = dict()
 
-        # perform load
-        self._load_this_file(data_store, path, file_object, datafile, change_id)
-
     @abstractmethod
     def _load_this_file(self, data_store, path, file_object, datafile, change_id):
         """Process this data-file
@@ -87,3 +101,55 @@ class Importer(ABC):
         :param change_id: ID of the :class:`Change` object
         :type change_id: Integer or UUID
         """
+
+
+class LineImporter(Importer):
+    """An importer which loads a file a line at a time, with load_this_line, so that
+    it can share a single pass over the file with the other importers which do"""
+
+    loads_by_line = True
+
+    def handles_line(self, text) -> bool:
+        """Whether this importer loads anything from a line with this text
+
+        :param text: Text of the line
+        :type text: String
+        :return: Yes/No
+        :rtype: bool
+        """
+        return True
+
+    def load_this_line(self, data_store, line_number, line, datafile, change_id):
+        """Loads a single line of the file, if the importer handles it. Must be called
+        for each line in turn, after prepare_to_load
+        """
+        if self.handles_line(line.text):
+            self._load_this_line(data_store, line_number, line, datafile, change_id)
+
+    def finish_loading(self, data_store, datafile, change_id):
+        """Called after the last line of the file was given to load_this_line, so
+        that importers which hold on to some lines can load them together
+
+        :param data_store: The data_store
+        :type data_store: DataStore
+        :param datafile: DataFile object
+        :type datafile: DataFile
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        """
+
+    @abstractmethod
+    def _load_this_line(self, data_store, line_number, line, datafile, change_id):
+        """Process a single line of the data-file
+
+        :param data_store: The data_store
+        :type data_store: DataStore
+        :param line_number: Number of the line in the file, starting at 1
+        :type line_number: Integer
+        :param line: Line object, allowing extraction and recording of its tokens
+        :type line: Line
+        :param datafile: DataFile object
+        :type datafile: DataFile
+        :param change_id: ID of the :class:`Change` object
+        :type change_id: Integer or UUID
+        """
@@ -0,0 +1,616 @@
+import os
+
+from contextlib import contextmanager
+from datetime import datetime
+from getpass import getuser
+
+from sqlalchemy import inspect
+
+from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.store.db_status import TableTypes
+from pepys_import.core.store.state_columns import StateColumns
+
+USER = getuser()
+# Number of measurements in each batch sent to the writer, when the FileProcessor
+# doesn't commit in batches
+MEASUREMENT_BATCH_SIZE = 1000
+
+# Columns which hold IDs of the scratch database, and the kind of entity they refer
+# to. The entities are resolved again, from the requests the importers made for them,
+# against the database the measurements are committed to
+REFERENCE_COLUMNS = {
+    "sensor_id": "sensor",
+    "platform_id": "platform",
+    "subject_id": "platform",
+    "privacy_id": "privacy",
+    "comment_type_id": "comment_type",
+}
+# Columns which are set again by the writer
+SKIPPED_COLUMNS = ["source_id", "created_date"]
+# Columns of StateColumns sent to the writer. The platform and sensor names are taken
+# from the sensors the writer resolves
+STATE_COLUMNS = [
+    "sensor_ids",
+    "times",
+    "latitudes",
+    "longitudes",
+    "headings",
+    "speeds",
+    "elevations",
+    "prev_latitudes",
+    "prev_longitudes",
+]
+
+# The FileProcessor of each worker process, and the scratch DataStore its files are
+# parsed against, set up by init_parse_worker
+_file_processor = None
+_data_store = None
+
+
+def init_parse_worker(file_processor):
+    """
+    Set up a worker process of FileProcessor.process_files_in_parallel.
+
+    :param file_processor: The FileProcessor that owns the pool
+    :type file_processor: FileProcessor
+    """
+    global _file_processor, _data_store
+    _file_processor = file_processor
+    _data_store = create_scratch_store()
+
+
+def create_scratch_store():
+    """
+    Create an in-memory SQLite :class:`ScratchDataStore` to parse files against, so
+    that importers can look up and create platforms and sensors without touching the
+    database that the writer is committing to. It is created once, and reused for
+    all the files parsed by a worker process or thread, see :func:`parse_file`
+
+    :return: The scratch data store
+    :rtype: ScratchDataStore
+    """
+    data_store = ScratchDataStore()
+    data_store.initialise()
+    return data_store
+
+
+class ScratchDataStore(DataStore):
+    """
+    In-memory SQLite :class:`DataStore` which files are parsed against, away from
+    the database the measurements are committed to.
+
+    Its missing data resolver fills the gaps of an empty database with defaults, so
+    the platforms, sensors and privacies it hands to the importers aren't those of
+    the writer. It records the arguments the importers asked for them with instead,
+    by ID, for the writer to resolve them again, see :class:`ParsedFile`.
+    """
+
+    def __init__(self):
+        super().__init__(
+            "",
+            "",
+            "",
+            0,
+            ":memory:",
+            db_type="sqlite",
+            welcome_text=None,
+            show_status=False,
+        )
+        self.recording = False
+        # number of lookups in progress, so that only those of the importers are
+        # recorded, and not those made by the missing data resolver
+        self.lookup_depth = 0
+        # arguments of get_platform, and the ID of the resolved privacy it was given
+        # if any, by platform ID
+        self.platform_requests = dict()
+        # arguments of get_sensor, by sensor ID
+        self.sensor_requests = dict()
+        # None for the privacies handed out by resolve_privacy, by privacy ID
+        self.privacy_requests = dict()
+        # IDs of the privacies handed out by resolve_privacy, by name, as the
+        # importers give their names to get_platform and get_sensor
+        self.resolved_privacy_ids = dict()
+
+    def start_recording(self):
+        """Forget the requests recorded so far, and record those of the next file"""
+        self.platform_requests.clear()
+        self.sensor_requests.clear()
+        self.privacy_requests.clear()
+        self.resolved_privacy_ids.clear()
+        self.recording = True
+
+    def stop_recording(self):
+        self.recording = False
+
+    @contextmanager
+    def lookup(self):
+        """Context of a lookup, giving whether it is to be recorded, i.e. made by an
+        importer while recording"""
+        self.lookup_depth += 1
+        try:
+            yield self.recording and self.lookup_depth == 1
+        finally:
+            self.lookup_depth -= 1
+
+    def get_platform(
+        self,
+        platform_name=None,
+        nationality=None,
+        platform_type=None,
+        privacy=None,
+        trigraph=None,
+        quadgraph=None,
+        pennant_number=None,
+        change_id=None,
+    ):
+        request = {
+            "platform_name": platform_name,
+            "nationality": nationality,
+            "platform_type": platform_type,
+            "privacy": privacy,
+            "trigraph": trigraph,
+            "quadgraph": quadgraph,
+            "pennant_number": pennant_number,
+        }
+        with self.lookup() as recorded:
+            platform = super().get_platform(change_id=change_id, **request)
+            if recorded and platform.platform_id not in self.platform_requests:
+                self.platform_requests[platform.platform_id] = (
+                    request,
+                    self.resolved_privacy_ids.get(privacy),
+                )
+        return platform
+
+    def get_sensor(
+        self, platform, sensor_name=None, sensor_type=None, privacy=None, change_id=None
+    ):
+        with self.lookup() as recorded:
+            sensor = super().get_sensor(
+                platform, sensor_name, sensor_type, privacy, change_id
+            )
+            if recorded and sensor.sensor_id not in self.sensor_requests:
+                self.sensor_requests[sensor.sensor_id] = {
+                    "platform_id": platform.platform_id,
+                    "sensor_name": sensor_name,
+                    "sensor_type": None if sensor_type is None else sensor_type.name,
+                    "privacy": privacy,
+                    "privacy_id": self.resolved_privacy_ids.get(privacy),
+                }
+        return sensor
+
+    def resolve_privacy(self, change_id):
+        with self.lookup() as recorded:
+            privacy = super().resolve_privacy(change_id)
+            if recorded:
+                self.privacy_requests.setdefault(privacy.privacy_id, None)
+                self.resolved_privacy_ids.setdefault(privacy.name, privacy.privacy_id)
+        return privacy
+
+
+def parse_file_in_worker(full_path):
+    """
+    Sniff, parse, highlight and validate a single file in a worker process, see
+    :func:`parse_file`
+
+    :param full_path: Full file path
+    :type full_path: String
+    :return: The parsed file, or None if no importer can handle the file
+    :rtype: ParsedFile
+    """
+    return parse_file(_file_processor, _data_store, full_path)
+
+
+def parse_file(file_processor, data_store, full_path):
+    """
+    Sniff, parse, highlight, validate and digest a single file, away from the
+    database the measurements are committed to, see :func:`parse_file_in_batches`
+
+    :param file_processor: The FileProcessor whose importers parse the file
+    :type file_processor: FileProcessor
+    :param data_store: The scratch data store
+    :type data_store: ScratchDataStore
+    :param full_path: Full file path
+    :type full_path: String
+    :return: The parsed file, with all its batches of measurements, or None if no
+    importer can handle the file
+    :rtype: ParsedFile
+    """
+    items = parse_file_in_batches(file_processor, data_store, full_path)
+    parsed_file = next(items, None)
+    if parsed_file is not None:
+        parsed_file.batches = list(items)
+    return parsed_file
+
+
+def parse_file_in_batches(file_processor, data_store, full_path):
+    """
+    Sniff, parse, highlight, validate and digest a single file, away from the
+    database the measurements are committed to.
+
+    The file is parsed against a scratch :class:`ScratchDataStore`, made by
+    :func:`create_scratch_store`. The platforms and sensors it holds are kept for
+    the next files, but its measurement tables are emptied once the file is parsed.
+
+    Yields the parsed file, without its measurements, then the measurements if the
+    file passed validation, as :class:`MeasurementBatch` objects of at most the
+    commit batch size of the FileProcessor (or MEASUREMENT_BATCH_SIZE) rows. Yields
+    nothing if no importer can handle the file.
+
+    :param file_processor: The FileProcessor whose importers parse the file
+    :type file_processor: FileProcessor
+    :param data_store: The scratch data store
+    :type data_store: ScratchDataStore
+    :param full_path: Full file path
+    :type full_path: String
+    :rtype: Iterator
+    """
+    good_importers = file_processor.select_importers_by_name(full_path)
+    if not good_importers:
+        return
+    file_buffer = file_processor.create_file_buffer(full_path)
+    good_importers = file_processor.select_importers_by_content(
+        good_importers, file_buffer
+    )
+    if not good_importers:
+        return
+
+    basename = os.path.basename(full_path)
+    _, file_extension = os.path.splitext(basename)
+    batch_size = file_processor.commit_batch_size or MEASUREMENT_BATCH_SIZE
+    with data_store.session_scope():
+        change = data_store.add_to_changes(
+            user=USER, modified=datetime.utcnow(), reason=f"Parsing '{basename}'."
+        )
+        datafile = data_store.get_datafile(basename, file_extension, change.change_id)
+        data_store.start_recording()
+        try:
+            errors = file_processor.load_and_validate(
+                full_path,
+                good_importers,
+                data_store,
+                datafile,
+                change.change_id,
+                file_buffer,
+            )
+        finally:
+            data_store.stop_recording()
+        try:
+            yield ParsedFile(
+                full_path,
+                file_buffer.size,
+                file_buffer.hash,
+                len(good_importers),
+                errors,
+                list(datafile.measurements),
+            )
+            if not errors:
+                yield from describe_measurements(data_store, datafile, batch_size)
+        finally:
+            clear_measurements(data_store)
+
+
+def clear_measurements(data_store):
+    """Delete the rows of the measurement tables of the scratch data store, in its
+    current session"""
+    for measurement_class in data_store.meta_classes[TableTypes.MEASUREMENT]:
+        data_store.session.query(measurement_class).delete(synchronize_session=False)
+
+
+def describe_measurements(data_store, datafile, batch_size):
+    """
+    Take a copy of the measurements the importers added to the datafile, in batches
+    of at most `batch_size` rows. The entities they refer to are described in the
+    batch of the first measurement that refers to them, see
+    :func:`describe_reference`
+
+    :param data_store: The scratch data store
+    :type data_store: ScratchDataStore
+    :param datafile: Datafile the importers added the measurements to
+    :type datafile: Datafile
+    :param batch_size: Number of rows of each batch
+    :type batch_size: Integer
+    :rtype: Iterator
+    """
+    batch = MeasurementBatch()
+    described = set()
+    column_keys = dict()
+
+    def describe(kind, entity_id):
+        if (kind, entity_id) in described:
+            return
+        described.add((kind, entity_id))
+        description, references = describe_reference(data_store, kind, entity_id)
+        batch.references[(kind, entity_id)] = description
+        for reference in references:
+            describe(*reference)
+
+    for parser_name, measurements in datafile.measurements.items():
+        for measurement in measurements:
+            if isinstance(measurement, StateColumns):
+                # split between batches, copied so that they don't keep all the
+                # columns alive
+                start = 0
+                while start < len(measurement):
+                    stop = min(len(measurement), start + batch_size - len(batch))
+                    columns = {
+                        name: getattr(measurement, name)[start:stop].copy()
+                        for name in STATE_COLUMNS
+                    }
+                    for sensor_id in set(columns["sensor_ids"]):
+                        describe("sensor", sensor_id)
+                    batch.add(parser_name, StateColumns.__name__, columns, stop - start)
+                    start = stop
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = MeasurementBatch()
+                continue
+
+            measurement_class = type(measurement)
+            if measurement_class not in column_keys:
+                column_keys[measurement_class] = [
+                    column.key
+                    for column in inspect(measurement_class).column_attrs
+                    if column.key not in SKIPPED_COLUMNS
+                    and not column.columns[0].primary_key
+                ]
+            values = {
+                key: getattr(measurement, key) for key in column_keys[measurement_class]
+            }
+            for key, kind in REFERENCE_COLUMNS.items():
+                if values.get(key) is not None:
+                    describe(kind, values[key])
+            batch.add(parser_name, measurement_class.__name__, values)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = MeasurementBatch()
+    if len(batch):
+        yield batch
+
+
+def describe_reference(data_store, kind, entity_id):
+    """
+    Describe an entity of the scratch database by the request the importers made
+    for it, or by its values if they didn't ask for it
+
+    :param data_store: The scratch data store
+    :type data_store: ScratchDataStore
+    :param kind: "platform", "sensor", "privacy" or "comment_type"
+    :type kind: String
+    :param entity_id: ID of the entity
+    :type entity_id: Integer
+    :return: The description, and the kind and ID of the entities it refers to
+    :rtype: Tuple
+    """
+    session = data_store.session
+    db_classes = data_store.db_classes
+    references = list()
+    if kind == "platform":
+        if entity_id in data_store.platform_requests:
+            description = data_store.platform_requests[entity_id]
+        else:
+            description = (describe_platform(data_store, entity_id), None)
+        if description[1] is not None:
+            references.append(("privacy", description[1]))
+    elif kind == "sensor":
+        if entity_id in data_store.sensor_requests:
+            description = data_store.sensor_requests[entity_id]
+        else:
+            sensor = session.query(db_classes.Sensor).get(entity_id)
+            platform = session.query(db_classes.Platform).get(sensor.host)
+            description = {
+                "platform_id": sensor.host,
+                "sensor_name": sensor.name,
+                "sensor_type": session.query(db_classes.SensorType)
+                .get(sensor.sensor_type_id)
+                .name,
+                "privacy": session.query(db_classes.Privacy)
+                .get(platform.privacy_id)
+                .name,
+                "privacy_id": None,
+            }
+        references.append(("platform", description["platform_id"]))
+        if description["privacy_id"] is not None:
+            references.append(("privacy", description["privacy_id"]))
+    elif kind == "privacy":
+        # None if the privacy is resolved by the missing data resolver
+        if entity_id in data_store.privacy_requests:
+            description = data_store.privacy_requests[entity_id]
+        else:
+            description = session.query(db_classes.Privacy).get(entity_id).name
+    else:
+        description = session.query(db_classes.CommentType).get(entity_id).name
+    return description, references
+
+
+def describe_platform(data_store, platform_id):
+    """The arguments of :meth:`DataStore.get_platform` that resolve the platform
+    of the scratch database, for platforms the importers didn't ask for"""
+    session = data_store.session
+    db_classes = data_store.db_classes
+    platform = session.query(db_classes.Platform).get(platform_id)
+    return {
+        "platform_name": platform.name,
+        "nationality": session.query(db_classes.Nationality)
+        .get(platform.nationality_id)
+        .name,
+        "platform_type": session.query(db_classes.PlatformType)
+        .get(platform.platform_type_id)
+        .name,
+        "privacy": session.query(db_classes.Privacy).get(platform.privacy_id).name,
+        "trigraph": platform.trigraph,
+        "quadgraph": platform.quadgraph,
+        "pennant_number": platform.pennant,
+    }
+
+
+class MeasurementBatch:
+    """
+    Measurements of a parsed file, at most a commit batch of rows, as sent to the
+    writer, with the description of the entities they are the first to refer to.
+
+    Measurements are kept by importer, as the class name and column values of
+    each, and states held as columns as columns.
+    """
+
+    def __init__(self):
+        self.measurements = dict()
+        # description of each entity, by kind and ID in the scratch database
+        self.references = dict()
+        self.row_count = 0
+
+    def __len__(self):
+        return self.row_count
+
+    def add(self, parser_name, class_name, values, row_count=1):
+        self.measurements.setdefault(parser_name, list()).append((class_name, values))
+        self.row_count += row_count
+
+
+class ParsedFile:
+    """
+    The result of parsing a file in a worker process, in a form that can be sent
+    back to the writer process.
+
+    The measurements follow as :class:`MeasurementBatch` objects. The platforms,
+    sensors, privacies and comment types they refer to are kept by their IDs in the
+    scratch database, and described once each by the request the importers made for
+    them, for the writer to resolve them again.
+    """
+
+    def __init__(
+        self, full_path, file_size, file_hash, importer_count, errors, parser_names
+    ):
+        self.full_path = full_path
+        # digest of the file, worked out by the worker, for the writer to check
+        # whether the same content has been imported already
+        self.file_size = file_size
+        self.file_hash = file_hash
+        self.importer_count = importer_count
+        self.errors = errors
+        # importers which added measurements to the datafile, in order
+        self.parser_names = parser_names
+        # batches of measurements: all of them when the file is parsed by a worker
+        # process, or taken from the queue as they come when pipelined
+        self.batches = list()
+        # description of each entity the measurements refer to, by kind and ID,
+        # gathered from the batches restored so far
+        self.references = dict()
+        # entities of the writer the references are resolved to, by kind and ID
+        self.resolved = dict()
+
+    def resolve(self, data_store, kind, entity_id, change_id):
+        """
+        The entity of `data_store` that an entity of the scratch database resolves
+        to, looked up (or created) once, from the request the importers made for it,
+        so the missing data resolver of `data_store` has the final say.
+        """
+        key = (kind, entity_id)
+        if key in self.resolved:
+            return self.resolved[key]
+
+        description = self.references[key]
+        if kind == "platform":
+            request, privacy_id = description
+            if privacy_id is not None:
+                privacy = self.resolve(data_store, "privacy", privacy_id, change_id)
+                request = dict(request, privacy=privacy.name)
+            entity = data_store.get_platform(change_id=change_id, **request)
+        elif kind == "sensor":
+            platform = self.resolve(
+                data_store, "platform", description["platform_id"], change_id
+            )
+            sensor_type = None
+            if description["sensor_type"] is not None:
+                sensor_type = data_store.add_to_sensor_types(
+                    description["sensor_type"], change_id=change_id
+                )
+            privacy = description["privacy"]
+            if description["privacy_id"] is not None:
+                privacy = self.resolve(
+                    data_store, "privacy", description["privacy_id"], change_id
+                ).name
+            entity = platform.get_sensor(
+                data_store=data_store,
+                sensor_name=description["sensor_name"],
+                sensor_type=sensor_type,
+                privacy=privacy,
+                change_id=change_id,
+            )
+        elif kind == "privacy":
+            if description is None:
+                entity = data_store.resolve_privacy(change_id)
+            else:
+                entity = data_store.add_to_privacies(description, change_id)
+        else:
+            entity = data_store.add_to_comment_types(description, change_id)
+        self.resolved[key] = entity
+        return entity
+
+    def restore_batch(self, data_store, datafile, change_id, batch):
+        """
+        Recreate a batch of measurements against the given :class:`DataStore`, in
+        place of the measurements of the datafile, ready to be committed, with the
+        IDs of the entities the references resolve to, see :meth:`resolve`
+        """
+        self.references.update(batch.references)
+        datafile.measurements = dict()
+
+        def resolve(kind, entity_id):
+            return self.resolve(data_store, kind, entity_id, change_id)
+
+        def resolve_id(kind, entity_id):
+            return getattr(resolve(kind, entity_id), f"{kind}_id")
+
+        def sensor_platform(sensor_id):
+            return resolve(
+                "platform", self.references[("sensor", sensor_id)]["platform_id"]
+            )
+
+        for parser_name, descriptions in batch.measurements.items():
+            datafile.measurements[parser_name] = list()
+            for class_name, values in descriptions:
+                if class_name == StateColumns.__name__:
+                    sensor_ids = values["sensor_ids"]
+                    sensors = {
+                        sensor_id: (
+                            resolve("sensor", sensor_id),
+                            sensor_platform(sensor_id),
+                        )
+                        for sensor_id in set(sensor_ids)
+                    }
+                    datafile.create_state_columns(
+                        data_store,
+                        parser_name,
+                        **dict(
+                            values,
+                            sensor_ids=[
+                                sensors[sensor_id][0].sensor_id
+                                for sensor_id in sensor_ids
+                            ],
+                            platform_names=[
+                                sensors[sensor_id][1].name for sensor_id in sensor_ids
+                            ],
+                            sensor_names=[
+                                sensors[sensor_id][0].name for sensor_id in sensor_ids
+                            ],
+                        ),
+                    )
+                    continue
+
+                measurement = getattr(data_store.db_classes, class_name)(**values)
+                measurement.source_id = datafile.datafile_id
+                for key, kind in REFERENCE_COLUMNS.items():
+                    if values.get(key) is not None:
+                        setattr(measurement, key, resolve_id(kind, values[key]))
+                if values.get("sensor_id") is not None:
+                    measurement.sensor_name = resolve(
+                        "sensor", values["sensor_id"]
+                    ).name
+                    measurement.platform_name = sensor_platform(
+                        values["sensor_id"]
+                    ).name
+                elif values.get("platform_id") is not None:
+                    measurement.platform_name = resolve(
+                        "platform", values["platform_id"]
+                    ).name
+                datafile.measurements[parser_name].append(measurement)
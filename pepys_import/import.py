@@ -9,15 +9,28 @@ DIRECTORY_PATH = os.path.dirname(FILE_PATH)
 DEFAULT_DATABASE = ":memory:"
 
 
-def main(path=DIRECTORY_PATH, db=DEFAULT_DATABASE, archive=False):
-    data_store = DataStore("", "", "", 0, db_name=db, db_type="sqlite")
+def main(
+    path=DIRECTORY_PATH,
+    db=DEFAULT_DATABASE,
+    archive=False,
+    workers=1,
+    bulk_load=False,
+    pipelined=False,
+    highlight=None,
+):
+    data_store = DataStore(
+        "", "", "", 0, db_name=db, db_type="sqlite", bulk_load=bulk_load
+    )
     data_store.initialise()
 
-    processor = FileProcessor(archive=archive)
+    if highlight is None:
+        # large amounts of data are loaded faster without highlighting
+        highlight = not bulk_load
+    processor = FileProcessor(archive=archive, highlight=highlight)
 
     processor.load_importers_dynamically()
 
-    processor.process(path, data_store, True)
+    processor.process(path, data_store, True, workers=workers, pipelined=pipelined)
 
 
 if __name__ == "__main__":
@@ -28,6 +41,19 @@ if __name__ == "__main__":
     archive_help = (
         " Instruction to archive (move) imported files to designated archive folder"
     )
+    workers_help = "Number of processes parsing files in parallel (The default is 1)"
+    pipelined_help = (
+        "Parse the next files in a background thread while writing to the database"
+    )
+    bulk_load_help = (
+        "Tune the database for loading large amounts of data, at the risk of "
+        "losing the last changes on power loss"
+    )
+    highlight_help = (
+        "Write a highlighted version of each file, showing what was imported from "
+        "it (The default is to highlight, except with --bulk-load)"
+    )
+    no_highlight_help = "Don't write highlighted files, which makes parsing faster"
     parser.add_argument(
         "--path", help=path_help, required=False, default=DIRECTORY_PATH
     )
@@ -39,5 +65,40 @@ if __name__ == "__main__":
         action="store_true",
         default=False,
     )
+    parser.add_argument(
+        "--workers", help=workers_help, type=int, required=False, default=1
+    )
+    parser.add_argument(
+        "--bulk-load",
+        dest="bulk_load",
+        help=bulk_load_help,
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--pipelined",
+        dest="pipelined",
+        help=pipelined_help,
+        action="store_true",
+        default=False,
+    )
+    parser.add_argument(
+        "--highlight",
+        dest="highlight",
+        help=highlight_help,
+        action="store_true",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-highlight", dest="highlight", help=no_highlight_help, action="store_false"
+    )
     args = parser.parse_args()
-    main(path=args.path, db=args.db, archive=args.archive)
+    main(
+        path=args.path,
+        db=args.db,
+        archive=args.archive,
+        workers=args.workers,
+        bulk_load=args.bulk_load,
+        pipelined=args.pipelined,
+        highlight=args.highlight,
+    )
@@ -9,6 +9,17 @@ elif SYSTEM == "Darwin":  # Darwin is MacOS
 elif SYSTEM == "Windows":
     PLATFORM_EXTENSION_PATH = "mod_spatialite"
 
+# Settings of SQLite connections in bulk load mode: a write-ahead log which is only
+# synced at checkpoints, a 256MB page cache (negative sizes are in KiB), 256MB of
+# memory mapped I/O, and temporary tables and indexes kept in memory
+BULK_LOAD_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -256 * 1024,
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
 
 def load_spatialite(connection, connection_record):
     """
@@ -25,3 +36,14 @@ def load_spatialite(connection, connection_record):
         connection.load_extension(environment_path)
     else:
         connection.load_extension(PLATFORM_EXTENSION_PATH)
+
+
+def set_bulk_load_pragmas(connection, connection_record):
+    """
+    Tunes the SQLite connection for loading large amounts of data, see
+    BULK_LOAD_PRAGMAS
+    """
+    cursor = connection.cursor()
+    for name, value in BULK_LOAD_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
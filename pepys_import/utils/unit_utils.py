@@ -3,9 +3,34 @@ from math import radians, cos, sin, asin, sqrt, atan2, degrees
 from pepys_import.core.formats import unit_registry
 
 
-def convert_absolute_angle(angle, line_number, errors, error_type):
+def conversion_factor(units, si_units):
     """
-    Converts given absolute angle value to degree and does sanity checks
+    Returns the factor converting values in the given units to the given SI units,
+    so that columns of values can be converted with a multiplication instead of a
+    pint conversion per value. Raises a DimensionalityError if the units aren't
+    compatible
+
+    :param units: Units of the values (as a pint unit instance)
+    :type units: pint unit
+    :param si_units: Units the values are converted to (as a pint unit instance)
+    :type si_units: pint unit
+    :return: Factor to multiply the values by
+    :rtype: float
+    """
+    return (1 * units).to(si_units).magnitude
+
+
+# Factors converting the units of the files imported to the SI units stored, worked
+# out once rather than for each value
+DEGREES_TO_RADIANS = conversion_factor(unit_registry.degree, unit_registry.radian)
+KNOTS_TO_METRES_PER_SECOND = conversion_factor(
+    unit_registry.knot, unit_registry.metre / unit_registry.second
+)
+
+
+def parse_absolute_angle(angle, line_number, errors, error_type):
+    """
+    Parses given absolute angle value, in degrees, into a float and does sanity checks
 
     :param angle: Angle value in string format
     :type angle: String
@@ -15,7 +40,7 @@ def convert_absolute_angle(angle, line_number, errors, error_type):
     :type errors: List
     :param error_type: Type of error
     :type error_type: String
-    :return: returns the converted angle value
+    :return: returns the angle in degrees, between 0 and 360
     """
     try:
         valid_angle = float(angle)
@@ -31,26 +56,44 @@ def convert_absolute_angle(angle, line_number, errors, error_type):
         valid_angle += 360
     if valid_angle > 360:
         valid_angle -= 360
+    return valid_angle
+
+
+def convert_absolute_angle(angle, line_number, errors, error_type):
+    """
+    Converts given absolute angle value to degree and does sanity checks
+
+    :param angle: Angle value in string format
+    :type angle: String
+    :param line_number: Line number
+    :type line_number: String
+    :param errors: Error List to save value error if it raises
+    :type errors: List
+    :param error_type: Type of error
+    :type error_type: String
+    :return: returns the converted angle value
+    """
+    valid_angle = parse_absolute_angle(angle, line_number, errors, error_type)
+    if valid_angle is False:
+        return False
     return valid_angle * unit_registry.degree
 
 
-def convert_speed(speed, units, line_number, errors, error_type):
+def parse_speed(speed, line_number, errors, error_type):
     """
-    Parses the given speed value into a float and assigns the given units
+    Parses the given speed value into a float
     :param speed: Speed value in string format
     :type speed: String
-    :param units: Units of the speed (as a pint unit instance)
-    :type units: pint unit
     :param line_number: Line number
     :type line_number: String
     :param errors: Error List to save value error if it raises
     :type errors: List
     :param error_type: Type of error
     :type error_type: String
-    :return: return the converted speed value
+    :return: return the speed value, in the units of the file
     """
     try:
-        valid_speed = float(speed)
+        return float(speed)
     except ValueError:
         errors.append(
             {
@@ -59,6 +102,26 @@ def convert_speed(speed, units, line_number, errors, error_type):
             }
         )
         return False
+
+
+def convert_speed(speed, units, line_number, errors, error_type):
+    """
+    Parses the given speed value into a float and assigns the given units
+    :param speed: Speed value in string format
+    :type speed: String
+    :param units: Units of the speed (as a pint unit instance)
+    :type units: pint unit
+    :param line_number: Line number
+    :type line_number: String
+    :param errors: Error List to save value error if it raises
+    :type errors: List
+    :param error_type: Type of error
+    :type error_type: String
+    :return: return the converted speed value
+    """
+    valid_speed = parse_speed(speed, line_number, errors, error_type)
+    if valid_speed is False:
+        return False
     speed = valid_speed * units
     return speed
 
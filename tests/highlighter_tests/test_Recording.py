@@ -1,4 +1,6 @@
 import os
+import re
+import tempfile
 import unittest
 from datetime import datetime
 from pepys_import.file.highlighter.highlighter import HighlightedFile
@@ -150,6 +152,96 @@ class UsageRecordingTests(unittest.TestCase):
 
         dataFile.export(os.path.join(OUTPUT_FOLDER, "track_lines.html"), True)
 
+    def test_usages_of_overlapping_records(self):
+        dataFile = HighlightedFile(DATA_FILE)
+        lines = dataFile.lines()
+
+        tokens = lines[0].tokens()
+        combine_tokens(tokens[0], tokens[1]).record("TOOL", "DTG", "VALUE", "N/A")
+        tokens[2].record("TOOL", "NAME", tokens[2].text, "N/A")
+        lines[0].record("TOOL", "LINE", "VALUE", "N/A")
+        lines[1].record("TOOL", "LINE", "VALUE", "N/A")
+
+        chars = dataFile.chars_debug()
+
+        def usages(index):
+            return [(usage.tool_field, usage.message) for usage in chars[index].usages]
+
+        dtg = ("TOOL/DTG", "Value:VALUE Units:N/A")
+        name = ("TOOL/NAME", "Value:MONDEO_44 Units:N/A")
+        line = ("TOOL/LINE", "Value:VALUE Units:N/A")
+        # each character has the usages recorded on it, in the order they were
+        # recorded. The space between the combined date and time isn't part of them
+        self.assertEqual([dtg, line], usages(0))
+        self.assertEqual([line], usages(6))
+        self.assertEqual([dtg, line], usages(7))
+        self.assertEqual([name, line], usages(18))
+        self.assertEqual([line], usages(56))
+        self.assertEqual([], usages(len(chars) - 1))
+
+        # the runs of characters cover the file, with the usages of each character
+        segments = list(chars.segments())
+        self.assertEqual(0, segments[0][0])
+        self.assertEqual(len(chars), segments[-1][1])
+        for (_, end, _), (start, _, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+        for start, end, usage_ids in segments:
+            for index in range(start, end):
+                self.assertEqual(
+                    [usage.tool_field for usage in chars[index].usages],
+                    [chars.usage(usage_id).tool_field for usage_id in usage_ids],
+                )
+        start, end, usage_ids = segments[0]
+        self.assertEqual((0, 6), (start, end))
+        self.assertEqual(
+            ["TOOL/DTG", "TOOL/LINE"],
+            [chars.usage(usage_id).tool_field for usage_id in usage_ids],
+        )
+
+    def test_paginated_export(self):
+        dataFile = HighlightedFile(DATA_FILE)
+        for line in dataFile.lines():
+            line.tokens()[0].record("TOOL", "FIRST", "VALUE", "N/A")
+            line.record("TOOL", "LINE", "VALUE", "N/A")
+
+        def page_text(path):
+            with open(path) as f:
+                body = f.read().split("<body")[1].split("</body>")[0]
+            return re.sub("<[^<]*>", "", body.split(">", 1)[1]).strip()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            single_path = os.path.join(temp_dir, "single.html")
+            dataFile.export(single_path, True)
+            index_path = os.path.join(temp_dir, "paged.html")
+            dataFile.export(index_path, True, page_size=100)
+
+            # pages of whole lines, linked from the index
+            page_paths = [
+                os.path.join(temp_dir, f"paged_page{number}.html")
+                for number in range(1, 4)
+            ]
+            self.assertEqual(
+                [
+                    "paged.html",
+                    "paged_page1.html",
+                    "paged_page2.html",
+                    "paged_page3.html",
+                ],
+                sorted(os.listdir(temp_dir))[:4],
+            )
+            with open(index_path) as f:
+                index = f.read()
+            self.assertIn('<a href="paged_page1.html">Lines 1 to 3</a>', index)
+            self.assertIn('<a href="paged_page3.html">Lines 6 to 7</a>', index)
+            self.assertIn("Color Key", index)
+
+            pages = "".join(page_text(path) for path in page_paths)
+            self.assertEqual(page_text(single_path).split("Color Key")[0], pages)
+            for path in page_paths:
+                with open(path) as f:
+                    page = f.read()
+                self.assertEqual(page.count("<span"), page.count("</span>"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,6 +2,13 @@ import os
 import unittest
 from pepys_import.file.highlighter.highlighter import HighlightedFile
 from pepys_import.file.highlighter.highlighter import Char
+from pepys_import.file.highlighter.support.tokenizer import (
+    CSV_DELIM,
+    WHITESPACE_DELIM,
+    quoted_csv_tokens,
+    regex_tokens,
+    split_tokens,
+)
 
 path = os.path.abspath(__file__)
 dir_path = os.path.dirname(path)
@@ -91,3 +98,50 @@ class SimpleTests(unittest.TestCase):
         self.assertEqual("951212", tokens[2].text)
         self.assertEqual("050300.000", tokens[3].text)
         self.assertEqual("BRAVO", tokens[4].text)
+
+    def test_SplitMatchesRegularExpression(self):
+        lines = [
+            "951212 050000.000 MONDEO_44   @C   269.7   10.0      10",
+            "  leading and trailing\t ",
+            "",
+            "a,b,,c",
+            ",a, b ,",
+            ",",
+            'a,"quoted, field",b',
+            '"first",second',
+            ',"unclosed,a,"',
+            'a, "spaced" ,"b""c",""',
+            '"a"b",c,"',
+            '"multi\nline",a',
+        ]
+        for line in lines:
+            for reg_exp, strip_char in [(WHITESPACE_DELIM, ""), (CSV_DELIM, ",")]:
+                texts, spans = split_tokens(line, reg_exp, strip_char)
+                expected_texts, expected_spans = regex_tokens(line, reg_exp, strip_char)
+                self.assertEqual(expected_texts, texts)
+                self.assertEqual(list(expected_spans), list(spans))
+
+    def test_SplitQuotedMatchesRegularExpression(self):
+        # every line of up to 7 of these characters, with a quote
+        lines = [""]
+        for _ in range(7):
+            lines = [line + char for line in lines for char in 'a," ']
+            for line in lines:
+                if '"' not in line:
+                    continue
+                texts, spans = quoted_csv_tokens(line)
+                expected_texts, expected_spans = regex_tokens(line, CSV_DELIM, ",")
+                self.assertEqual(expected_texts, texts)
+                self.assertEqual(list(expected_spans), list(spans))
+
+    def test_TokensAreCreatedOnAccess(self):
+        data_file = HighlightedFile(COMMA_FILE)
+        first_line = data_file.lines()[0]
+
+        tokens = first_line.tokens(first_line.CSV_DELIM, ",")
+        self.assertEqual("951212", tokens.texts[0])
+        self.assertEqual(tokens.texts, [token.text for token in tokens])
+        self.assertEqual(tokens.texts[-1], tokens[-1].text)
+        self.assertEqual(tokens.texts[1:3], [token.text for token in tokens[1:3]])
+        with self.assertRaises(IndexError):
+            tokens[len(tokens)]
@@ -3,6 +3,7 @@ import os
 
 from unittest import TestCase
 from datetime import datetime
+from sqlalchemy.event import listen
 
 from pepys_import.core.store import constants
 from pepys_import.core.store.data_store import DataStore
@@ -857,5 +858,68 @@ class MeasurementsTestCase(TestCase):
                 self.assertEqual(len(comments), 1)
 
 
+class ResolutionMemoTestCase(TestCase):
+    def setUp(self):
+        self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        self.store.initialise()
+        with self.store.session_scope():
+            self.change_id = self.store.add_to_changes(
+                "TEST", datetime.utcnow(), "TEST"
+            ).change_id
+
+        self.queries = list()
+        listen(
+            self.store.engine,
+            "before_cursor_execute",
+            lambda conn, cursor, statement, *args: self.queries.append(statement),
+        )
+
+    def resolve(self):
+        platform = self.store.get_platform(
+            platform_name="Test Platform",
+            nationality="UK",
+            platform_type="Fisher",
+            privacy="Public",
+            change_id=self.change_id,
+        )
+        sensor_type = self.store.add_to_sensor_types("GPS", self.change_id)
+        privacy = self.store.resolve_privacy(self.change_id)
+        sensor = platform.get_sensor(
+            data_store=self.store,
+            sensor_name="Test Sensor",
+            sensor_type=sensor_type,
+            privacy=privacy.name,
+            change_id=self.change_id,
+        )
+        return platform, sensor, privacy
+
+    def test_repeated_lookups_are_served_from_memory(self):
+        with self.store.session_scope():
+            first = self.resolve()
+            number_of_queries = len(self.queries)
+
+            for _ in range(10):
+                self.assertEqual(self.resolve(), first)
+            self.assertEqual(len(self.queries), number_of_queries)
+
+    def test_memo_is_cleared_with_the_session(self):
+        with self.store.session_scope():
+            self.resolve()
+            self.assertNotEqual(self.store.resolution_memo, {})
+        self.assertEqual(self.store.resolution_memo, {})
+
+        with self.assertRaises(ValueError):
+            with self.store.session_scope():
+                self.resolve()
+                raise ValueError()
+        self.assertEqual(self.store.resolution_memo, {})
+
+        # the rolled back platform is created again
+        with self.store.session_scope():
+            platform, sensor, _ = self.resolve()
+            platforms = self.store.session.query(self.store.db_classes.Platform).all()
+            self.assertEqual(platforms, [platform])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,12 +1,19 @@
+import os
+import tempfile
 import unittest
 
+from importers.replay_importer import ReplayImporter
 from pepys_import.core.store.data_store import DataStore
+from pepys_import.file.file_processor import FileProcessor
 from testing.postgresql import Postgresql
 from sqlalchemy import inspect
 from unittest import TestCase
 
 import platform
 
+FILE_PATH = os.path.dirname(__file__)
+REP_PATH = os.path.join(FILE_PATH, "sample_data/track_files/rep_data/rep_test1.rep")
+
 
 class DataStoreInitialisePostGISTestCase(TestCase):
     def setUp(self):
@@ -58,8 +65,8 @@ class DataStoreInitialisePostGISTestCase(TestCase):
         table_names = inspector.get_table_names(schema="pepys")
         schema_names = inspector.get_schema_names()
 
-        # 34 tables must be created to default schema
-        self.assertEqual(len(table_names), 34)
+        # 35 tables must be created to default schema
+        self.assertEqual(len(table_names), 35)
         self.assertIn("Platforms", table_names)
         self.assertIn("States", table_names)
         self.assertIn("Datafiles", table_names)
@@ -96,9 +103,9 @@ class DataStoreInitialiseSpatiaLiteTestCase(TestCase):
         SYSTEM = platform.system()
 
         if SYSTEM == "Windows":
-            correct_n_tables = 72
+            correct_n_tables = 73
         else:
-            correct_n_tables = 70
+            correct_n_tables = 71
 
         # 36 tables + 36 spatial tables must be created. A few of them tested
         self.assertEqual(len(table_names), correct_n_tables)
@@ -113,6 +120,93 @@ class DataStoreInitialiseSpatiaLiteTestCase(TestCase):
         self.assertIn("virts_geometry_columns", table_names)
         self.assertIn("spatialite_history", table_names)
 
+    def test_sqlite_ensure_indexes(self):
+        """Test whether missing indexes are added to an existing SQLite database"""
+        data_store_sqlite = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        data_store_sqlite.initialise()
+
+        inspector = inspect(data_store_sqlite.engine)
+        index_names = [index["name"] for index in inspector.get_indexes("States")]
+        self.assertIn("ix_States_sensor_id_time", index_names)
+
+        # all indexes exist, so none is created
+        self.assertEqual(data_store_sqlite.ensure_indexes(), [])
+
+        # a database created before the index was added to the model
+        data_store_sqlite.engine.execute("DROP INDEX ix_States_sensor_id_time")
+        self.assertEqual(
+            data_store_sqlite.ensure_indexes(), ["ix_States_sensor_id_time"]
+        )
+        inspector = inspect(data_store_sqlite.engine)
+        index_names = [index["name"] for index in inspector.get_indexes("States")]
+        self.assertIn("ix_States_sensor_id_time", index_names)
+
+    def test_sqlite_initialise_earlier_schema(self):
+        """Test whether a SQLite database created by an earlier version, without the
+        columns and tables added since, can still be initialised and imported into"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "earlier.db")
+            data_store_sqlite = DataStore("", "", "", 0, db_path, db_type="sqlite")
+            data_store_sqlite.initialise()
+
+            # the tables as they were created before
+            with data_store_sqlite.engine.begin() as connection:
+                connection.execute('DROP TABLE "TableStatistics"')
+                connection.execute('DROP TABLE "Datafiles"')
+                connection.execute(
+                    'CREATE TABLE "Datafiles" (datafile_id INTEGER NOT NULL, '
+                    "simulated BOOLEAN NOT NULL, privacy_id INTEGER NOT NULL, "
+                    "datafile_type_id INTEGER NOT NULL, reference VARCHAR(150), "
+                    "url VARCHAR(150), created_date DATETIME, "
+                    "PRIMARY KEY (datafile_id))"
+                )
+                connection.execute('DROP TABLE "Logs"')
+                connection.execute(
+                    'CREATE TABLE "Logs" (log_id INTEGER NOT NULL, '
+                    '"table" VARCHAR(150) NOT NULL, id INTEGER NOT NULL, '
+                    "field VARCHAR(150), new_value VARCHAR(150), "
+                    "change_id INTEGER NOT NULL, created_date DATETIME, "
+                    "PRIMARY KEY (log_id))"
+                )
+            data_store_sqlite.engine.dispose()
+
+            data_store_sqlite = DataStore("", "", "", 0, db_path, db_type="sqlite")
+            data_store_sqlite.initialise()
+
+            inspector = inspect(data_store_sqlite.engine)
+            datafile_columns = [
+                column["name"] for column in inspector.get_columns("Datafiles")
+            ]
+            self.assertIn("size", datafile_columns)
+            self.assertIn("hash", datafile_columns)
+            log_columns = [column["name"] for column in inspector.get_columns("Logs")]
+            for column in ["last_id", "row_count", "datafile_id"]:
+                self.assertIn(column, log_columns)
+            index_names = [
+                index["name"] for index in inspector.get_indexes("Datafiles")
+            ]
+            self.assertIn("ix_Datafiles_hash", index_names)
+            self.assertIn("TableStatistics", inspector.get_table_names())
+
+            # nothing is left to add
+            self.assertEqual(data_store_sqlite.ensure_columns(), [])
+
+            processor = FileProcessor(archive=False)
+            processor.register_importer(ReplayImporter())
+            processor.process(REP_PATH, data_store_sqlite, False)
+            with data_store_sqlite.session_scope():
+                datafile = data_store_sqlite.session.query(
+                    data_store_sqlite.db_classes.Datafile
+                ).one()
+                self.assertEqual(datafile.size, os.path.getsize(REP_PATH))
+                self.assertEqual(
+                    data_store_sqlite.session.query(
+                        data_store_sqlite.db_classes.State
+                    ).count(),
+                    8,
+                )
+            data_store_sqlite.engine.dispose()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,7 @@
 import unittest
 import os
+import shutil
+import tempfile
 
 from pepys_import.core.store.data_store import DataStore
 from pepys_import.core.store.table_summary import TableSummary
@@ -34,6 +36,88 @@ class ReferenceTestCase(unittest.TestCase):
             datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
             assert datafiles[0].reference == "rep_test1.rep"
 
+    def test_same_content_is_not_imported_twice(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+
+        processor.process(REP_FILE_PATH, self.store, False)
+
+        with self.store.session_scope():
+            states = TableSummary(self.store.session, self.store.db_classes.State)
+            number_of_states = states.number_of_rows
+            assert number_of_states > 0
+
+        # import the same file again, then a renamed copy of it
+        processor.process(REP_FILE_PATH, self.store, False)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            copy_path = os.path.join(temp_dir, "renamed_copy.rep")
+            shutil.copyfile(REP_FILE_PATH, copy_path)
+            processor.output_path = os.path.join(temp_dir, "output")
+            processor.process(copy_path, self.store, False)
+
+        with self.store.session_scope():
+            datafiles = TableSummary(self.store.session, self.store.db_classes.Datafile)
+            assert datafiles.number_of_rows == 1
+
+            states = TableSummary(self.store.session, self.store.db_classes.State)
+            assert states.number_of_rows == number_of_states
+
+            datafile = self.store.session.query(self.store.db_classes.Datafile).one()
+            assert datafile.size == os.path.getsize(REP_FILE_PATH)
+            assert len(datafile.hash) == 64
+
+    def test_different_content_with_same_name_is_a_new_datafile(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+
+        processor.process(REP_FILE_PATH, self.store, False)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            changed_path = os.path.join(temp_dir, "rep_test1.rep")
+            with open(REP_FILE_PATH) as source, open(changed_path, "w") as target:
+                # drop the last line, so that the content differs
+                target.writelines(source.readlines()[:-1])
+            processor.output_path = os.path.join(temp_dir, "output")
+            processor.process(changed_path, self.store, False)
+
+        with self.store.session_scope():
+            datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
+            assert len(datafiles) == 2
+            assert datafiles[0].reference == datafiles[1].reference == "rep_test1.rep"
+            assert datafiles[0].hash != datafiles[1].hash
+
+    def test_same_content_is_not_imported_twice_in_parallel(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # two copies of the same file, digested by different workers
+            for name in ["first_copy.rep", "second_copy.rep"]:
+                shutil.copyfile(REP_FILE_PATH, os.path.join(temp_dir, name))
+            processor.output_path = os.path.join(temp_dir, "output")
+            processor.process(temp_dir, self.store, False, workers=2)
+
+            with self.store.session_scope():
+                datafiles = TableSummary(
+                    self.store.session, self.store.db_classes.Datafile
+                )
+                assert datafiles.number_of_rows == 1
+                states = TableSummary(self.store.session, self.store.db_classes.State)
+                number_of_states = states.number_of_rows
+
+            # and again, once they have been imported
+            processor.process(temp_dir, self.store, False, workers=2)
+
+        with self.store.session_scope():
+            datafiles = TableSummary(self.store.session, self.store.db_classes.Datafile)
+            assert datafiles.number_of_rows == 1
+            states = TableSummary(self.store.session, self.store.db_classes.State)
+            assert states.number_of_rows == number_of_states
+
+            datafile = self.store.session.query(self.store.db_classes.Datafile).one()
+            assert datafile.reference in ["first_copy.rep", "second_copy.rep"]
+            assert datafile.size == os.path.getsize(REP_FILE_PATH)
+
 
 if __name__ == "__main__":
     unittest.main()
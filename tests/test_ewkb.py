@@ -0,0 +1,63 @@
+import struct
+
+import pytest
+from shapely import wkb
+from shapely.geometry import Point
+
+from pepys_import.core.formats.ewkb import (
+    decode_point,
+    decode_points,
+    encode_point,
+    encode_points,
+    ewkt_to_ewkb,
+    parse_ewkt_point,
+)
+
+
+def test_encode_point():
+    point = wkb.loads(encode_point(-1.25, 50.5), hex=True)
+
+    assert (point.x, point.y) == (-1.25, 50.5)
+    assert encode_point(-1.35, 50.23) == (
+        "0101000020e61000009a9999999999f5bf3d0ad7a3701d4940"
+    )
+
+
+def test_decode_point():
+    assert decode_point("0101000020E61000009A9999999999F5BF3D0AD7A3701D4940") == (
+        -1.35,
+        50.23,
+    )
+    assert decode_point(bytes.fromhex(encode_point(-1.25, 50.5))) == (-1.25, 50.5)
+    assert decode_point(memoryview(bytes.fromhex(encode_point(1, 2)))) == (1, 2)
+
+
+def test_decode_other_wkb():
+    # WKB without SRID, in both byte orders
+    assert decode_point(wkb.dumps(Point(-1.25, 50.5))) == (-1.25, 50.5)
+    assert decode_point(wkb.dumps(Point(-1.25, 50.5), big_endian=True)) == (
+        -1.25,
+        50.5,
+    )
+    # big endian EWKB
+    assert decode_point(struct.pack(">BIIdd", 0, 0x20000001, 4326, 3, 4)) == (3, 4)
+
+    with pytest.raises(ValueError):
+        decode_point(wkb.dumps(Point(1, 2, 3)))
+
+
+def test_batch_encode_and_decode():
+    longitudes = [-1.25, 0.0, 179.5]
+    latitudes = [50.5, -12.75, 0.125]
+
+    values = encode_points(longitudes, latitudes)
+    assert values == [
+        encode_point(longitude, latitude)
+        for longitude, latitude in zip(longitudes, latitudes)
+    ]
+    assert decode_points(values) == (longitudes, latitudes)
+
+
+def test_ewkt_point():
+    assert parse_ewkt_point("SRID=4326;POINT(-1.25 50.5)") == (-1.25, 50.5)
+    assert ewkt_to_ewkb("SRID=4326;POINT(-1.25 50.5)") == encode_point(-1.25, 50.5)
@@ -1,9 +1,19 @@
+import os
+import tempfile
 import unittest
 
+from importers.replay_comment_importer import ReplayCommentImporter
+from importers.replay_contact_importer import ReplayContactImporter
+from importers.replay_importer import ReplayImporter
 from pepys_import.core.store.data_store import DataStore
+from pepys_import.file.file_processor import FileProcessor
 from testing.postgresql import Postgresql
 from unittest import TestCase
 
+FILE_PATH = os.path.dirname(__file__)
+DATA_PATH = os.path.join(FILE_PATH, "sample_data/track_files/rep_data/rep_test1.rep")
+UK_TRACK_PATH = os.path.join(FILE_PATH, "sample_data/track_files/rep_data/uk_track.rep")
+
 
 class DataStoreExportPostGISDBTestCase(TestCase):
     def setUp(self):
@@ -87,6 +97,113 @@ class DataStoreExportSpatiaLiteTestCase(TestCase):
 
         # self.assertNotEqual(len(records), 0)
 
+    def test_sqlite_export_rep_file(self):
+        """Test whether all measurements of a datafile are exported, in time order"""
+        data_store_sqlite = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        data_store_sqlite.initialise()
+
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+        processor.register_importer(ReplayContactImporter())
+        processor.register_importer(ReplayCommentImporter())
+        processor.process(DATA_PATH, data_store_sqlite, False)
+
+        with data_store_sqlite.session_scope(), tempfile.TemporaryDirectory() as tmp:
+            session = data_store_sqlite.session
+            db_classes = data_store_sqlite.db_classes
+            datafile = session.query(db_classes.Datafile).one()
+            counts = [
+                session.query(measurement_class)
+                .filter(measurement_class.source_id == datafile.datafile_id)
+                .count()
+                for measurement_class in [
+                    db_classes.State,
+                    db_classes.Contact,
+                    db_classes.Comment,
+                ]
+            ]
+
+            path = os.path.join(tmp, "rep_test1")
+            data_store_sqlite.export_datafile(datafile.datafile_id, path)
+            with open(path + ".rep", newline="") as f:
+                lines = f.read().split("\r\n")[:-1]
+
+        self.assertEqual(len(lines), sum(counts))
+        self.assertEqual(len([line for line in lines if line[0] != ";"]), counts[0])
+        # contact and comment lines start with their type
+        times = [
+            tuple(line.split()[1:3] if line[0] == ";" else line.split()[:2])
+            for line in lines
+        ]
+        self.assertEqual(times, sorted(times))
+
+    def test_sqlite_export_datafiles(self):
+        """Test whether datafiles are exported by worker processes, whole or within a
+        time window"""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_store_sqlite = DataStore(
+                "", "", "", 0, os.path.join(tmp, "test.db"), db_type="sqlite"
+            )
+            data_store_sqlite.initialise()
+
+            processor = FileProcessor(archive=False)
+            processor.register_importer(ReplayImporter())
+            processor.register_importer(ReplayContactImporter())
+            processor.register_importer(ReplayCommentImporter())
+            processor.process(DATA_PATH, data_store_sqlite, False)
+            processor.process(UK_TRACK_PATH, data_store_sqlite, False)
+
+            paths = data_store_sqlite.export_datafiles(tmp, workers=2)
+            self.assertEqual(
+                sorted(paths),
+                [
+                    os.path.join(tmp, "rep_test1_rep.rep"),
+                    os.path.join(tmp, "uk_track_rep.rep"),
+                ],
+            )
+            with data_store_sqlite.session_scope():
+                db_classes = data_store_sqlite.db_classes
+                session = data_store_sqlite.session
+                for path in paths:
+                    reference = os.path.basename(path)[: -len("_rep.rep")] + ".rep"
+                    datafile = (
+                        session.query(db_classes.Datafile)
+                        .filter(db_classes.Datafile.reference == reference)
+                        .one()
+                    )
+                    count = sum(
+                        session.query(measurement_class)
+                        .filter(measurement_class.source_id == datafile.datafile_id)
+                        .count()
+                        for measurement_class in [
+                            db_classes.State,
+                            db_classes.Contact,
+                            db_classes.Comment,
+                        ]
+                    )
+                    with open(path, newline="") as f:
+                        self.assertEqual(len(f.read().split("\r\n")[:-1]), count)
+
+                first_state = (
+                    session.query(db_classes.State)
+                    .order_by(db_classes.State.time)
+                    .first()
+                )
+                start = end = first_state.time
+
+            window = os.path.join(tmp, "window")
+            os.mkdir(window)
+            paths = data_store_sqlite.export_datafiles(
+                window, start=start, end=end, workers=2
+            )
+            self.assertEqual(len(paths), 1)
+            with open(paths[0], newline="") as f:
+                lines = f.read().split("\r\n")[:-1]
+            self.assertGreater(len(lines), 0)
+            self.assertTrue(
+                all(start.strftime("%y%m%d %H%M%S") in line[:40] for line in lines)
+            )
+
 
 if __name__ == "__main__":
     unittest.main()
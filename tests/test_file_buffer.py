@@ -0,0 +1,119 @@
+import hashlib
+import os
+import tempfile
+import unittest
+
+from pepys_import.file.file_buffer import FileBuffer
+from pepys_import.file.highlighter.highlighter import HighlightedFile
+
+FILE_PATH = os.path.dirname(__file__)
+REP_FILE_PATH = os.path.join(
+    FILE_PATH, "sample_data/track_files/rep_data/rep_test1.rep"
+)
+
+
+class FileBufferTestCase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_file(self, content):
+        path = os.path.join(self.temp_dir.name, "test.txt")
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_hash_and_size(self):
+        file_buffer = FileBuffer(REP_FILE_PATH)
+        with open(REP_FILE_PATH, "rb") as f:
+            content = f.read()
+
+        assert file_buffer.size == len(content)
+        assert file_buffer.hash == hashlib.sha256(content).hexdigest()
+        # the digest is kept after the text is decoded
+        assert file_buffer.text
+        assert file_buffer.hash == hashlib.sha256(content).hexdigest()
+
+    def test_same_text_as_text_mode(self):
+        file_buffer = FileBuffer(REP_FILE_PATH)
+        with open(REP_FILE_PATH, "r", encoding="utf-8") as f:
+            first_line = f.readline()
+            f.seek(0)
+            content = f.read()
+
+        assert file_buffer.text == content
+        assert file_buffer.first_line == first_line
+        assert file_buffer.lines == content.splitlines()
+        assert file_buffer.split_contents() == content.split("\n")
+
+    def test_universal_newlines(self):
+        path = self.write_file(b"first\r\nsecond\rthird\n")
+        file_buffer = FileBuffer(path)
+
+        assert file_buffer.text == "first\nsecond\nthird\n"
+        assert file_buffer.first_line == "first\n"
+        assert file_buffer.lines == ["first", "second", "third"]
+
+    def test_windows_1252_fallback(self):
+        path = self.write_file("café\n".encode("windows-1252"))
+        file_buffer = FileBuffer(path)
+
+        assert file_buffer.text == "café\n"
+
+    def test_highlighted_file_uses_buffer(self):
+        file_buffer = FileBuffer(REP_FILE_PATH)
+        highlighted_file = HighlightedFile(REP_FILE_PATH, file_buffer=file_buffer)
+
+        lines = highlighted_file.lines()
+        assert [line.text for line in lines] == file_buffer.lines
+        assert highlighted_file.get_file_buffer() is file_buffer
+
+        highlighted_file.fill_char_array_if_needed()
+        assert len(highlighted_file.chars) == len(file_buffer.text)
+
+    def test_streaming_gives_same_content(self):
+        file_buffer = FileBuffer(REP_FILE_PATH)
+        streamed_buffer = FileBuffer(REP_FILE_PATH, streaming=True)
+
+        assert streamed_buffer.hash == file_buffer.hash
+        assert streamed_buffer.first_line == file_buffer.first_line
+        assert list(streamed_buffer.iter_lines()) == file_buffer.lines
+        # nothing is kept in memory
+        assert streamed_buffer._bytes is None
+        assert streamed_buffer._text is None
+
+    def test_streaming_universal_newlines(self):
+        path = self.write_file(b"first\r\nsecond\rthird\n")
+        file_buffer = FileBuffer(path, streaming=True)
+
+        assert file_buffer.first_line == "first\n"
+        assert list(file_buffer.iter_lines()) == ["first", "second", "third"]
+
+    def test_streamed_highlighted_file(self):
+        highlighted_file = HighlightedFile(REP_FILE_PATH)
+        streamed_file = HighlightedFile(REP_FILE_PATH, streaming=True)
+
+        lines = streamed_file.lines()
+        assert not isinstance(lines, list)
+        streamed_lines = list(lines)
+        expected_lines = highlighted_file.lines()
+        assert [line.text for line in streamed_lines] == [
+            line.text for line in expected_lines
+        ]
+        assert [line.children[0].line_start for line in streamed_lines] == [
+            line.children[0].line_start for line in expected_lines
+        ]
+
+        # usages are not recorded, so no char array is built
+        streamed_lines[0].tokens()[0].record("tool", "field", "value")
+        streamed_lines[0].record("tool", "field", "value")
+        assert len(streamed_file.chars) == 0
+
+        limited_file = HighlightedFile(REP_FILE_PATH, 2, streaming=True)
+        assert len(list(limited_file.lines())) == 2
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,9 +6,10 @@ import unittest
 from contextlib import redirect_stdout
 from io import StringIO
 from datetime import datetime
-from unittest.mock import patch
+from unittest.mock import PropertyMock, patch
 
 from pepys_import.file.importer import Importer
+from pepys_import.file.file_buffer import FileBuffer
 from pepys_import.file.file_processor import FileProcessor
 from importers.replay_importer import ReplayImporter
 from importers.nmea_importer import NMEAImporter
@@ -249,11 +250,15 @@ class ImporterRemoveTestCase(unittest.TestCase):
         self.assertEqual(type(processor.importers[0]), TestImporter)
 
         temp_output = StringIO()
-        with redirect_stdout(temp_output):
+        with redirect_stdout(temp_output), patch.object(
+            FileBuffer, "hash", new_callable=PropertyMock
+        ) as file_hash:
             processor.process(DATA_PATH, None, False)
         output = temp_output.getvalue()
 
         self.assertIn("Files got processed: 0 times", output)
+        # files that no importer accepts by suffix aren't read to be digested
+        file_hash.assert_not_called()
 
     def test_can_load_this_file(self):
         """Test whether can_load_this_file removes the importer from the importers"""
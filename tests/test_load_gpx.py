@@ -77,6 +77,28 @@ class GPXTests(unittest.TestCase):
             )
             assert len(elev_states) == 1
 
+    def test_process_gpx_data_in_batches(self):
+        # the points of a track are read a couple at a time, giving the same states
+        def load_states(store, importer):
+            processor = FileProcessor(archive=False)
+            processor.register_importer(importer)
+            processor.process(DATA_PATH, store, False)
+            with store.session_scope():
+                return [
+                    (state.time, state.location, state.speed, state.elevation)
+                    for state in store.session.query(store.db_classes.State)
+                    .order_by(store.db_classes.State.state_id)
+                    .all()
+                ]
+
+        in_batches = load_states(self.store, GPXImporter(batch_size=2))
+        store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        store.initialise()
+        in_one_go = load_states(store, GPXImporter())
+
+        assert len(in_batches) == 27
+        assert in_batches == in_one_go
+
 
 if __name__ == "__main__":
     unittest.main()
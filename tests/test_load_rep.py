@@ -1,9 +1,25 @@
 import os
+import tempfile
 import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from itertools import product
+from datetime import datetime
 
+import numpy as np
+
+from unittest.mock import patch
+
+from importers.replay_comment_importer import ReplayCommentImporter
+from importers.replay_contact_importer import ReplayContactImporter
 from importers.replay_importer import ReplayImporter
+from pepys_import.file.highlighter.highlighter import HighlightedFile
+from pepys_import.file.highlighter.support.test_utils import create_test_line_object
 from pepys_import.file.file_processor import FileProcessor
+from pepys_import.file.parse_worker import MeasurementBatch, create_scratch_store
 from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.formats import unit_registry
+from pepys_import.core.formats.rep_batch import parse_rep_states
 
 FILE_PATH = os.path.dirname(__file__)
 DATA_PATH = os.path.join(FILE_PATH, "sample_data/track_files/rep_data/")
@@ -52,6 +68,514 @@ class TestLoadREP(unittest.TestCase):
             datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
             self.assertEqual(len(datafiles), 7)
 
+    def test_load_rep_data_in_one_pass(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+        processor.register_importer(ReplayContactImporter())
+        processor.register_importer(ReplayCommentImporter())
+
+        data_path = os.path.join(DATA_PATH, "rep_test1.rep")
+        with patch.object(
+            HighlightedFile, "lines", autospec=True, side_effect=HighlightedFile.lines
+        ) as lines:
+            processor.process(data_path, self.store, False)
+        # the file is read once, for all three importers
+        self.assertEqual(lines.call_count, 1)
+
+        with self.store.session_scope():
+            session = self.store.session
+            self.assertEqual(session.query(self.store.db_classes.State).count(), 8)
+            self.assertEqual(session.query(self.store.db_classes.Contact).count(), 7)
+            self.assertEqual(session.query(self.store.db_classes.Comment).count(), 7)
+
+    def test_load_rep_data_in_parallel(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+
+        # parse the folder with two worker processes
+        processor.process(DATA_PATH, self.store, False, workers=2)
+
+        # check the same data got created as when parsing in this process
+        with self.store.session_scope():
+            states = self.store.session.query(self.store.db_classes.State).all()
+            self.assertEqual(len(states), 746)
+
+            platforms = self.store.session.query(self.store.db_classes.Platform).all()
+            self.assertEqual(len(platforms), 5)
+
+            datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
+            self.assertEqual(len(datafiles), 7)
+
+    def test_load_rep_data_pipelined(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+
+        with patch(
+            "pepys_import.file.file_processor.create_scratch_store",
+            side_effect=create_scratch_store,
+        ) as create_store:
+            processor.process(DATA_PATH, self.store, False, pipelined=True)
+        # all the files are parsed against the same scratch database
+        self.assertEqual(create_store.call_count, 1)
+
+        # check the same data got created as when parsing and writing in turn
+        with self.store.session_scope():
+            states = self.store.session.query(self.store.db_classes.State).all()
+            self.assertEqual(len(states), 746)
+
+            platforms = self.store.session.query(self.store.db_classes.Platform).all()
+            self.assertEqual(len(platforms), 5)
+
+            datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
+            self.assertEqual(len(datafiles), 7)
+
+    def test_load_rep_data_pipelined_in_batches(self):
+        processor = FileProcessor(archive=False, commit_batch_size=50)
+        processor.register_importer(ReplayImporter())
+        processor.process(DATA_PATH, self.store, False)
+        with open(os.path.join(processor.directory_path, "sen_tracks_output.log")) as f:
+            extraction_log = f.read()
+
+        store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        store.initialise()
+        with patch(
+            "pepys_import.file.parse_worker.MeasurementBatch",
+            side_effect=MeasurementBatch,
+        ) as create_batch:
+            processor.process(DATA_PATH, store, False, pipelined=True)
+        # the states of a file are handed over in batches of at most 50 rows
+        self.assertGreaterEqual(create_batch.call_count, 746 / 50)
+
+        # and committed as if they were handed over in one go
+        with open(os.path.join(processor.directory_path, "sen_tracks_output.log")) as f:
+            self.assertEqual(f.read(), extraction_log)
+        with self.store.session_scope(), store.session_scope():
+            State = self.store.db_classes.State
+            self.assertEqual(
+                [
+                    (state.time, state.location, state.heading, state.speed)
+                    for state in store.session.query(State).order_by(State.state_id)
+                ],
+                [
+                    (state.time, state.location, state.heading, state.speed)
+                    for state in self.store.session.query(State).order_by(
+                        State.state_id
+                    )
+                ],
+            )
+
+    def test_load_rep_data_in_parallel_resolves_as_serial(self):
+        def import_folder(**kwargs):
+            """Import the folder into a database holding the reference data the
+            importers ask for, and return what got resolved"""
+            store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+            store.initialise()
+            with store.session_scope():
+                change_id = store.add_to_changes(
+                    "TEST", datetime.utcnow(), "TEST"
+                ).change_id
+                store.add_to_nationalities("UK", change_id)
+                store.add_to_platform_types("Fisher", change_id)
+                store.add_to_privacies("Public", change_id)
+
+            processor = FileProcessor(archive=False)
+            processor.register_importer(ReplayImporter())
+            processor.register_importer(ReplayContactImporter())
+            processor.register_importer(ReplayCommentImporter())
+            with redirect_stdout(StringIO()):
+                processor.process(DATA_PATH, store, False, **kwargs)
+
+            with store.session_scope():
+                session = store.session
+                db_classes = store.db_classes
+                platforms = sorted(
+                    (
+                        platform.name,
+                        session.query(db_classes.PlatformType)
+                        .get(platform.platform_type_id)
+                        .name,
+                        session.query(db_classes.Privacy).get(platform.privacy_id).name,
+                        platform.trigraph,
+                    )
+                    for platform in session.query(db_classes.Platform)
+                )
+                sensors = sorted(
+                    (
+                        sensor.name,
+                        session.query(db_classes.Platform).get(sensor.host).name,
+                    )
+                    for sensor in session.query(db_classes.Sensor)
+                )
+                privacies = sorted(
+                    privacy.name for privacy in session.query(db_classes.Privacy)
+                )
+                counts = [
+                    session.query(db_classes.State).count(),
+                    session.query(db_classes.Contact).count(),
+                    session.query(db_classes.Comment).count(),
+                    session.query(db_classes.Datafile).count(),
+                ]
+            return platforms, sensors, privacies, counts
+
+        platforms, sensors, privacies, counts = import_folder(workers=1)
+        # the platforms are those the importers asked for, not the defaults of the
+        # missing data resolver
+        self.assertEqual(
+            {platform[1:] for platform in platforms}, {("Fisher", "Public", None)}
+        )
+        self.assertEqual(
+            import_folder(workers=2), (platforms, sensors, privacies, counts)
+        )
+        self.assertEqual(
+            import_folder(pipelined=True), (platforms, sensors, privacies, counts)
+        )
+
+    def test_get_track(self):
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+        processor.process(DATA_PATH, self.store, False)
+
+        with self.store.session_scope():
+            State = self.store.db_classes.State
+            Sensor = self.store.db_classes.Sensor
+            platform = self.store.session.query(self.store.db_classes.Platform).first()
+            states = (
+                self.store.session.query(State)
+                .join(Sensor, Sensor.sensor_id == State.sensor_id)
+                .filter(Sensor.host == platform.platform_id)
+                .order_by(State.time)
+                .all()
+            )
+
+            # the columns hold the same values as the State objects, in SI units
+            track = self.store.get_track(platform.name)
+            self.assertEqual(len(track["time"]), len(states))
+            self.assertEqual(
+                list(track["time"].astype(datetime)), [state.time for state in states]
+            )
+            np.testing.assert_allclose(
+                track["latitude"], [state.location.latitude for state in states]
+            )
+            np.testing.assert_allclose(
+                track["longitude"], [state.location.longitude for state in states]
+            )
+            np.testing.assert_allclose(
+                track["speed"], [state.speed.magnitude for state in states]
+            )
+            np.testing.assert_allclose(
+                track["heading"],
+                [state.heading.to(unit_registry.radian).magnitude for state in states],
+            )
+            # REP files have no course
+            self.assertTrue(np.isnan(track["course"]).all())
+
+            # the time range is inclusive
+            start, end = states[1].time, states[-2].time
+            self.assertEqual(
+                len(self.store.get_track(platform, start, end)["time"]),
+                len(states) - 2,
+            )
+
+            # chunks hold the same states as the whole track
+            chunks = list(self.store.iter_track(platform, chunk_size=10))
+            self.assertEqual(len(chunks), (len(states) + 9) // 10)
+            np.testing.assert_array_equal(
+                np.concatenate([chunk["time"] for chunk in chunks]), track["time"]
+            )
+            np.testing.assert_allclose(
+                np.concatenate([chunk["speed"] for chunk in chunks]), track["speed"]
+            )
+
+    def test_load_rep_data_streaming(self):
+        # stream every file, whatever its size
+        processor = FileProcessor(archive=False, streaming_size=0)
+        processor.register_importer(ReplayImporter())
+
+        temp_output = StringIO()
+        with redirect_stdout(temp_output):
+            processor.process(DATA_PATH, self.store, False)
+
+        # streamed files aren't highlighted, and that is reported
+        self.assertIn(
+            "'rep_test1.rep' is read in streaming mode, no highlighted version of it "
+            "is written.",
+            temp_output.getvalue(),
+        )
+        self.assertFalse(
+            any(
+                name.endswith("_highlighted.html")
+                for name in os.listdir(processor.directory_path)
+            )
+        )
+
+        # check the same data got created as when reading the files in one go
+        with self.store.session_scope():
+            states = self.store.session.query(self.store.db_classes.State).all()
+            self.assertEqual(len(states), 746)
+
+            platforms = self.store.session.query(self.store.db_classes.Platform).all()
+            self.assertEqual(len(platforms), 5)
+
+            datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
+            self.assertEqual(len(datafiles), 7)
+
+    def test_load_rep_data_streaming_parsed_in_batches(self):
+        # streamed state lines are parsed a few at a time, and give the same states
+        # as lines parsed one by one
+        def load_states(store, processor):
+            processor.register_importer(ReplayImporter(batch_size=7))
+            processor.process(DATA_PATH, store, False)
+            with store.session_scope():
+                return [
+                    (
+                        state.time,
+                        state.sensor_id,
+                        state.location,
+                        state.speed,
+                        state.heading,
+                        state.elevation,
+                    )
+                    for state in store.session.query(store.db_classes.State)
+                    .order_by(store.db_classes.State.state_id)
+                    .all()
+                ]
+
+        streamed = load_states(
+            self.store, FileProcessor(archive=False, streaming_size=0)
+        )
+        store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        store.initialise()
+        in_one_go = load_states(store, FileProcessor(archive=False))
+
+        self.assertEqual(len(streamed), 746)
+        self.assertEqual(streamed, in_one_go)
+
+    def test_load_rep_data_without_highlighting(self):
+        # lines which aren't highlighted are parsed in batches, even if the file
+        # isn't streamed, and give the same states as highlighted lines
+        def load_states(store, processor):
+            processor.register_importer(ReplayImporter())
+            processor.process(DATA_PATH, store, False)
+            with store.session_scope():
+                return [
+                    (state.time, state.sensor_id, state.location, state.heading)
+                    for state in store.session.query(store.db_classes.State)
+                    .order_by(store.db_classes.State.state_id)
+                    .all()
+                ]
+
+        processor = FileProcessor(archive=False, highlight=False)
+        with patch(
+            "importers.replay_importer.parse_rep_states", wraps=parse_rep_states
+        ) as batch_parser:
+            not_highlighted = load_states(self.store, processor)
+        self.assertTrue(batch_parser.called)
+        self.assertFalse(
+            any(
+                name.endswith("_highlighted.html")
+                for name in os.listdir(processor.directory_path)
+            )
+        )
+
+        store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        store.initialise()
+        highlighted = load_states(store, FileProcessor(archive=False))
+        self.assertEqual(len(not_highlighted), 746)
+        self.assertEqual(not_highlighted, highlighted)
+
+    def test_load_rep_data_streaming_keeps_the_order_of_the_lines(self):
+        # a line of a batch which is parsed by itself, as its time has a decimal
+        # point, is added between the states of the lines around it
+        texts = [
+            "951212 120000 SHIP VC 0 0 0 N 179 59 30 E 90 6.00 0.00",
+            "951212 120000 BOAT VC 10 0 0 N 010 0 0 E 90 6.00 0.00",
+            "951212 12010.0000 SHIP VC 0 0 0 N 179 59 40 E 90 6.00 0.00",
+            "951212 120200 SHIP VC 0 0 0 N 179 59 50 E 90 6.00 0.00",
+            "951212 120200 BOAT VC 10 0 0 N 010 0 10 E 90 6.00 0.00",
+            "951212 120300 SHIP VC 0 0 0 N 179 59 55 E 90 6.00 0.00",
+        ]
+
+        def load_states(store, processor, path):
+            processor.register_importer(ReplayImporter(batch_size=4))
+            processor.process(path, store, False)
+            with store.session_scope():
+                return [
+                    (state.state_id, state.time, state.sensor_id, state.location)
+                    for state in store.session.query(store.db_classes.State)
+                    .order_by(store.db_classes.State.state_id)
+                    .all()
+                ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "order.rep")
+            with open(path, "w") as file:
+                file.write("\n".join(texts) + "\n")
+            streamed = load_states(
+                self.store, FileProcessor(archive=False, streaming_size=0), path
+            )
+            store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+            store.initialise()
+            in_one_go = load_states(store, FileProcessor(archive=False), path)
+
+        self.assertEqual(len(streamed), 6)
+        self.assertEqual(streamed, in_one_go)
+
+    def test_load_rep_data_streaming_date_that_does_not_exist(self):
+        # a line whose date doesn't exist is reported, and the other lines of the
+        # batch are still loaded
+        texts = [
+            "951212 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 0.00",
+            "19950231 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 0.00",
+            "951212 121000 SUBJECT VC 60 23 41.25 N 000 01 25.86 E 109.08 6.00 0.00",
+        ]
+        importer = ReplayImporter()
+        with self.store.session_scope():
+            change = self.store.add_to_changes(
+                "TEST", datetime.utcnow(), "TEST"
+            ).change_id
+            datafile = self.store.get_datafile("test_file", "REP", change)
+            importer.prepare_to_load("test_file.rep", datafile)
+            importer.pending_lines = [
+                (line_number, create_test_line_object(text))
+                for line_number, text in enumerate(texts, 1)
+            ]
+            importer.load_pending_lines(self.store, datafile, change)
+
+            # the states of the other lines are added together, as columns
+            (state_columns,) = datafile.measurements[importer.short_name]
+            self.assertEqual(
+                state_columns.times.tolist(),
+                [datetime(1995, 12, 12, 12, 8), datetime(1995, 12, 12, 12, 10)],
+            )
+            self.assertEqual(
+                importer.errors,
+                [
+                    {
+                        importer.error_type: "Error on line 2. day is out of range "
+                        f"for month: {texts[1]}"
+                    }
+                ],
+            )
+
+    def test_load_rep_data_in_batches(self):
+        # commit the same folder one measurement at a time, and in batches
+        rows = list()
+        for commit_batch_size in [None, 100]:
+            store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+            store.initialise()
+            processor = FileProcessor(
+                archive=False, commit_batch_size=commit_batch_size
+            )
+            processor.register_importer(ReplayImporter())
+            processor.process(DATA_PATH, store, False)
+
+            with store.session_scope():
+                states = (
+                    store.session.query(store.db_classes.State)
+                    .order_by(store.db_classes.State.state_id)
+                    .all()
+                )
+                rows.append(
+                    [
+                        (
+                            state.state_id,
+                            state.time,
+                            state.sensor_id,
+                            str(state.location),
+                            state.heading,
+                            state.speed,
+                            state.source_id,
+                        )
+                        for state in states
+                    ]
+                )
+
+                # by default, there must be a log for each state
+                logs = (
+                    store.session.query(store.db_classes.Log)
+                    .filter(store.db_classes.Log.table == "States")
+                    .all()
+                )
+                self.assertEqual(
+                    sorted(log.id for log in logs), [row[0] for row in rows[-1]]
+                )
+
+        self.assertEqual(len(rows[0]), 746)
+        self.assertEqual(rows[0], rows[1])
+
+    def test_load_rep_data_compact_logs(self):
+        # states are logged by a single Log for each datafile, however committed
+        for commit_batch_size, pipelined in product([None, 100], [False, True]):
+            store = DataStore(
+                "",
+                "",
+                "",
+                0,
+                ":memory:",
+                db_type="sqlite",
+                compact_logged_tables=["States"],
+            )
+            store.initialise()
+            processor = FileProcessor(
+                archive=False, commit_batch_size=commit_batch_size
+            )
+            processor.register_importer(ReplayImporter())
+            processor.process(DATA_PATH, store, False, pipelined=pipelined)
+
+            with store.session_scope():
+                State = store.db_classes.State
+                Log = store.db_classes.Log
+                logs = store.session.query(Log).filter(Log.table == "States").all()
+                datafile_ids = {
+                    source_id for source_id, in store.session.query(State.source_id)
+                }
+                self.assertEqual({log.datafile_id for log in logs}, datafile_ids)
+                self.assertEqual(len(logs), len(datafile_ids))
+
+                for log in logs:
+                    state_ids = [
+                        state_id
+                        for state_id, in store.session.query(State.state_id)
+                        .filter(State.source_id == log.datafile_id)
+                        .order_by(State.state_id)
+                    ]
+                    self.assertEqual(log.row_count, len(state_ids))
+                    self.assertEqual(log.id, state_ids[0])
+                    self.assertEqual(log.last_id, state_ids[-1])
+                    self.assertEqual(len(state_ids), log.last_id - log.id + 1)
+
+    def test_load_rep_data_bulk_load(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "bulk_load.db")
+            store = DataStore("", "", "", 0, db_path, db_type="sqlite", bulk_load=True)
+            store.initialise()
+            processor = FileProcessor(archive=False)
+            processor.register_importer(ReplayImporter())
+            processor.process(DATA_PATH, store, False)
+
+            with store.session_scope():
+                session = store.session
+                self.assertEqual(session.execute("PRAGMA journal_mode").scalar(), "wal")
+                # NORMAL
+                self.assertEqual(session.execute("PRAGMA synchronous").scalar(), 1)
+                # MEMORY
+                self.assertEqual(session.execute("PRAGMA temp_store").scalar(), 2)
+
+                states = session.query(store.db_classes.State).all()
+                self.assertEqual(len(states), 746)
+
+                # the spatial indexes were rebuilt, and index all the states
+                spatial_index_enabled = session.execute(
+                    "SELECT spatial_index_enabled FROM geometry_columns "
+                    "WHERE f_table_name = 'states' AND f_geometry_column = '_location'"
+                ).scalar()
+                self.assertEqual(spatial_index_enabled, 1)
+                indexed_rows = session.execute(
+                    'SELECT COUNT(*) FROM "idx_States__location"'
+                ).scalar()
+                self.assertEqual(indexed_rows, 746)
+            store.engine.dispose()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,8 +1,10 @@
 import os
+import shutil
+import tempfile
 import unittest
 import math
 
-from sqlalchemy import func
+from sqlalchemy import func, inspect
 from geoalchemy2 import WKBElement
 
 from importers.replay_contact_importer import ReplayContactImporter
@@ -20,6 +22,50 @@ DATA_PATH3 = os.path.join(
 )
 
 
+class SubjectContactImporter(ReplayContactImporter):
+    """Sets the subject of each contact to the platform holding its sensor"""
+
+    def _load_this_line(self, data_store, line_number, line, datafile, change_id):
+        super()._load_this_line(data_store, line_number, line, datafile, change_id)
+        for contact in datafile.measurements.get(self.short_name, []):
+            if contact.subject_id is None:
+                sensor = data_store.session.query(data_store.db_classes.Sensor).get(
+                    contact.sensor_id
+                )
+                contact.subject_id = sensor.host
+
+
+def describe_contacts(store):
+    """Values of all the columns of the contacts, with references by name"""
+    db_classes = store.db_classes
+    session = store.session
+
+    def name(db_class, row_id, attribute="name"):
+        if row_id is None:
+            return None
+        return getattr(session.query(db_class).get(row_id), attribute)
+
+    contacts = list()
+    for contact in session.query(db_classes.Contact).order_by(
+        db_classes.Contact.time, db_classes.Contact.contact_id
+    ):
+        values = dict()
+        for column in inspect(db_classes.Contact).column_attrs:
+            values[column.key] = getattr(contact, column.key)
+        del values["contact_id"], values["created_date"]
+        values["_location"] = str(contact.location)
+        sensor = session.query(db_classes.Sensor).get(values.pop("sensor_id"))
+        values["sensor"] = sensor.name
+        values["host"] = name(db_classes.Platform, sensor.host)
+        values["subject"] = name(db_classes.Platform, values.pop("subject_id"))
+        values["source"] = name(
+            db_classes.Datafile, values.pop("source_id"), "reference"
+        )
+        values["privacy"] = name(db_classes.Privacy, values.pop("privacy_id"))
+        contacts.append(values)
+    return contacts
+
+
 class RepContactTests(unittest.TestCase):
     def setUp(self):
         self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
@@ -130,6 +176,27 @@ class RepContactTests(unittest.TestCase):
             datafiles = self.store.session.query(self.store.db_classes.Datafile).all()
             self.assertEqual(len(datafiles), 1)
 
+    def test_process_rep_contacts_in_parallel(self):
+        # contacts parsed in worker processes are the same as those parsed here
+        contacts = list()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for path in [DATA_PATH1, DATA_PATH3]:
+                shutil.copy(path, temp_dir)
+            for workers in [1, 2]:
+                store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+                store.initialise()
+                processor = FileProcessor(archive=False)
+                processor.register_importer(SubjectContactImporter())
+                # with a trailing separator, the output folder is made in temp_dir
+                folder = os.path.join(temp_dir, "")
+                processor.process(folder, store, False, workers=workers)
+                with store.session_scope():
+                    contacts.append(describe_contacts(store))
+
+        self.assertGreater(len(contacts[0]), 7)
+        self.assertIsNotNone(contacts[0][0]["subject"])
+        self.assertEqual(contacts[0], contacts[1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+
+from pepys_import.core.store import constants
+from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.store.lookup_cache import LookupCache
+
+
+class LookupCacheTestCase(unittest.TestCase):
+    def test_loads_on_miss_only(self):
+        cache = LookupCache()
+        loads = list()
+
+        def load():
+            loads.append(1)
+            return "value"
+
+        self.assertEqual(cache.get_or_load("Table", "key", load), "value")
+        self.assertEqual(cache.get_or_load("Table", "key", load), "value")
+        self.assertEqual(len(loads), 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+        self.assertEqual(cache.stats()["hit_rate"], 0.5)
+
+    def test_none_results_are_cached(self):
+        cache = LookupCache()
+        cache.get_or_load("Table", "key", lambda: None)
+        self.assertIsNone(cache.get_or_load("Table", "key", lambda: "value"))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = LookupCache(max_size=2)
+        cache.get_or_load("Table", 1, lambda: 1)
+        cache.get_or_load("Table", 2, lambda: 2)
+        # use the first entry, so that the second one is evicted
+        cache.get_or_load("Table", 1, lambda: None)
+        cache.get_or_load("Table", 3, lambda: 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.get_or_load("Table", 1, lambda: None), 1)
+        self.assertEqual(cache.get_or_load("Table", 2, lambda: "reloaded"), "reloaded")
+
+    def test_invalidate_table(self):
+        cache = LookupCache()
+        cache.get_or_load("Table", 1, lambda: 1)
+        cache.get_or_load("Table", 2, lambda: 2)
+        cache.get_or_load("Other", 1, lambda: 1)
+
+        cache.invalidate("Table")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.stats()["invalidations"], 2)
+        self.assertEqual(cache.get_or_load("Table", 1, lambda: "new"), "new")
+        self.assertEqual(cache.get_or_load("Other", 1, lambda: "new"), 1)
+
+
+class DataStoreLookupCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        self.store.initialise()
+        with self.store.session_scope():
+            self.change_id = self.store.add_to_changes(
+                "TEST", datetime.utcnow(), "TEST"
+            ).change_id
+
+    def test_search_is_cached_until_table_is_written(self):
+        with self.store.session_scope():
+            self.assertIsNone(self.store.search_privacy("Secret"))
+            self.assertIsNone(self.store.search_privacy("Secret"))
+            self.assertEqual(self.store.lookup_cache.stats()["hits"], 1)
+
+            privacy = self.store.add_to_privacies("Secret", self.change_id)
+            self.assertEqual(self.store.search_privacy("Secret"), privacy)
+
+            # a write to another table keeps the result
+            hits = self.store.lookup_cache.stats()["hits"]
+            self.store.add_to_nationalities("UK", self.change_id)
+            self.assertEqual(self.store.search_privacy("Secret"), privacy)
+            self.assertEqual(self.store.lookup_cache.stats()["hits"], hits + 1)
+
+        self.assertEqual(len(self.store.lookup_cache), 0)
+
+    def test_synonym_search_is_invalidated_by_new_synonym(self):
+        with self.store.session_scope():
+            privacy = self.store.add_to_privacies("Secret", self.change_id)
+            Privacy = self.store.db_classes.Privacy
+
+            self.assertIsNone(
+                self.store.synonym_search("Hush", Privacy, Privacy.privacy_id)
+            )
+            self.store.add_to_synonyms(
+                constants.PRIVACY, "Hush", privacy.privacy_id, self.change_id
+            )
+            self.assertEqual(
+                self.store.synonym_search("Hush", Privacy, Privacy.privacy_id), privacy
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
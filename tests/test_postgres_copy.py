@@ -0,0 +1,246 @@
+import unittest
+from datetime import datetime
+from unittest import TestCase
+from uuid import uuid4
+
+from shapely import wkb
+from testing.postgresql import Postgresql
+
+from pepys_import.core.formats import unit_registry
+from pepys_import.core.formats.location import Location
+from pepys_import.core.store import postgres_db
+from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.store.postgres_copy import NULL, rows_to_csv
+
+# Names of contacts which must be read back as they were written
+CONTACT_NAMES = ["\\N", "", None, 'A "quoted", name,\nover two lines']
+
+
+class PostgresCopyTestCase(unittest.TestCase):
+    def test_location_to_ewkb(self):
+        location = Location()
+        location.set_latitude_decimal_degrees(50.5)
+        location.set_longitude_decimal_degrees(-1.25)
+
+        point = wkb.loads(location.to_ewkb(), hex=True)
+        self.assertEqual(point.x, -1.25)
+        self.assertEqual(point.y, 50.5)
+
+        other_location = Location()
+        other_location.set_from_wkb(location.to_ewkb())
+        self.assertEqual(other_location, location)
+
+    def test_rows_to_csv(self):
+        state_id = uuid4()
+        sensor_id = uuid4()
+        source_id = uuid4()
+        time = datetime(2020, 1, 2, 3, 4, 5, 600000)
+        rows = [
+            {
+                "state_id": state_id,
+                "time": time,
+                "sensor_id": sensor_id,
+                "_location": "SRID=4326;POINT(-1.25 50.5)",
+                "_heading": 1.5,
+                "speed": 2.0,
+                "source_id": source_id,
+                "created_date": time,
+            }
+        ]
+
+        column_names, buffer = rows_to_csv(postgres_db.State.__table__, rows)
+        self.assertEqual(
+            column_names,
+            [
+                "state_id",
+                "time",
+                "sensor_id",
+                "_location",
+                "_elevation",
+                "_heading",
+                "_course",
+                "speed",
+                "source_id",
+                "privacy_id",
+                "created_date",
+            ],
+        )
+
+        location = Location()
+        location.set_from_wkt_string(rows[0]["_location"])
+        self.assertEqual(
+            buffer.read(),
+            ",".join(
+                [
+                    f'"{state_id}"',
+                    '"2020-01-02 03:04:05.600000"',
+                    f'"{sensor_id}"',
+                    f'"{location.to_ewkb()}"',
+                    NULL,
+                    '"1.5"',
+                    NULL,
+                    '"2.0"',
+                    f'"{source_id}"',
+                    NULL,
+                    '"2020-01-02 03:04:05.600000"',
+                ]
+            )
+            + "\n",
+        )
+
+    def test_rows_to_csv_quotes_text(self):
+        rows = [{"content": 'A "quoted", comment', "time": None}]
+        _, buffer = rows_to_csv(postgres_db.Comment.__table__, rows)
+        self.assertIn('"A ""quoted"", comment"', buffer.read())
+
+    def test_rows_to_csv_tells_null_from_text(self):
+        rows = [{"content": "\\N"}, {"content": ""}, {"content": None}]
+        _, buffer = rows_to_csv(postgres_db.Comment.__table__, rows)
+        contents = [line.split(",")[4] for line in buffer.read().splitlines()]
+        # only NULL is written as an unquoted empty field
+        self.assertEqual(contents, ['"\\N"', '""', NULL])
+
+
+class PostgresCopyPostGISTestCase(TestCase):
+    def setUp(self):
+        self.postgres = None
+        self.store = None
+        try:
+            self.postgres = Postgresql(
+                database="test",
+                host="localhost",
+                user="postgres",
+                password="postgres",
+                port=55527,
+            )
+        except RuntimeError:
+            print("PostgreSQL database couldn't be created! Test is skipping.")
+            return
+        self.store = DataStore(
+            db_name="test",
+            db_host="localhost",
+            db_username="postgres",
+            db_password="postgres",
+            db_port=55527,
+        )
+        self.store.initialise()
+
+    def tearDown(self):
+        try:
+            self.postgres.stop()
+        except AttributeError:
+            return
+
+    def test_copy_states_and_contacts(self):
+        """Test whether states and contacts committed with COPY are read back as
+        they were created, NULLs included"""
+        if self.store is None:
+            self.skipTest("Postgres is not available. Test is skipping")
+
+        time = datetime(2020, 1, 2, 3, 4, 5, 600000)
+        with self.store.session_scope():
+            change_id = self.store.add_to_changes("TEST", time, "TEST").change_id
+            self.store.add_to_nationalities("UK", change_id)
+            self.store.add_to_platform_types("Fisher", change_id)
+            self.store.add_to_privacies("Public", change_id)
+            platform = self.store.get_platform(
+                platform_name="Test Platform",
+                nationality="UK",
+                platform_type="Fisher",
+                privacy="Public",
+                change_id=change_id,
+            )
+            sensor_type = self.store.add_to_sensor_types("GPS", change_id)
+            sensor = platform.get_sensor(
+                self.store, "gps", sensor_type, change_id=change_id
+            )
+            datafile = self.store.get_datafile("test_file", "csv", change_id)
+            datafile_id = datafile.datafile_id
+            datafile.measurements["test"] = list()
+
+            location = Location()
+            location.set_latitude_decimal_degrees(50.5)
+            location.set_longitude_decimal_degrees(-1.25)
+            state = datafile.create_state(self.store, platform, sensor, time, "test")
+            state.location = location
+            state.heading = 1.5 * unit_registry.radian
+            # no location, heading or speed
+            datafile.create_state(self.store, platform, sensor, time, "test")
+
+            for name in CONTACT_NAMES:
+                contact = datafile.create_contact(
+                    self.store, platform, sensor, time, "test"
+                )
+                contact.name = name
+                contact.location = location
+
+            datafile.commit(self.store, change_id, batch_size=2)
+
+        with self.store.session_scope():
+            State = self.store.db_classes.State
+            # the state without a heading last
+            states = sorted(
+                self.store.session.query(State).all(),
+                key=lambda state: state.heading is None,
+            )
+            self.assertEqual(len(states), 2)
+            self.assertEqual(states[0].time, time)
+            self.assertEqual(states[0].location, location)
+            self.assertEqual(states[0].heading, 1.5 * unit_registry.radian)
+            self.assertIsNone(states[1].location)
+            self.assertIsNone(states[1].heading)
+            self.assertIsNone(states[1].speed)
+
+            Contact = self.store.db_classes.Contact
+            contacts = self.store.session.query(Contact).all()
+            self.assertCountEqual([contact.name for contact in contacts], CONTACT_NAMES)
+            for contact in contacts:
+                self.assertEqual(contact.location, location)
+                self.assertIsNone(contact.bearing)
+                self.assertEqual(contact.source_id, datafile_id)
+
+    def test_compact_logs_of_copied_states(self):
+        """Test whether the single Log of the states of a datafile holds the IDs of
+        its rows, and not that of the datafile"""
+        if self.store is None:
+            self.skipTest("Postgres is not available. Test is skipping")
+
+        self.store.compact_logged_tables = {"States"}
+        time = datetime(2020, 1, 2, 3, 4, 5)
+        with self.store.session_scope():
+            change_id = self.store.add_to_changes("TEST", time, "TEST").change_id
+            self.store.add_to_nationalities("UK", change_id)
+            self.store.add_to_platform_types("Fisher", change_id)
+            self.store.add_to_privacies("Public", change_id)
+            platform = self.store.get_platform(
+                platform_name="Test Platform",
+                nationality="UK",
+                platform_type="Fisher",
+                privacy="Public",
+                change_id=change_id,
+            )
+            sensor_type = self.store.add_to_sensor_types("GPS", change_id)
+            sensor = platform.get_sensor(
+                self.store, "gps", sensor_type, change_id=change_id
+            )
+            datafile = self.store.get_datafile("test_file", "csv", change_id)
+            datafile_id = datafile.datafile_id
+            datafile.measurements["test"] = list()
+            for _ in range(5):
+                datafile.create_state(self.store, platform, sensor, time, "test")
+            datafile.commit(self.store, change_id, batch_size=2)
+
+        with self.store.session_scope():
+            State = self.store.db_classes.State
+            Log = self.store.db_classes.Log
+            state_ids = sorted(
+                state_id for state_id, in self.store.session.query(State.state_id)
+            )
+            (log,) = self.store.session.query(Log).filter(Log.table == "States").all()
+            self.assertEqual(log.row_count, 5)
+            self.assertEqual(log.datafile_id, datafile_id)
+            self.assertEqual((log.id, log.last_id), (state_ids[0], state_ids[-1]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -201,6 +201,28 @@ class TestStateCourseProperty(unittest.TestCase):
         assert state.course.check("")
 
 
+class TestStateSIValues(unittest.TestCase):
+    def setUp(self):
+        self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        self.store.initialise()
+
+    def test_state_set_si_values(self):
+        state = self.store.db_classes.State()
+
+        # Check floats in SI units give the same Quantities as the properties
+        state.set_si_values(speed=5.0, heading=1.5, course=0.5, elevation=-10.0)
+
+        assert state.speed == 5 * (unit_registry.metre / unit_registry.second)
+        assert state.heading == 1.5 * unit_registry.radian
+        assert state.course == 0.5 * unit_registry.radian
+        assert state.elevation == -10 * unit_registry.metre
+
+        # Check values which aren't given are left unchanged
+        state.set_si_values(speed=2.0)
+        assert state.speed == 2 * (unit_registry.metre / unit_registry.second)
+        assert state.heading == 1.5 * unit_registry.radian
+
+
 class TestMediaElevationProperty(unittest.TestCase):
     def setUp(self):
         self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
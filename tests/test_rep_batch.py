@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from pepys_import.core.formats.rep_batch import parse_rep_states
+from pepys_import.core.formats.rep_line import REPLine
+from pepys_import.file.highlighter.support.test_utils import create_test_line_object
+
+LINES = [
+    "951212 120800.555 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08  6.00  0.00",
+    '19951212 120800 "SUBJECT" @C[LAYER] 22 11 10.63 S 21 41 52.37 W -15 2.0 NaN label',
+    ";NARRATIVE: 100112 120800 SUBJECT OBSERVATION text",
+    "951212 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E",
+    "19950231 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 0.00",
+    "951212 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 Q 109.08 6.00 0.00",
+    "951212 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 deep",
+    "951212 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 0 6.00 0.00",
+]
+
+
+def test_parse_rep_states():
+    batch = parse_rep_states(LINES)
+
+    assert len(batch) == len(LINES)
+    np.testing.assert_array_equal(
+        batch.valid, [True, True, False, False, False, False, False, False]
+    )
+    assert batch.times[:2].tolist() == [
+        datetime(1995, 12, 12, 12, 8, 0, 555000),
+        datetime(1995, 12, 12, 12, 8),
+    ]
+    assert batch.vessels[:2] == ["SUBJECT", "SUBJECT"]
+    assert batch.symbologies[:2] == ["VC", "@C[LAYER]"]
+    np.testing.assert_allclose(
+        batch.latitudes[:2],
+        [60 + 23 / 60 + 40.25 / 3600, -(22 + 11 / 60 + 10.63 / 3600)],
+    )
+    np.testing.assert_allclose(
+        batch.longitudes[:2], [1 / 60 + 25.86 / 3600, -(21 + 41 / 60 + 52.37 / 3600)]
+    )
+    assert np.isnan(batch.depths[1])
+
+
+def test_parse_rep_states_matches_rep_line():
+    # the rows of the batch hold what REPLine parses from them, and the others are
+    # lines it doesn't parse
+    batch = parse_rep_states(LINES)
+
+    for row, text in enumerate(LINES):
+        rep_line = REPLine(row + 1, create_test_line_object(text), " ")
+        if text.startswith("19950231"):
+            # REPLine raises the error of a date which doesn't exist
+            with pytest.raises(ValueError, match="day is out of range for month"):
+                rep_line.parse(list(), "Error")
+            assert not batch.valid[row]
+            continue
+        parsed = rep_line.parse(list(), "Error")
+        if not batch.valid[row]:
+            assert not parsed
+            continue
+        assert parsed
+        assert rep_line.timestamp == batch.times[row].tolist()
+        assert rep_line.vessel == batch.vessels[row]
+        assert rep_line.location.latitude == batch.latitudes[row]
+        assert rep_line.location.longitude == batch.longitudes[row]
+        assert rep_line.heading == batch.headings[row]
+        assert rep_line.speed == batch.speeds[row]
+        np.testing.assert_equal(rep_line.depth, batch.depths[row])
+
+
+def test_parse_rep_states_errors():
+    # rows with too few tokens or a date or time of the wrong length get the error
+    # message of REPLine, and the other rows it rejects are left to REPLine
+    lines = LINES + [
+        "9512120 120800 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 0.00",
+        "951212 1208 SUBJECT VC 60 23 40.25 N 000 01 25.86 E 109.08 6.00 0.00",
+    ]
+    batch = parse_rep_states(lines, range(11, 11 + len(lines)))
+
+    for row, text in enumerate(lines):
+        errors = list()
+        try:
+            REPLine(row + 11, create_test_line_object(text), " ").parse(errors, "Error")
+        except ValueError:
+            pass
+        if row in (2, 3, 8, 9):
+            assert errors == [{"Error": batch.errors[row]}]
+        else:
+            assert batch.errors[row] is None
@@ -160,7 +160,10 @@ class BasicTests(unittest.TestCase):
         correct_loc.set_longitude_dms(0.0, 1.0, 25.86, "E")
         self.assertEqual(correct_loc, rep_line.location)
         self.assertAlmostEqual(1.9038051480754146, rep_line.heading)
-        self.assertAlmostEqual(6 * unit_registry.knot, rep_line.speed)
+        self.assertAlmostEqual(
+            (6 * unit_registry.knot).to(unit_registry.metre / unit_registry.second),
+            rep_line.speed * unit_registry.metre / unit_registry.second,
+        )
         self.assertEqual(0.0, rep_line.depth)
         self.assertEqual("Label", rep_line.text_label)
 
@@ -0,0 +1,188 @@
+import unittest
+
+from datetime import datetime
+
+import numpy as np
+
+from pepys_import.core.formats.ewkb import decode_point, parse_ewkt_point
+from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.validators import constants
+from pepys_import.core.validators.basic_validator import BasicValidator
+from pepys_import.core.validators.enhanced_validator import EnhancedValidator
+
+PARSER_NAME = "Test Importer"
+
+
+class StateColumnsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.store = DataStore(
+            "", "", "", 0, ":memory:", db_type="sqlite", compact_logged_tables=[]
+        )
+        self.store.initialise()
+
+    def create_columns(self, size):
+        """Add random states to a new datafile, with headings and speeds which
+        often don't match the positions, and a few values out of range"""
+        random = np.random.default_rng(5)
+        self.change_id = self.store.add_to_changes(
+            "TEST", datetime.utcnow(), "TEST"
+        ).change_id
+        platform = self.store.get_platform(
+            platform_name="Test Platform",
+            nationality="UK",
+            platform_type="Fisher",
+            privacy="Public",
+            change_id=self.change_id,
+        )
+        sensor_type = self.store.add_to_sensor_types("GPS", self.change_id)
+        sensor = platform.get_sensor(
+            self.store, "gps", sensor_type, change_id=self.change_id
+        )
+        datafile = self.store.get_datafile("test_file", "REP", self.change_id)
+        datafile.measurements[PARSER_NAME] = list()
+
+        latitudes = 50 + np.cumsum(random.uniform(-0.01, 0.01, size))
+        latitudes[::40] = 90
+        longitudes = np.cumsum(random.uniform(-0.01, 0.01, size))
+        headings = np.radians(random.uniform(0, 360, size))
+        headings[::30] = np.nan
+        headings[1::30] = np.radians(361)
+        speeds = random.uniform(0, 30, size)
+        prev_latitudes = np.concatenate([[np.nan], latitudes[:-1]])
+        prev_longitudes = np.concatenate([[np.nan], longitudes[:-1]])
+        columns = datafile.create_state_columns(
+            self.store,
+            PARSER_NAME,
+            sensor_ids=[sensor.sensor_id] * size,
+            platform_names=[platform.name] * size,
+            sensor_names=[sensor.name] * size,
+            times=np.datetime64("2020-01-01T12:00:00")
+            + np.arange(size) * np.timedelta64(30, "s"),
+            latitudes=latitudes,
+            longitudes=longitudes,
+            headings=headings,
+            speeds=speeds,
+            elevations=-random.uniform(0, 100, size),
+            prev_latitudes=prev_latitudes,
+            prev_longitudes=prev_longitudes,
+        )
+        return datafile, columns
+
+    def test_validate_finds_the_errors_of_every_row(self):
+        with self.store.session_scope():
+            datafile, columns = self.create_columns(200)
+
+            for validation_level in [constants.BASIC_LEVEL, constants.ENHANCED_LEVEL]:
+                # every row given to the validators, as State objects
+                expected_errors = list()
+                for state in columns.create_states():
+                    BasicValidator(state, expected_errors, PARSER_NAME)
+                    if validation_level == constants.ENHANCED_LEVEL:
+                        EnhancedValidator(state, expected_errors, PARSER_NAME)
+                self.assertTrue(expected_errors)
+
+                errors = list()
+                self.assertFalse(
+                    datafile.validate(validation_level, errors, PARSER_NAME)
+                )
+                self.assertEqual(errors, expected_errors)
+                # only the rows which may have an error are validated one by one
+                self.assertLess(
+                    len(columns.rows_to_validate(validation_level)), len(columns)
+                )
+
+    def test_commit_state_columns(self):
+        with self.store.session_scope():
+            datafile, columns = self.create_columns(10)
+            # the database holds the NaN heading of a row as NULL
+            expected_states = [
+                (
+                    state.time,
+                    state.sensor_id,
+                    state.location,
+                    None if np.isnan(state._heading) else state._heading,
+                    state._speed,
+                    state._elevation,
+                    datafile.datafile_id,
+                )
+                for state in columns.create_states()
+            ]
+            self.assertEqual(
+                datafile.commit(self.store, self.change_id, batch_size=3),
+                [f"10 measurement objects parsed by {PARSER_NAME}."],
+            )
+
+        with self.store.session_scope():
+            State = self.store.db_classes.State
+            states = self.store.session.query(State).order_by(State.state_id).all()
+            self.assertEqual(
+                [
+                    (
+                        state.time,
+                        state.sensor_id,
+                        state.location,
+                        state._heading,
+                        state._speed,
+                        state._elevation,
+                        state.source_id,
+                    )
+                    for state in states
+                ],
+                expected_states,
+            )
+            state_ids = [state.state_id for state in states]
+            self.assertEqual(columns.state_ids, state_ids)
+
+            # each state is logged by row
+            logs = (
+                self.store.session.query(self.store.db_classes.Log)
+                .filter_by(table="States")
+                .all()
+            )
+            self.assertEqual(sorted(log.id for log in logs), state_ids)
+
+    def test_mappings_as_ewkb(self):
+        # the locations given to PostgreSQL as EWKB are the points of those given
+        # to SpatiaLite as EWKT
+        with self.store.session_scope():
+            _, columns = self.create_columns(10)
+            for ewkt_mapping, ewkb_mapping in zip(
+                columns.mappings(), columns.mappings(ewkb=True)
+            ):
+                self.assertEqual(
+                    decode_point(ewkb_mapping["_location"].desc),
+                    parse_ewkt_point(ewkt_mapping["_location"]),
+                )
+                # NaN headings included
+                np.testing.assert_equal(
+                    dict(ewkb_mapping, _location=None),
+                    dict(ewkt_mapping, _location=None),
+                )
+
+    def test_compact_logs_of_state_columns(self):
+        self.store = DataStore(
+            "",
+            "",
+            "",
+            0,
+            ":memory:",
+            db_type="sqlite",
+            compact_logged_tables=["States"],
+        )
+        self.store.initialise()
+        with self.store.session_scope():
+            datafile, columns = self.create_columns(10)
+            datafile.commit(self.store, self.change_id, batch_size=3)
+
+        with self.store.session_scope():
+            (log,) = (
+                self.store.session.query(self.store.db_classes.Log)
+                .filter_by(table="States")
+                .all()
+            )
+            self.assertEqual(log.row_count, 10)
+            self.assertEqual((log.id, log.last_id), (1, 10))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,20 @@
+import os
 import unittest
 
 from datetime import datetime
 
+from importers.replay_comment_importer import ReplayCommentImporter
+from importers.replay_contact_importer import ReplayContactImporter
+from importers.replay_importer import ReplayImporter
 from pepys_import.core.store.data_store import DataStore
+from pepys_import.core.store.table_statistics import count_rows
+from pepys_import.file.file_processor import FileProcessor
 from pepys_import.core.store.table_summary import TableSummary, TableSummarySet
 from unittest import TestCase
 
+FILE_PATH = os.path.dirname(__file__)
+DATA_PATH = os.path.join(FILE_PATH, "sample_data/track_files/rep_data/rep_test1.rep")
+
 
 class TableSummarySetTestCase(TestCase):
     def setUp(self):
@@ -89,5 +98,115 @@ class TableSummaryTestCase(TestCase):
         self.assertEqual(diff, [2, 0])
 
 
+class TableStatisticsTestCase(TestCase):
+    def setUp(self):
+        self.store = DataStore("", "", "", 0, ":memory:", db_type="sqlite")
+        self.store.initialise()
+
+    def get_statistics(self):
+        TableStatistic = self.store.db_classes.TableStatistic
+        return {
+            statistic.table_name: (statistic.row_count, statistic.last_created_date)
+            for statistic in self.store.session.query(TableStatistic)
+        }
+
+    def test_statistics_match_tables_after_import(self):
+        """Test whether the statistics of every table are kept up to date by imports"""
+        processor = FileProcessor(archive=False)
+        processor.register_importer(ReplayImporter())
+        processor.register_importer(ReplayContactImporter())
+        processor.register_importer(ReplayCommentImporter())
+        processor.process(DATA_PATH, self.store, False)
+
+        with self.store.session_scope():
+            statistics = self.get_statistics()
+            tables = [
+                table
+                for table in self.store.db_classes.__dict__.values()
+                if getattr(table, "__tablename__", None) in statistics
+            ]
+            self.assertGreater(len(tables), 30)
+            for table in tables:
+                self.assertEqual(
+                    statistics[table.__tablename__],
+                    count_rows(self.store.session, table),
+                    table.__tablename__,
+                )
+            self.assertGreater(statistics["States"][0], 0)
+
+    def test_summary_reads_statistics(self):
+        """Test whether summaries use the statistics rather than counting rows, and
+        include the rows added by the current transaction"""
+        with self.store.session_scope():
+            change_id = self.store.add_to_changes(
+                "TEST", datetime.utcnow(), "TEST"
+            ).change_id
+            self.store.add_to_privacies("TEST-1", change_id)
+            self.assertEqual(
+                TableSummary(
+                    self.store.session, self.store.db_classes.Privacy
+                ).number_of_rows,
+                1,
+            )
+
+        with self.store.session_scope():
+            self.assertEqual(self.get_statistics()["Privacies"][0], 1)
+            statistic = self.store.session.query(
+                self.store.db_classes.TableStatistic
+            ).get("Privacies")
+            statistic.row_count = 1000
+
+        with self.store.session_scope():
+            ts = TableSummary(self.store.session, self.store.db_classes.Privacy)
+            self.assertEqual(ts.number_of_rows, 1000)
+
+    def test_rolled_back_rows_are_not_recorded(self):
+        """Test whether the statistics ignore the rows of transactions rolled back"""
+        with self.assertRaises(ValueError):
+            with self.store.session_scope():
+                change_id = self.store.add_to_changes(
+                    "TEST", datetime.utcnow(), "TEST"
+                ).change_id
+                self.store.add_to_privacies("TEST-1", change_id)
+                raise ValueError()
+
+        with self.store.session_scope():
+            self.assertEqual(self.get_statistics()["Privacies"], (0, None))
+
+    def test_tables_without_statistics(self):
+        """Test whether tables without statistics are counted, or estimated by the
+        database in approximate mode"""
+        with self.store.session_scope():
+            change_id = self.store.add_to_changes(
+                "TEST", datetime.utcnow(), "TEST"
+            ).change_id
+            self.store.add_to_privacies("TEST-1", change_id)
+            self.store.add_to_privacies("TEST-2", change_id)
+
+        with self.store.session_scope():
+            session = self.store.session
+            session.query(self.store.db_classes.TableStatistic).filter_by(
+                table_name="Privacies"
+            ).delete()
+            ts = TableSummary(session, self.store.db_classes.Privacy)
+            self.assertEqual(ts.number_of_rows, 2)
+            self.assertNotEqual(ts.created_date, "-")
+
+            # not analysed yet, so counted
+            ts = TableSummary(session, self.store.db_classes.Privacy, approximate=True)
+            self.assertEqual(ts.number_of_rows, 2)
+
+            session.execute("ANALYZE")
+            self.store.add_to_privacies("TEST-3", change_id)
+            ts = TableSummary(session, self.store.db_classes.Privacy, approximate=True)
+            self.assertEqual(ts.number_of_rows, 2)
+            self.assertEqual(ts.created_date, "-")
+
+        # statistics are added back by initialise
+        self.assertEqual(self.store.ensure_table_statistics(), ["Privacies"])
+        with self.store.session_scope():
+            self.assertEqual(self.get_statistics()["Privacies"][0], 3)
+
+
 if __name__ == "__main__":
     unittest.main()
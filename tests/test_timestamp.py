@@ -0,0 +1,79 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from pepys_import.core.formats.timestamp import (
+    parse_delimited_timestamp,
+    parse_timestamp,
+    parse_timestamps,
+)
+
+COMPACT_TIMESTAMPS = [
+    ("951212", "120800"),
+    ("680229", "000000.5"),
+    ("690101", "235959.999"),
+    ("20200229", "120000.123456"),
+    ("20161105", "150002.000"),
+    ("1995121", "120800"),
+    ("951312", "120800"),
+    ("951231", "240000"),
+    ("950231", "120000"),
+    ("951212", "120860"),
+    ("951212", "120800."),
+    ("951212", "120800,5"),
+    ("95121x", "120800"),
+]
+
+
+def strptime_compact(date, time):
+    format_str = "%y%m%d" if len(date) == 6 else "%Y%m%d"
+    format_str += "%H%M%S" if len(time) == 6 else "%H%M%S.%f"
+    return datetime.strptime(date + time, format_str)
+
+
+@pytest.mark.parametrize("date,time", COMPACT_TIMESTAMPS)
+def test_parse_timestamp_matches_strptime(date, time):
+    try:
+        expected = strptime_compact(date, time)
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_timestamp(date, time)
+    else:
+        assert parse_timestamp(date, time) == expected
+
+
+@pytest.mark.parametrize(
+    "date,time",
+    [
+        ("2019/03/04", "12:00:01"),
+        (" 2019/03/04 ", " 23:59:59 "),
+        ("2019/02/29", "12:00:01"),
+        ("2019/03/04", "24:00:00"),
+        ("2019-03-04", "12:00:01"),
+        ("2019/03/04", "12:0:01"),
+    ],
+)
+def test_parse_delimited_timestamp_matches_strptime(date, time):
+    try:
+        expected = datetime.strptime(
+            date.strip() + " " + time.strip(), "%Y/%m/%d %H:%M:%S"
+        )
+    except ValueError:
+        with pytest.raises(ValueError):
+            parse_delimited_timestamp(date, time)
+    else:
+        assert parse_delimited_timestamp(date, time) == expected
+
+
+def test_parse_timestamps():
+    dates, times = zip(*COMPACT_TIMESTAMPS)
+    timestamps, valid = parse_timestamps(dates, times)
+
+    # times other than HHMMSS and HHMMSS.SSS are left to parse_timestamp
+    np.testing.assert_array_equal(valid, [True, False, True, False, True] + [False] * 8)
+    assert timestamps[valid].tolist() == [
+        parse_timestamp(date, time)
+        for date, time, parsed in zip(dates, times, valid)
+        if parsed
+    ]
@@ -71,12 +71,19 @@ class UnitsTests(unittest.TestCase):
         self.assertTrue(state.parse(list(), "test"))
 
         # Speed and Heading from state
-        # heading -> 109.08 (degrees)
-        # speed   -> 6 knots (still stored as knots in REPLine, but has units)
+        # heading -> 109.08 (degrees), stored in radians in REPLine
+        # speed   -> 6 knots, stored in metres per second in REPLine
 
-        self.assertEqual("<Quantity(109.08, 'degree')>", repr(state.heading))
-        self.assertAlmostEqual(6, state.speed.magnitude)
-        assert state.speed.check("[length]/[time]")
+        self.assertAlmostEqual(
+            (109.08 * unit_registry.degree).to(unit_registry.radian).magnitude,
+            state.heading,
+        )
+        self.assertAlmostEqual(
+            (6 * unit_registry.knot)
+            .to(unit_registry.metre / unit_registry.second)
+            .magnitude,
+            state.speed,
+        )
 
 
 if __name__ == "__main__":